@@ -1,4 +1,8 @@
 # TODO handle MultiScreenGroupBox clicks and events
+from taqtile.startup import get_startup_profiler
+
+get_startup_profiler().start()
+
 import logging
 from os.path import expanduser
 
@@ -157,6 +161,7 @@ Terminal(
 )
 
 screens = get_screens(num_monitors, groups)
+get_startup_profiler().mark("config loaded")
 
 
 floating_layout = layout.Floating(
@@ -3,7 +3,6 @@ from __future__ import print_function
 import json
 import os
 import shlex
-import subprocess
 import logging
 from os.path import join
 
@@ -81,18 +80,9 @@ def hook_change(name, selection):
 
 
 def copy_xclip(text, primary=False):
-    PRIMARY_SELECTION = "-p"
-    DEFAULT_SELECTION = "c"
-    ENCODING = "utf-8"
-    selection = DEFAULT_SELECTION
-    if primary:
-        selection = PRIMARY_SELECTION
-    p = subprocess.Popen(
-        ["xclip", "-selection", selection],
-        stdin=subprocess.PIPE,
-        close_fds=True,
-    )
-    p.communicate(input=text.encode(ENCODING))
+    from taqtile.selection import get_selection_service
+
+    get_selection_service().set(text, "PRIMARY" if primary else "CLIPBOARD")
 
 
 def dmenu_xclip(qtile, args):
@@ -1,6 +1,30 @@
-from __future__ import absolute_import, print_function, unicode_literals
-import dbus
-from pprint import pprint
+"""BlueZ adapters and devices.
+
+``list_bluetooth`` used to open a fresh system bus and rebuild the whole
+adapter/device tree from ``GetManagedObjects`` on every menu, then pipe
+commands into ``bluetoothctl``. :class:`BluezCache` loads the object tree
+once over a long lived dbus_next connection and keeps it current from
+BlueZ's ``InterfacesAdded``, ``InterfacesRemoved`` and ``PropertiesChanged``
+signals. Devices are indexed by object path and by address, so lookups do
+not walk the tree. Connect and disconnect call ``org.bluez.Device1``
+directly.
+"""
+
+import asyncio
+import logging
+
+from taqtile.lazyimport import lazy_module
+
+logger = logging.getLogger("taqtile")
+
+dbus_next = lazy_module("dbus_next")
+dbus_next_aio = lazy_module("dbus_next.aio")
+
+BLUEZ = "org.bluez"
+ADAPTER = "org.bluez.Adapter1"
+DEVICE = "org.bluez.Device1"
+OBJECT_MANAGER = "org.freedesktop.DBus.ObjectManager"
+PROPERTIES = "org.freedesktop.DBus.Properties"
 
 
 def extract_objects(object_list):
@@ -25,44 +49,227 @@ def extract_uuids(uuid_list):
     return list
 
 
-def get_devices():
-    bus = dbus.SystemBus()
+def _properties(properties):
+    result = {}
+    for key, value in properties.items():
+        value = getattr(value, "value", value)
+        result[str(key)] = extract_uuids(value) if key == "UUIDs" else value
+    return result
 
-    manager = dbus.Interface(
-        bus.get_object("org.bluez", "/"), "org.freedesktop.DBus.ObjectManager"
-    )
-    objects = manager.GetManagedObjects()
-    all_devices = (
-        str(path)
-        for path, interfaces in objects.items()
-        if "org.bluez.Device1" in interfaces.keys()
-    )
-    DEVICES = {}
+
+def build_tree(objects):
+    """Group ``GetManagedObjects`` output into adapters and their devices."""
+    tree = {}
+    for path, interfaces in objects.items():
+        if ADAPTER in interfaces:
+            adapter = tree.setdefault(str(path), {})
+            adapter.update(_properties(interfaces[ADAPTER]))
     for path, interfaces in objects.items():
-        if "org.bluez.Adapter1" not in interfaces.keys():
+        if DEVICE not in interfaces:
             continue
-        device = DEVICES.setdefault(str(path), {})
-        properties = interfaces["org.bluez.Adapter1"]
-        for key in properties.keys():
-            value = properties[str(key)]
-            if key == "UUIDs":
-                list = extract_uuids(value)
-                device[str(key)] = list
-            else:
-                device[str(key)] = value
-
-        device_list = [d for d in all_devices if d.startswith(path + "/")]
-
-        for dev_path in device_list:
-            paired = device.setdefault("devices", {})
-            pair = paired.setdefault(dev_path, {})
-            dev = objects[dev_path]
-            properties = dev["org.bluez.Device1"]
-            for key in properties.keys():
-                value = properties[str(key)]
-                if key == "UUIDs":
-                    list = extract_uuids(value)
-                    pair[str(key)] = list
-                else:
-                    pair[str(key)] = value
-    return DEVICES
+        device = _properties(interfaces[DEVICE])
+        adapter = tree.setdefault(str(device.get("Adapter", "")), {})
+        adapter.setdefault("devices", {})[str(path)] = device
+    return tree
+
+
+def get_devices():
+    """One shot read of the BlueZ tree over dbus-python."""
+    import dbus
+
+    bus = dbus.SystemBus()
+    manager = dbus.Interface(bus.get_object(BLUEZ, "/"), OBJECT_MANAGER)
+    return build_tree(manager.GetManagedObjects())
+
+
+class BluezCache:
+    def __init__(self, bus_address=None, service=BLUEZ):
+        self.bus_address = bus_address
+        self.service = service
+        self.bus = None
+        self.adapters = {}
+        self.devices = {}
+        self.addresses = {}
+        self.ready = False
+        self._task = None
+
+    def start(self, loop=None):
+        """Connect in the background, again if an earlier attempt failed."""
+        if self._task is None or (self._task.done() and not self.ready):
+            loop = loop or asyncio.get_event_loop()
+            self._task = loop.create_task(self.connect())
+        return self._task
+
+    def _new_bus(self):
+        if self.bus_address:
+            return dbus_next_aio.MessageBus(bus_address=self.bus_address)
+        return dbus_next_aio.MessageBus(
+            bus_type=dbus_next.constants.BusType.SYSTEM
+        )
+
+    async def connect(self):
+        self.bus = await self._new_bus().connect()
+        self.bus.add_message_handler(self._on_message)
+        # subscribe before loading so no change falls between the two
+        for rule in (
+            "type='signal',sender='%s',interface='%s'"
+            % (self.service, OBJECT_MANAGER),
+            "type='signal',sender='%s',interface='%s',member='PropertiesChanged'"
+            % (self.service, PROPERTIES),
+        ):
+            await self._call(
+                "org.freedesktop.DBus",
+                "/org/freedesktop/DBus",
+                "org.freedesktop.DBus",
+                "AddMatch",
+                "s",
+                [rule],
+            )
+        reply = await self._call(
+            self.service, "/", OBJECT_MANAGER, "GetManagedObjects"
+        )
+        for path, interfaces in reply.body[0].items():
+            self._add(path, interfaces)
+        self.ready = True
+        asyncio.ensure_future(self._watch(self.bus))
+        logger.debug(
+            "bluez cache loaded %s adapters, %s devices",
+            len(self.adapters),
+            len(self.devices),
+        )
+
+    async def _watch(self, bus):
+        try:
+            await bus.wait_for_disconnect()
+        except Exception as e:
+            logger.debug("bluez connection lost: %s", e)
+        if bus is self.bus:
+            # the next start() reconnects and reloads the tree
+            self.bus = None
+            self.ready = False
+            self.adapters, self.devices, self.addresses = {}, {}, {}
+
+    def disconnect(self):
+        if self.bus is not None:
+            self.bus.disconnect()
+            self.bus = None
+        self.ready = False
+
+    async def _call(
+        self,
+        destination,
+        path,
+        interface,
+        member,
+        signature="",
+        body=(),
+        bus=None,
+    ):
+        reply = await (bus or self.bus).call(
+            dbus_next.Message(
+                destination=destination,
+                path=path,
+                interface=interface,
+                member=member,
+                signature=signature,
+                body=list(body),
+            )
+        )
+        if reply.message_type == dbus_next.constants.MessageType.ERROR:
+            raise dbus_next.DBusError(
+                reply.error_name, " ".join(map(str, reply.body))
+            )
+        return reply
+
+    def _on_message(self, msg):
+        if msg.message_type != dbus_next.constants.MessageType.SIGNAL:
+            return
+        if msg.interface == OBJECT_MANAGER:
+            if msg.member == "InterfacesAdded":
+                self._add(*msg.body)
+            elif msg.member == "InterfacesRemoved":
+                self._remove(*msg.body)
+        elif msg.interface == PROPERTIES and msg.member == "PropertiesChanged":
+            self._changed(msg.path, *msg.body)
+
+    def _add(self, path, interfaces):
+        if ADAPTER in interfaces:
+            self.adapters.setdefault(path, {}).update(
+                _properties(interfaces[ADAPTER])
+            )
+        if DEVICE in interfaces:
+            device = self.devices.setdefault(path, {})
+            device.update(_properties(interfaces[DEVICE]))
+            self._index(path, device)
+
+    def _remove(self, path, interfaces):
+        if ADAPTER in interfaces:
+            self.adapters.pop(path, None)
+        if DEVICE in interfaces:
+            device = self.devices.pop(path, None)
+            if device and self.addresses.get(device.get("Address")) == path:
+                del self.addresses[device["Address"]]
+
+    def _changed(self, path, interface, changed, invalidated):
+        if interface == ADAPTER:
+            target = self.adapters.get(path)
+        elif interface == DEVICE:
+            target = self.devices.get(path)
+        else:
+            return
+        if target is None:
+            return
+        target.update(_properties(changed))
+        for key in invalidated:
+            target.pop(key, None)
+        if interface == DEVICE:
+            self._index(path, target)
+
+    def _index(self, path, device):
+        address = device.get("Address")
+        if address:
+            self.addresses[address] = path
+
+    def device(self, address):
+        path = self.addresses.get(address)
+        return None if path is None else self.devices.get(path)
+
+    def adapter_devices(self, adapter="/org/bluez/hci0"):
+        return {
+            path: device
+            for path, device in self.devices.items()
+            if device.get("Adapter") == adapter
+        }
+
+    async def _device_call(self, address, member, path=None):
+        if self.ready:
+            path = self.addresses.get(address)
+        if path is None:
+            raise KeyError("unknown bluetooth device %s" % address)
+        if self.ready:
+            await self._call(self.service, path, DEVICE, member)
+            return
+        # the cache is still connecting or lost its bus, which must not
+        # drop the request, so make the call on a connection of its own
+        bus = await self._new_bus().connect()
+        try:
+            await self._call(self.service, path, DEVICE, member, bus=bus)
+        finally:
+            bus.disconnect()
+
+    async def connect_device(self, address, path=None):
+        """Connect ``address``, ``path`` is used while the cache is not ready."""
+        await self._device_call(address, "Connect", path)
+
+    async def disconnect_device(self, address, path=None):
+        await self._device_call(address, "Disconnect", path)
+
+
+_bluez_cache = None
+
+
+def get_bluez_cache():
+    global _bluez_cache
+    if _bluez_cache is None:
+        _bluez_cache = BluezCache()
+    return _bluez_cache
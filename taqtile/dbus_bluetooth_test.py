@@ -0,0 +1,178 @@
+import asyncio
+import shutil
+import subprocess
+from unittest import IsolatedAsyncioTestCase, TestCase, skipUnless
+
+from dbus_next import Variant
+from dbus_next.aio import MessageBus
+from dbus_next.service import (
+    PropertyAccess,
+    ServiceInterface,
+    dbus_property,
+    method,
+)
+
+from taqtile.dbus_bluetooth import BluezCache, build_tree
+
+ADAPTER_PATH = "/org/bluez/hci0"
+
+
+class StubAdapter(ServiceInterface):
+    def __init__(self):
+        super().__init__("org.bluez.Adapter1")
+
+    @dbus_property(access=PropertyAccess.READ)
+    def Address(self) -> "s":
+        return "00:00:00:00:00:01"
+
+
+class StubDevice(ServiceInterface):
+    def __init__(self, address, alias):
+        super().__init__("org.bluez.Device1")
+        self.address = address
+        self.alias = alias
+        self.connected = False
+
+    @dbus_property(access=PropertyAccess.READ)
+    def Address(self) -> "s":
+        return self.address
+
+    @dbus_property(access=PropertyAccess.READ)
+    def Alias(self) -> "s":
+        return self.alias
+
+    @dbus_property(access=PropertyAccess.READ)
+    def Adapter(self) -> "o":
+        return ADAPTER_PATH
+
+    @dbus_property(access=PropertyAccess.READ)
+    def Connected(self) -> "b":
+        return self.connected
+
+    def set_connected(self, connected):
+        self.connected = connected
+        self.emit_properties_changed({"Connected": connected})
+
+    @method()
+    def Connect(self):
+        self.set_connected(True)
+
+    @method()
+    def Disconnect(self):
+        self.set_connected(False)
+
+
+def device_path(address):
+    return "%s/dev_%s" % (ADAPTER_PATH, address.replace(":", "_"))
+
+
+class BuildTreeTest(TestCase):
+    def test_groups_devices_of_every_adapter(self):
+        objects = {
+            "/org/bluez/hci0": {"org.bluez.Adapter1": {"Address": "A0"}},
+            "/org/bluez/hci1": {"org.bluez.Adapter1": {"Address": "A1"}},
+            "/org/bluez/hci0/dev_1": {
+                "org.bluez.Device1": {
+                    "Address": "1",
+                    "Adapter": "/org/bluez/hci0",
+                }
+            },
+            "/org/bluez/hci1/dev_2": {
+                "org.bluez.Device1": {
+                    "Address": Variant("s", "2"),
+                    "Adapter": "/org/bluez/hci1",
+                }
+            },
+        }
+        tree = build_tree(objects)
+        self.assertEqual(
+            list(tree["/org/bluez/hci0"]["devices"]), ["/org/bluez/hci0/dev_1"]
+        )
+        self.assertEqual(
+            tree["/org/bluez/hci1"]["devices"]["/org/bluez/hci1/dev_2"][
+                "Address"
+            ],
+            "2",
+        )
+
+
+@skipUnless(shutil.which("dbus-daemon"), "dbus-daemon not installed")
+class BluezCacheTest(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.daemon = subprocess.Popen(
+            ["dbus-daemon", "--session", "--nofork", "--print-address"],
+            stdout=subprocess.PIPE,
+        )
+        self.address = self.daemon.stdout.readline().decode().strip()
+        self.service_bus = await MessageBus(bus_address=self.address).connect()
+        self.service_bus.export(ADAPTER_PATH, StubAdapter())
+        self.headset = StubDevice("AA:BB:CC:DD:EE:01", "headset")
+        self.service_bus.export(
+            device_path(self.headset.address), self.headset
+        )
+        await self.service_bus.request_name("org.bluez")
+        self.cache = BluezCache(bus_address=self.address)
+        await self.cache.start()
+
+    async def asyncTearDown(self):
+        self.cache.disconnect()
+        self.service_bus.disconnect()
+        self.daemon.terminate()
+        self.daemon.wait()
+
+    async def wait_for(self, condition):
+        for _ in range(100):
+            if condition():
+                return
+            await asyncio.sleep(0.01)
+        self.fail("cache did not catch up")
+
+    async def test_loads_managed_objects(self):
+        self.assertTrue(self.cache.ready)
+        self.assertIn(ADAPTER_PATH, self.cache.adapters)
+        self.assertEqual(
+            self.cache.device("AA:BB:CC:DD:EE:01")["Alias"], "headset"
+        )
+        self.assertEqual(
+            list(self.cache.adapter_devices()),
+            [device_path(self.headset.address)],
+        )
+
+    async def test_follows_added_and_removed_devices(self):
+        speaker = StubDevice("AA:BB:CC:DD:EE:02", "speaker")
+        self.service_bus.export(device_path(speaker.address), speaker)
+        await self.wait_for(lambda: self.cache.device(speaker.address))
+        self.assertEqual(
+            self.cache.device(speaker.address)["Alias"], "speaker"
+        )
+        self.service_bus.unexport(device_path(speaker.address))
+        await self.wait_for(lambda: self.cache.device(speaker.address) is None)
+        self.assertNotIn(device_path(speaker.address), self.cache.devices)
+
+    async def test_connect_over_dbus_updates_properties(self):
+        device = self.cache.device(self.headset.address)
+        self.assertFalse(device["Connected"])
+        await self.cache.connect_device(self.headset.address)
+        self.assertTrue(self.headset.connected)
+        await self.wait_for(lambda: device["Connected"])
+        await self.cache.disconnect_device(self.headset.address)
+        await self.wait_for(lambda: not device["Connected"])
+
+    async def test_unknown_device(self):
+        with self.assertRaises(KeyError):
+            await self.cache.connect_device("00:00:00:00:00:99")
+
+    async def test_device_call_before_the_cache_is_ready(self):
+        cache = BluezCache(bus_address=self.address)
+        self.assertFalse(cache.ready)
+        with self.assertRaises(KeyError):
+            await cache.connect_device(self.headset.address)
+        await cache.connect_device(
+            self.headset.address, device_path(self.headset.address)
+        )
+        self.assertTrue(self.headset.connected)
+        await cache.disconnect_device(
+            self.headset.address, device_path(self.headset.address)
+        )
+        self.assertFalse(self.headset.connected)
+        self.assertIsNone(cache.bus)
@@ -1,16 +1,15 @@
+import asyncio
 import os
-import json
 
 import re
 import shlex
 from os.path import isdir, join, pathsep, dirname
 
-from plumbum.cmd import dmenu, pactl, recordmydesktop, pgrep, rofi
-
+from taqtile.lazyimport import lazy_command
 from taqtile.log import logger
+from taqtile.pulse import get_pulse_model, prop
 from taqtile.recent_runner import RecentRunner
 from taqtile.screens import PRIMARY_SCREEN, SECONDARY_SCREEN
-from taqtile.dbus_bluetooth import get_devices
 from taqtile.themes import dmenu_cmd_args
 from taqtile.system import (
     get_hostconfig,
@@ -26,6 +25,11 @@ from libqtile.lazy import lazy
 
 import time
 
+dmenu = lazy_command("dmenu")
+recordmydesktop = lazy_command("recordmydesktop")
+pgrep = lazy_command("pgrep")
+rofi = lazy_command("rofi")
+
 
 def debounce(s):
     """Decorator ensures function that can only be called once every `s` seconds."""
@@ -115,10 +119,18 @@ def dmenu_org(qtile):
 
 def list_bluetooth(qtile):
     recent = RecentRunner("qtile_bluetooth")
-    devices = get_devices()["/org/bluez/hci0"]["devices"]
+    from taqtile.dbus_bluetooth import get_bluez_cache, get_devices
+
+    cache = get_bluez_cache()
+    if cache.ready:
+        devices = cache.adapter_devices()
+    else:
+        cache.start()
+        devices = get_devices().get("/org/bluez/hci0", {}).get("devices", {})
     all_devices = {
         device["Alias"]: device["Address"] for device in devices.values()
     }
+    paths = {device["Address"]: path for path, device in devices.items()}
     selected = dmenu_show("Bluetooth:", recent.list(all_devices.keys()))
     if not selected:
         return
@@ -139,13 +151,18 @@ def list_bluetooth(qtile):
                 ],
             )
         )
-    else:
-        from plumbum.cmd import bluetoothctl
-
-        (bluetoothctl << "%s %s\nexit\n" % (action, all_devices[selected]))()
+    elif action in ["connect", "disconnect"]:
+        address = all_devices[selected]
+        call = getattr(cache, action + "_device")(address, paths.get(address))
+        asyncio.ensure_future(call).add_done_callback(_log_bluetooth_failure)
     recent.insert(selected)
 
 
+def _log_bluetooth_failure(future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.warning("bluetooth call failed: %s", future.exception())
+
+
 def get_window_titles(qtile):
     return [w["name"] for w in qtile.windows() if w["name"] != "<no name>"]
 
@@ -201,20 +218,17 @@ def dmenu_pushbullet(qtile):
 
 
 def dmenu_kubectl(qtile):
-    from plumbum.cmd import kubectl
+    from taqtile.kube import get_kube_resources
 
-    clusters = kubectl("config", "get-clusters").split()[1:]
-    cluster = dmenu_show("Cluster:", clusters)
-    pods = json.loads(
-        kubectl("--context", cluster, "get", "po", "-o", "json")
-    ).get("items", [])
-    containermap = {}
-    for pod in pods:
-        containermap[pod.get("metadata", {}).get("name", "unknown")] = [
-            cont["name"] for cont in pod["spec"]["containers"]
-        ]
+    kube = get_kube_resources()
+    cluster = dmenu_show("Cluster:", kube.contexts())
+    if not cluster:
+        return
+    containermap = kube.containers(cluster)
 
-    pod = dmenu_show("Pod:", containermap)
+    pod = dmenu_show("Pod:", sorted(containermap))
+    if not pod:
+        return
 
     op = dmenu_show("Operation", ["logs", "describe", "shell"])
     if op == "logs":
@@ -248,84 +262,57 @@ def switch_wifi(qtile):
     pass
 
 
+def pulse_label(obj):
+    return "%s - %s" % (prop(obj, "application.name"), obj.index)
+
+
+def device_label(obj):
+    return prop(obj, "device.product.name", obj.description)
+
+
 def set_volume(qtile):
+    pulse = get_pulse_model()
+    pulse.wait_ready()
     clients = dict(
-        [
-            (
-                x["properties"]["application.name"],
-                x["index"]
-                # x["properties"].get("application.process.id", None),
-            )
-            for x in json.loads(pactl("--format=json", "list", "sink-inputs"))
-        ]
+        [(prop(x, "application.name"), x.index) for x in pulse.sink_inputs]
     )
     client = dmenu_show("Sink-inputs:", list(clients.keys()))
+    if not client:
+        return
     volume = dmenu_show("Volumes:", list([str(x) for x in range(0, 201, 10)]))
-    pactl(
-        "--format=json", "set-sink-input-volume", clients[client], f"{volume}%"
-    )
+    if not volume:
+        return
+    pulse.set_sink_input_volume(clients[client], int(volume))
 
 
 def switch_pulse_inputs(qtile):
-    source_outputs = dict(
-        [
-            (
-                "%s - %s" % (x["properties"]["application.name"], x["index"]),
-                x
-                # x["properties"].get("application.process.id", None),
-            )
-            for x in json.loads(
-                pactl("--format=json", "list", "source-outputs")
-            )
-        ]
-    )
+    pulse = get_pulse_model()
+    pulse.wait_ready()
+    source_outputs = dict([(pulse_label(x), x) for x in pulse.source_outputs])
     source_output = dmenu_show("source-outputs:", list(source_outputs.keys()))
     if not source_output:
         return
 
-    sources = dict(
-        [
-            (x["properties"]["device.product.name"], x["index"])
-            for x in json.loads(pactl("--format=json", "list", "sources"))
-        ]
-    )
+    sources = dict([(device_label(x), x.index) for x in pulse.sources])
     source = dmenu_show("sources:", list(sources.keys()))
-    pactl(
-        "--format=json",
-        "move-source-output",
-        source_outputs[source_output]["index"],
-        sources[source],
-    )
+    if not source:
+        return
+    pulse.move_source_output(source_outputs[source_output].index, sources[source])
 
 
 def switch_pulse_outputs(qtile):
-    clients = dict(
-        [
-            (
-                "%s - %s" % (x["properties"]["application.name"], x["index"]),
-                x
-                # x["properties"].get("application.process.id", None),
-            )
-            for x in json.loads(pactl("--format=json", "list", "sink-inputs"))
-        ]
-    )
+    pulse = get_pulse_model()
+    pulse.wait_ready()
+    clients = dict([(pulse_label(x), x) for x in pulse.sink_inputs])
     client = dmenu_show("Sink-inputs:", list(clients.keys()))
     if not client:
         return
 
-    sinks = dict(
-        [
-            (x["properties"]["device.product.name"], x["index"])
-            for x in json.loads(pactl("--format=json", "list", "sinks"))
-        ]
-    )
+    sinks = dict([(device_label(x), x.index) for x in pulse.sinks])
     sink = dmenu_show("Sinks:", list(sinks.keys()))
-    pactl(
-        "--format=json",
-        "move-sink-input",
-        clients[client]["index"],
-        sinks[sink],
-    )
+    if not sink:
+        return
+    pulse.move_sink_input(clients[client].index, sinks[sink])
 
 
 def record_window(qtile):
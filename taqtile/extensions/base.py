@@ -22,6 +22,7 @@ from libqtile.backend import base
 from plumbum import local
 
 from taqtile.recent_runner import RecentRunner
+from taqtile.tabs import brotab, get_tab_index
 from taqtile.system import (
     get_current_window,
     get_hostconfig,
@@ -317,7 +318,6 @@ class BroTab(Dmenu):
         ),
         ("dmenu_lines", "80", "Give lines vertically. Set to None get inline"),
     ]
-    _tabs = None
 
     def __init__(self, **config):
         config["dmenu_command"] = "rofi -dmenu"
@@ -330,15 +330,12 @@ class BroTab(Dmenu):
 
     @property
     def tabs(self):
-        if not self._tabs:
-            logger.info("initiailizeing tab list")
-            self._tabs = [x for x in brotab("list").split("\n") if x]
-        return self._tabs
+        return get_tab_index().items()
 
     def run(self):
         # logger.info(self.item_to_win)
         recent = RecentRunner(self.dbname)
-        out = super().run(items=self.tabs)
+        out = super().run(items=get_tab_index().items(recent.recent()))
         screen = self.qtile.current_screen
 
         try:
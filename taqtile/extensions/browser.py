@@ -16,6 +16,7 @@ from libqtile.extension.dmenu import Dmenu, DmenuRun
 from taqtile.system import (
     get_current_window,
     get_hostconfig,
+    get_host_config,
     window_exists,
     get_current_screen,
     get_current_group,
@@ -33,7 +34,10 @@ class BrowserAppLauncher(DmenuRun):
     def __init__(self, **config):
         super().__init__(**config)
         self.add_defaults(self.defaults)
-        self.accounts = get_hostconfig("browser_accounts", [])
+
+    @property
+    def accounts(self):
+        return get_hostconfig("browser_accounts", {})
 
     def handle_selected_item(self, selected, regex, logger) -> None:
         qtile = self.qtile
@@ -45,7 +49,7 @@ class BrowserAppLauncher(DmenuRun):
         if get_current_group(qtile).name != group:
             get_current_screen(qtile).toggle_group(group)
         logger.debug("Does Window exists with regex %s", regex)
-        window = window_exists(self.qtile, re.compile(regex, re.I))
+        window = window_exists(self.qtile, regex)
         logger.debug("Window exists with regex %s: %s", regex, window)
         if window:
             window.togroup(self.group)
@@ -73,15 +77,10 @@ class BrowserAppLauncher(DmenuRun):
                 super().run(items=self.recent.list(self.accounts)).strip()
             )
             logger.info(f"Selected: {selected}")
-            self.handle_selected_item(
-                selected,
-                (
-                    self.accounts[selected]
-                    .get(self.config_key, {"regex": ".*%s.*" % selected})
-                    .get("regex")
-                ),
-                logger,
-            )
+            regex = get_host_config().account_pattern(
+                selected, self.config_key
+            ) or re.compile(".*%s.*" % re.escape(selected), re.I)
+            self.handle_selected_item(selected, regex, logger)
         finally:
             obs_resume_recording()
 
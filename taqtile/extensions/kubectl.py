@@ -1,20 +1,44 @@
 from libqtile.extension.dmenu import Dmenu
-import json
+
+from taqtile.kube import get_kube_resources, pod_label
 
 
 class KubeCtl(Dmenu):
     """
-    Give vertical list of all open windows in dmenu. Switch to selected.
+    Pick a kubernetes context and one of its pods in dmenu.
+
+    Pods are served from the background caches in taqtile.kube. With
+    all_contexts the pods of every context are listed in one menu as
+    cluster/namespace/pod, and the selection is the result of the returned
+    future.
     """
 
     dmenu_prompt = "Kubectl"
+    defaults = [
+        ("all_contexts", False, "list the pods of every context in one menu"),
+        ("context_timeout", 10, "seconds to wait for contexts still listing"),
+    ]
+
+    def __init__(self, **config):
+        Dmenu.__init__(self, **config)
+        self.add_defaults(KubeCtl.defaults)
 
     def run(self, items=None):
-        from plumbum.cmd import kubectl
-
-        clusters = kubectl("config", "get-clusters").split()
-        cluster = super().run(clusters)
-        pods = json.loads(
-            kubectl("--context", cluster, "get", "po", "-o", "json")
-        )
-        return super().run(pods)
+        kube = get_kube_resources()
+        if self.all_contexts:
+            # waiting on the caches blocks, and dmenu reads all of its input
+            # before drawing, so the whole menu runs off the event loop
+            return self.qtile.run_in_executor(self.run_all_contexts, kube)
+        cluster = super().run(kube.contexts())
+        if not cluster:
+            return None
+        return super().run(sorted(kube.containers(cluster)))
+
+    def run_all_contexts(self, kube):
+        labels = [
+            pod_label(context, pod)
+            for context, pod in kube.all_pods(self.context_timeout)
+        ]
+        if not labels:
+            return None
+        return super().run(sorted(labels)).strip()
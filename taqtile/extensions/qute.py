@@ -1,10 +1,9 @@
 from libqtile.hook import subscribe
 from datetime import datetime, timedelta
-import re
 from taqtile.extensions.base import WindowGroupList
 from taqtile.system import (
     get_current_window,
-    get_hostconfig,
+    get_host_config,
 )
 from libqtile import qtile
 import threading
@@ -18,7 +17,8 @@ logger = logging.getLogger(__name__)
 def trigger_dgroups(client):
     if client.get_wm_class()[0] != "qutebrowser":
         return
-    accounts = get_hostconfig("browser_accounts", {})
+    hostconfig = get_host_config()
+    accounts = hostconfig.get("browser_accounts", {})
     if not client.name:
         return
     if "WhatsApp - web.whatsapp.com" in client.name:
@@ -26,8 +26,8 @@ def trigger_dgroups(client):
         return
     for user, config in accounts.items():
         for app in ["calendar", "mail"]:
-            app_regex = config.get(app, {}).get("regex")
-            if re.match(app_regex, client.name, re.I):
+            app_regex = hostconfig.account_pattern(user, app)
+            if app_regex and app_regex.match(client.name):
                 client.togroup(app)
                 return
         profile = config.get("profile", "").lower()
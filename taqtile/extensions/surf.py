@@ -1,5 +1,4 @@
 import os
-import subprocess
 import re
 from datetime import datetime
 from functools import lru_cache
@@ -13,6 +12,7 @@ from libqtile.extension.window_list import WindowList
 from plumbum import local
 
 import logging
+from taqtile.history import HistoryWriter
 from taqtile.recent_runner import RecentRunner
 from taqtile.system import (
     get_current_window,
@@ -23,11 +23,13 @@ from taqtile.system import (
     get_redis,
 )
 from taqtile.extensions.base import WindowGroupList
+from taqtile.selection import get_selection_service
 
 logger = logging.getLogger("taqtile")
 
 SURF_HISTORY_DB = "qtile_surf"
 surf_recent_runner = RecentRunner(SURF_HISTORY_DB)
+surf_history = HistoryWriter(surf_recent_runner)
 BROWSER_MAP = {
     "twitter.com": "qutebrowser",
 }
@@ -49,14 +51,21 @@ def save_history(client):
             None,
         )
         if uri:
-            uri = uri.to_utf8()
-            logger.info(uri)
-            # surf_recent_runner.insert(uri)
-
+            surf_history.record(client.wid, uri.to_utf8())
     except AttributeError:
         logger.exception("failed to get uri updated ")
 
 
+@hook.subscribe.client_killed
+def forget_history(client):
+    surf_history.forget(client.wid)
+
+
+@hook.subscribe.shutdown
+def flush_history():
+    surf_history.flush()
+
+
 class Surf(WindowGroupList):
     """
     Give vertical list of all open windows in dmenu. Switch to selected.
@@ -91,13 +100,9 @@ class Surf(WindowGroupList):
     def list_windows(self):
         items = super().list_windows()
         clip = []
-        try:
-            clip.append(
-                f"clipboard: "
-                + subprocess.check_output(["xclip", "-o"]).decode()
-            )
-        except Exception as e:
-            logger.exception(f"exception getting clip: {e}")
+        text = get_selection_service().get("CLIPBOARD")
+        if text:
+            clip.append(f"clipboard: {text}")
         clip.extend(items)
         return clip
 
@@ -1,3 +1,4 @@
+import asyncio
 import re
 import glob
 import six
@@ -10,8 +11,8 @@ from libqtile.config import (
     ScratchPad,
     DropDown,
 )
+from functools import partial
 from os.path import expanduser, isdir, join, pathsep
-from py_compile import compile
 from subprocess import check_output
 import re
 from taqtile.themes import current_theme
@@ -281,20 +282,35 @@ class RaiseWindowOrSpawn(object):
         logger.debug("No window found spawning: %s", self.cmd)
 
 
-def check_restart(qtile):
+def check_restart(qtile, import_config=True):
+    """Restart qtile once the config tree compiles and loads.
+
+    The checks run in a worker thread so the WM stays responsive while the
+    config is trial imported.
+    """
+    from taqtile import restartcheck
+
     logger.info("check_restart qtile ...")
-    try:
-        for pyfile in glob.glob(os.path.expanduser("~/.config/qtile/*.py")):
-            # log.debug(pyfile)
-            compile(pyfile, doraise=True)
-    except Exception as e:
-        logger.exception("Syntax error")
-    else:
-        # import signal
-        # signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    loop = asyncio.get_event_loop()
+    future = loop.run_in_executor(
+        None, partial(restartcheck.check, import_config=import_config)
+    )
+
+    def done(future):
+        try:
+            errors = future.result()
+        except Exception:
+            logger.exception("restart check failed")
+            return
+        if errors:
+            logger.error("not restarting:\n%s", "\n".join(errors))
+            send_notification("Restart aborted", errors[0][-300:])
+            return
         logger.info("restarting qtile ...")
         qtile.restart()
 
+    future.add_done_callback(done)
+
 
 def autossh_term(title="autossh", port=22, host="localhost", session="default"):
     autossh_py = "autossh.py"
@@ -314,30 +330,40 @@ def autossh_term(title="autossh", port=22, host="localhost", session="default"):
     return cmd
 
 
+MAIL_QUERIES = {
+    "inbox": "(tag:INBOX or tag:inbox) and not (tag:misc) and date:30d..0s and tag:unread and tag:me",
+    "pullrequests": "tag:pullrequests and tag:unread",
+    "drafts": "tag:draft",
+    "Other": "tag:INBOX and tag:unread",
+}
+
+
 def show_mail(qtile):
-    from collections import OrderedDict
-    import notmuch
-
-    queries = OrderedDict()
-    queries[
-        "inbox"
-    ] = "(tag:INBOX or tag:inbox) and not (tag:misc) and date:30d..0s and tag:unread and tag:me"
-    queries["pullrequests"] = "tag:pullrequests and tag:unread"
-    queries["drafts"] = "tag:draft"
-    queries["Other"] = "tag:INBOX and tag:unread"
-    try:
-        db = notmuch.Database()
-        message = []
-        for mbox, query in queries.items():
-            query = db.create_query(query)
-            message.append("%s: %s" % (mbox, query.count_messages()))
-        send_notification(
-            "Mail",
-            "<br>".join(message),
-            # icon=user_icon
-        )
-    except Exception:
-        logger.exception("Error querying notmuch")
+    import asyncio
+    from taqtile.widgets.mail import get_mail_counter
+
+    counter = get_mail_counter()
+    for query in MAIL_QUERIES.values():
+        counter.add_query(query)
+
+    def notify(future):
+        try:
+            counts = future.result()
+            message = [
+                "%s: %s" % (mbox, counts.get(query, 0))
+                for mbox, query in MAIL_QUERIES.items()
+            ]
+            send_notification(
+                "Mail",
+                "<br>".join(message),
+                # icon=user_icon
+            )
+        except Exception:
+            logger.exception("Error querying notmuch")
+
+    # count off the event loop, the notification is sent back on it
+    future = asyncio.get_event_loop().run_in_executor(None, counter.refresh)
+    future.add_done_callback(notify)
 
 
 def hide_show_bar(qtile):
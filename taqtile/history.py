@@ -0,0 +1,56 @@
+"""Buffered browser history.
+
+``surf.save_history`` reads ``_SURF_URI`` on every ``client_name_updated``.
+Its insert into the history table was commented out, since a SQLite write
+per title change is too much. :class:`HistoryWriter` remembers the last uri
+of each window, so title changes that stay on the same page are dropped. It
+counts visits in memory and writes them to the table in one transaction
+every few seconds, and on shutdown.
+"""
+
+import asyncio
+import datetime
+import logging
+
+logger = logging.getLogger("taqtile")
+
+
+class HistoryWriter:
+    def __init__(self, runner, interval=5):
+        self.runner = runner
+        self.interval = interval
+        self.pending = {}
+        self.flushes = 0
+        self._last = {}
+        self._timer = None
+
+    def record(self, window_id, uri):
+        """Count a visit to ``uri`` unless ``window_id`` is already on it."""
+        if not uri or self._last.get(window_id) == uri:
+            return False
+        self._last[window_id] = uri
+        count, _ = self.pending.get(uri, (0, None))
+        self.pending[uri] = (count + 1, datetime.datetime.now())
+        if self._timer is None:
+            self._timer = asyncio.get_event_loop().call_later(
+                self.interval, self.flush
+            )
+        return True
+
+    def forget(self, window_id):
+        self._last.pop(window_id, None)
+
+    def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self.pending = self.pending, {}
+        if not pending:
+            return
+        try:
+            self.runner.insert_many(pending)
+            self.flushes += 1
+        except Exception:
+            logger.exception(
+                "failed to write %s history entries", len(pending)
+            )
@@ -0,0 +1,48 @@
+import asyncio
+import os
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+
+from taqtile.history import HistoryWriter
+from taqtile.recent_runner import RecentRunner
+
+
+class HistoryWriterTest(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.runner = RecentRunner(
+            "qtile_surf", dbpath=os.path.join(self.dir.name, "history.db")
+        )
+        self.writer = HistoryWriter(self.runner, interval=0.01)
+
+    def tearDown(self):
+        self.runner.conn.close()
+        self.dir.cleanup()
+
+    def counts(self):
+        return dict(
+            self.runner.conn.execute("select command, count from qtile_surf")
+        )
+
+    async def test_batches_and_dedupes_per_window(self):
+        for _ in range(5):
+            self.writer.record(1, "https://a.example")
+        self.writer.record(2, "https://a.example")
+        self.writer.record(1, "https://b.example")
+        self.writer.record(1, "https://a.example")
+        self.assertEqual(self.counts(), {})
+        await asyncio.sleep(0.05)
+        self.assertEqual(self.writer.flushes, 1)
+        self.assertEqual(
+            self.counts(), {"https://a.example": 3, "https://b.example": 1}
+        )
+
+    async def test_flush_adds_to_existing_counts(self):
+        self.runner.insert("https://a.example")
+        self.writer.record(1, "https://a.example")
+        self.writer.forget(1)
+        self.writer.record(1, "https://a.example")
+        self.writer.flush()
+        self.assertEqual(self.counts(), {"https://a.example": 3})
+        self.writer.flush()
+        self.assertEqual(self.writer.flushes, 1)
@@ -1,3 +1,4 @@
+import asyncio
 import signal
 import logging
 import os
@@ -10,9 +11,13 @@ from taqtile.system import (
     get_hostconfig,
     get_num_monitors,
     execute_once,
-    hdmi_connected,
     get_windows_map,
 )
+from taqtile.monitors import get_monitor_topology
+from taqtile.dbus_bluetooth import get_bluez_cache
+from taqtile.kube import get_kube_resources
+from taqtile.selection import get_selection_service
+from taqtile.telemetry import get_telemetry, start_telemetry
 
 
 logger = logging.getLogger(__name__)
@@ -20,7 +25,6 @@ logger = logging.getLogger(__name__)
 
 num_monitors = get_num_monitors()
 prev_timestamp = 0
-prev_state = hdmi_connected()
 
 
 # @hook.subscribe.screen_change
@@ -62,12 +66,26 @@ def startup():
     #        # send_notification("Qtile startup apps errored.", "")
     from libqtile import qtile
 
+    get_monitor_topology().watch(asyncio.get_event_loop())
+    get_selection_service().watch(asyncio.get_event_loop())
+    start_telemetry(
+        qtile, asyncio.get_event_loop(), get_hostconfig("telemetry_textfile")
+    )
+    get_bluez_cache().start().add_done_callback(_log_bluez_failure)
+    # list the pods of every context before a menu asks for them
+    qtile.run_in_executor(get_kube_resources().start)
     qtile.togroup("home")
 
 
+def _log_bluez_failure(task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning("bluez cache unavailable: %s", task.exception())
+
+
 @hook.subscribe.shutdown
 def shutdown():
-    pass
+    get_telemetry().stop()
+    get_kube_resources().stop()
 
 
 # @hook.subscribe.startup
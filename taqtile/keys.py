@@ -46,6 +46,7 @@ from taqtile.extra import (
 from taqtile.hooks import set_groups
 from taqtile.log import logger
 from taqtile.screens import PRIMARY_SCREEN, SECONDARY_SCREEN
+from taqtile.sticky import get_sticky_windows
 from taqtile.system import get_hostconfig, show_process_stats
 from taqtile.themes import current_theme, dmenu_cmd_args
 from taqtile.themes import default_params
@@ -59,31 +60,25 @@ from taqtile.utils import send_notification
 
 re_vol = re.compile(r"\[(\d?\d?\d?)%\]")
 re_touchpad = re.compile(r".*TouchpadOff\s*= 1", re.DOTALL)
-win_map = {}
 
 
 def toggle_stick_win(qtile):
-    win_list = win_map.setdefault(qtile.current_group.screen.index, [])
-    if qtile.current_window in win_list:
-        win_list.remove(qtile.current_window)
-        send_notification("Window Stuck", f"{qtile.current_window.name}")
+    window = qtile.current_window
+    if get_sticky_windows().toggle(window, qtile.current_group.screen.index):
+        send_notification("Window Stuck", f"{window.name}")
     else:
-        win_list.append(qtile.current_window)
-        send_notification("Window UnStuck", f"{qtile.current_window.name}")
+        send_notification("Window UnStuck", f"{window.name}")
 
 
 def stick_win(qtile):
-    win_list = win_map.setdefault(qtile.current_group.screen.index, [])
-    win_list.append(qtile.current_window)
+    get_sticky_windows().stick(
+        qtile.current_window, qtile.current_group.screen.index
+    )
     send_notification("Window Stuck", f"{qtile.current_window.name}")
 
 
 def unstick_win(qtile):
-    win_list = win_map.setdefault(qtile.current_group.screen.index, [])
-    try:
-        win_list.remove(qtile.current_window)
-    except ValueError:
-        logger.exception("error")
+    get_sticky_windows().unstick(qtile.current_window)
     send_notification("Window UnStuck", f"{qtile.current_window.name}")
 
 
@@ -91,39 +86,14 @@ def unstick_win(qtile):
 def client_focus(client):
     from libqtile import qtile
 
-    for wg, win_list in win_map.items():
-        for w in win_list:
-            if not w:
-                continue
-            try:
-                if wg != qtile.current_group.screen.index:
-                    logger.info(
-                        f"group: {w.group.screen.index} != {qtile.current_group.screen.index}"
-                    )
-                    continue
-                w.bring_to_front()
-            except ValueError:
-                pass
+    get_sticky_windows().on_focus(qtile)
 
 
 @hook.subscribe.setgroup
 def setgroup():
     from libqtile import qtile
 
-    for wg, win_list in win_map.items():
-        for w in win_list:
-            if not w:
-                continue
-            try:
-                if wg != qtile.current_group.screen.index:
-                    logger.info(
-                        f"group: {w.group.screen.index} != {qtile.current_group.screen.index}"
-                    )
-                    continue
-                w.togroup(qtile.current_group.name)
-                w.focus()
-            except ValueError:
-                pass
+    get_sticky_windows().on_setgroup(qtile)
 
 
 class Key(QKey):
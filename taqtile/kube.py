@@ -0,0 +1,288 @@
+"""Background cache of Kubernetes pods per context.
+
+``dmenu_kubectl`` and the ``KubeCtl`` extension forked ``kubectl config
+get-clusters`` and then ``kubectl get po -o json`` on every invocation, and
+parsed multi-megabyte pod lists on the WM thread. :class:`PodCache` lists the
+pods of one context once on a worker thread and then follows a ``kubectl get
+--watch-only --output-watch-events -o json`` stream, started before the
+list so nothing is missed in between. Each burst of events is applied with
+one copy of the index. It only keeps a compact pod -> containers index, so
+menus are served from memory. The watch is restarted with backoff when
+kubectl exits. :class:`KubeResources` hands out one cache per context and
+starts them all at qtile startup, so menus never wait on a first list. It
+re-reads the context list only when the kubeconfig changes.
+"""
+
+import codecs
+import json
+import logging
+import os
+import subprocess
+import threading
+import time
+from collections import namedtuple
+from os.path import expanduser
+
+logger = logging.getLogger("taqtile")
+
+KUBECTL = "kubectl"
+Pod = namedtuple("Pod", "namespace name containers phase")
+
+
+def pod_entry(obj):
+    metadata = obj.get("metadata", {})
+    return Pod(
+        metadata.get("namespace", "default"),
+        metadata.get("name", "unknown"),
+        tuple(c["name"] for c in obj.get("spec", {}).get("containers", [])),
+        obj.get("status", {}).get("phase"),
+    )
+
+
+def iter_json_batches(stream, chunk_size=65536):
+    """Yield the JSON documents of a stream of concatenated documents.
+
+    Documents completed by the same read are yielded together as a list.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    while True:
+        chunk = stream.read1(chunk_size)
+        if not chunk:
+            return
+        buf += text.decode(chunk)
+        docs = []
+        while True:
+            buf = buf.lstrip()
+            if not buf:
+                break
+            try:
+                doc, end = decoder.raw_decode(buf)
+            except ValueError:
+                # incomplete document, wait for more
+                break
+            buf = buf[end:]
+            docs.append(doc)
+        if docs:
+            yield docs
+
+
+def pod_label(context, pod):
+    return "%s/%s/%s" % (context, pod.namespace, pod.name)
+
+
+class PodCache:
+    def __init__(
+        self,
+        context,
+        kubectl=KUBECTL,
+        namespace=None,
+        max_backoff=60,
+    ):
+        self.context = context
+        self.kubectl = kubectl
+        self.namespace = namespace
+        self.max_backoff = max_backoff
+        self.pods = {}
+        self.ready = threading.Event()
+        self.lists = 0
+        self.events = 0
+        self._process = None
+        self._thread = None
+        self._stopped = False
+
+    @property
+    def containers(self):
+        """Pod name -> container names, as shown in the menus."""
+        return {pod.name: list(pod.containers) for pod in self.pods.values()}
+
+    def command(self, *args):
+        cmd = [self.kubectl, "--context", self.context, "get", "pods"]
+        if self.namespace:
+            cmd += ["--namespace", self.namespace]
+        return cmd + ["-o", "json"] + list(args)
+
+    def start(self):
+        if self._thread is None:
+            self._stopped = False
+            self._thread = threading.Thread(
+                target=self._run,
+                name="taqtile-kube-%s" % self.context,
+                daemon=True,
+            )
+            self._thread.start()
+
+    def stop(self):
+        self._stopped = True
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.terminate()
+
+    def wait_ready(self, timeout=10):
+        self.start()
+        return self.ready.wait(timeout)
+
+    def _run(self):
+        delay = 1
+        while not self._stopped:
+            started = time.monotonic()
+            try:
+                # watch before listing so no change falls between the two,
+                # events queued meanwhile are applied on top of the list
+                self._start_watch()
+                self._list()
+                self._follow()
+            except Exception:
+                logger.exception("kubectl watch failed for %s", self.context)
+            finally:
+                self._stop_watch()
+            if self._stopped:
+                return
+            if time.monotonic() - started > self.max_backoff:
+                delay = 1
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
+
+    def _list(self):
+        output = subprocess.run(
+            self.command(), capture_output=True, check=True
+        ).stdout
+        pods = {}
+        for obj in json.loads(output).get("items", []):
+            pod = pod_entry(obj)
+            pods[pod.namespace, pod.name] = pod
+        # replace the whole index, readers keep iterating the old one
+        self.pods = pods
+        self.lists += 1
+        self.ready.set()
+
+    def _start_watch(self):
+        # --watch-only: the list already has every pod, a replay of them
+        # all as ADDED events would only be applied again
+        self._process = subprocess.Popen(
+            self.command("--watch-only", "--output-watch-events"),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+
+    def _follow(self):
+        for events in iter_json_batches(self._process.stdout):
+            self._apply(events)
+
+    def _stop_watch(self):
+        process = self._process
+        if process is None:
+            return
+        if process.poll() is None:
+            process.terminate()
+        process.wait()
+        process.stdout.close()
+
+    def _apply(self, events):
+        """Apply a burst of watch events with one copy of the index."""
+        pods = dict(self.pods)
+        try:
+            for event in events:
+                kind = event.get("type")
+                obj = event.get("object", {})
+                if kind == "ERROR":
+                    # typically an expired resource version, list again
+                    raise RuntimeError(obj.get("message", "watch error"))
+                pod = pod_entry(obj)
+                if kind == "DELETED":
+                    pods.pop((pod.namespace, pod.name), None)
+                else:
+                    pods[pod.namespace, pod.name] = pod
+                self.events += 1
+        finally:
+            self.pods = pods
+
+
+def kubeconfig_files():
+    return os.environ.get("KUBECONFIG", expanduser("~/.kube/config")).split(
+        os.pathsep
+    )
+
+
+class KubeResources:
+    def __init__(self, kubectl=KUBECTL):
+        self.kubectl = kubectl
+        self.caches = {}
+        self._contexts = None
+        self._mtimes = None
+
+    def _kubeconfig_mtimes(self):
+        mtimes = []
+        for path in kubeconfig_files():
+            try:
+                mtimes.append(os.stat(path).st_mtime)
+            except OSError:
+                mtimes.append(None)
+        return mtimes
+
+    def contexts(self):
+        mtimes = self._kubeconfig_mtimes()
+        if self._contexts is None or mtimes != self._mtimes:
+            output = subprocess.run(
+                [self.kubectl, "config", "get-contexts", "-o", "name"],
+                capture_output=True,
+                text=True,
+            ).stdout
+            self._contexts = output.split()
+            self._mtimes = mtimes
+        return self._contexts
+
+    def cache(self, context):
+        cache = self.caches.get(context)
+        if cache is None:
+            cache = self.caches[context] = PodCache(context, self.kubectl)
+            cache.start()
+        return cache
+
+    def start(self):
+        """Start the cache of every context, this forks kubectl once."""
+        try:
+            contexts = self.contexts()
+        except OSError as e:
+            logger.info("not watching kubernetes pods: %s", e)
+            return
+        for context in contexts:
+            self.cache(context)
+
+    def stop(self):
+        for cache in self.caches.values():
+            cache.stop()
+
+    def containers(self, context):
+        """Pod -> containers of ``context``, as cached right now."""
+        cache = self.cache(context)
+        if not cache.ready.is_set():
+            logger.info("pods of %s are still being listed", context)
+        return cache.containers
+
+    def all_pods(self, timeout=10):
+        """``(context, pod)`` for the pods of every context.
+
+        Waits up to ``timeout`` seconds in total for caches that have not
+        listed yet, and skips them after that. Call it off the event loop.
+        """
+        caches = [self.cache(context) for context in self.contexts()]
+        deadline = time.monotonic() + timeout
+        pods = []
+        for cache in caches:
+            if not cache.ready.wait(max(deadline - time.monotonic(), 0)):
+                logger.warning("timed out listing pods of %s", cache.context)
+                continue
+            pods.extend((cache.context, pod) for pod in cache.pods.values())
+        return pods
+
+
+_kube_resources = None
+
+
+def get_kube_resources():
+    global _kube_resources
+    if _kube_resources is None:
+        _kube_resources = KubeResources()
+    return _kube_resources
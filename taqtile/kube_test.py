@@ -0,0 +1,236 @@
+import json
+import os
+import stat
+import sys
+import tempfile
+import time
+from unittest import TestCase
+
+from taqtile.kube import KubeResources, PodCache, pod_label
+
+FAKE_KUBECTL = """#!%s
+import json, os, sys, time
+
+state = os.environ["FAKE_KUBE_DIR"]
+args = sys.argv[1:]
+with open(os.path.join(state, "calls"), "a") as f:
+    f.write(" ".join(args) + "\\n")
+if args[:2] == ["config", "get-contexts"]:
+    print("prod\\nstaging")
+    sys.exit()
+delay = os.path.join(state, "delay-" + args[1])
+if os.path.exists(delay):
+    with open(delay) as f:
+        time.sleep(float(f.read()))
+with open(os.path.join(state, "pods.json")) as f:
+    pods = json.load(f)
+if not any(arg.startswith("--watch") for arg in args):
+    print(json.dumps({"items": pods}, indent=2))
+    sys.exit()
+if "--watch-only" not in args:
+    for pod in pods:
+        # kubectl pretty prints each event over several lines
+        print(json.dumps({"type": "ADDED", "object": pod}, indent=2), flush=True)
+events = os.path.join(state, "events")
+offset = 0
+while True:
+    if os.path.exists(events):
+        with open(events) as f:
+            f.seek(offset)
+            data = f.read()
+            offset = f.tell()
+        sys.stdout.write(data)
+        sys.stdout.flush()
+    time.sleep(0.01)
+""" % (sys.executable,)
+
+
+def pod(name, *containers, namespace="default"):
+    return {
+        "metadata": {"name": name, "namespace": namespace},
+        "spec": {"containers": [{"name": c} for c in containers]},
+        "status": {"phase": "Running"},
+    }
+
+
+class PodCacheTest(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.state = self.dir.name
+        self.kubectl = os.path.join(self.state, "kubectl")
+        with open(self.kubectl, "w") as f:
+            f.write(FAKE_KUBECTL)
+        os.chmod(self.kubectl, os.stat(self.kubectl).st_mode | stat.S_IEXEC)
+        with open(os.path.join(self.state, "pods.json"), "w") as f:
+            json.dump([pod("api", "app", "sidecar"), pod("db", "postgres")], f)
+        os.environ["FAKE_KUBE_DIR"] = self.state
+        self.cache = PodCache("prod", kubectl=self.kubectl)
+
+    def tearDown(self):
+        self.cache.stop()
+        del os.environ["FAKE_KUBE_DIR"]
+        self.dir.cleanup()
+
+    def emit(self, kind, obj):
+        with open(os.path.join(self.state, "events"), "a") as f:
+            f.write(json.dumps({"type": kind, "object": obj}, indent=2) + "\n")
+
+    def wait_for(self, condition):
+        for _ in range(300):
+            if condition():
+                return
+            time.sleep(0.01)
+        self.fail("cache did not catch up")
+
+    def calls(self):
+        with open(os.path.join(self.state, "calls")) as f:
+            return f.read().splitlines()
+
+    def test_lists_once_then_follows_watch_events(self):
+        self.assertTrue(self.cache.wait_ready(5))
+        self.assertEqual(
+            self.cache.containers,
+            {"api": ["app", "sidecar"], "db": ["postgres"]},
+        )
+        self.emit("ADDED", pod("worker", "celery"))
+        self.wait_for(lambda: "worker" in self.cache.containers)
+        self.emit("MODIFIED", pod("api", "app"))
+        self.wait_for(lambda: self.cache.containers["api"] == ["app"])
+        self.emit("DELETED", pod("db", "postgres"))
+        self.wait_for(lambda: "db" not in self.cache.containers)
+        self.assertEqual(self.cache.lists, 1)
+        # the existing pods are not replayed as events
+        self.assertEqual(self.cache.events, 3)
+        self.assertEqual(
+            sorted(self.calls()),
+            [
+                "--context prod get pods -o json",
+                "--context prod get pods -o json --watch-only "
+                "--output-watch-events",
+            ],
+        )
+
+    def test_events_of_one_read_are_applied_together(self):
+        self.cache.pods = {}
+        self.cache._apply(
+            [
+                {"type": "ADDED", "object": pod("a", "x")},
+                {"type": "ADDED", "object": pod("b", "y")},
+                {"type": "DELETED", "object": pod("a", "x")},
+            ]
+        )
+        self.assertEqual(self.cache.containers, {"b": ["y"]})
+        self.assertEqual(self.cache.events, 3)
+
+    def test_watch_error_lists_again(self):
+        self.assertTrue(self.cache.wait_ready(5))
+        self.wait_for(lambda: len(self.calls()) == 2)
+        self.emit("ERROR", {"message": "too old resource version"})
+        self.wait_for(lambda: self.cache.lists == 2)
+
+
+class KubeResourcesTest(TestCase):
+    def test_contexts_are_read_once_per_kubeconfig_change(self):
+        with tempfile.TemporaryDirectory() as state:
+            kubectl = os.path.join(state, "kubectl")
+            with open(kubectl, "w") as f:
+                f.write(FAKE_KUBECTL)
+            os.chmod(kubectl, 0o755)
+            kubeconfig = os.path.join(state, "config")
+            open(kubeconfig, "w").close()
+            env = {"FAKE_KUBE_DIR": state, "KUBECONFIG": kubeconfig}
+            old = {key: os.environ.get(key) for key in env}
+            os.environ.update(env)
+            try:
+                kube = KubeResources(kubectl)
+                self.assertEqual(kube.contexts(), ["prod", "staging"])
+                self.assertEqual(kube.contexts(), ["prod", "staging"])
+                os.utime(kubeconfig, (0, 0))
+                kube.contexts()
+                with open(os.path.join(state, "calls")) as f:
+                    self.assertEqual(len(f.read().splitlines()), 2)
+            finally:
+                for key, value in old.items():
+                    if value is None:
+                        os.environ.pop(key)
+                    else:
+                        os.environ[key] = value
+
+
+class CachedContainersTest(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.state = self.dir.name
+        self.kubectl = os.path.join(self.state, "kubectl")
+        with open(self.kubectl, "w") as f:
+            f.write(FAKE_KUBECTL)
+        os.chmod(self.kubectl, 0o755)
+        with open(os.path.join(self.state, "pods.json"), "w") as f:
+            json.dump([pod("api", "app")], f)
+        with open(os.path.join(self.state, "delay-prod"), "w") as f:
+            f.write("5")
+        os.environ["FAKE_KUBE_DIR"] = self.state
+        self.kube = KubeResources(self.kubectl)
+
+    def tearDown(self):
+        self.kube.stop()
+        del os.environ["FAKE_KUBE_DIR"]
+        self.dir.cleanup()
+
+    def test_start_lists_every_context_without_waiting(self):
+        self.kube.start()
+        self.assertEqual(sorted(self.kube.caches), ["prod", "staging"])
+        self.assertTrue(self.kube.caches["staging"].wait_ready(5))
+        self.assertEqual(self.kube.containers("staging"), {"api": ["app"]})
+        # prod has not listed yet, what is cached is returned right away
+        start = time.monotonic()
+        self.assertEqual(self.kube.containers("prod"), {})
+        self.assertLess(time.monotonic() - start, 1)
+
+
+class AllPodsTest(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.state = self.dir.name
+        self.kubectl = os.path.join(self.state, "kubectl")
+        with open(self.kubectl, "w") as f:
+            f.write(FAKE_KUBECTL)
+        os.chmod(self.kubectl, 0o755)
+        with open(os.path.join(self.state, "pods.json"), "w") as f:
+            json.dump([pod("api", "app", namespace="web")], f)
+        os.environ["FAKE_KUBE_DIR"] = self.state
+        self.kube = KubeResources(self.kubectl)
+
+    def tearDown(self):
+        self.kube.stop()
+        del os.environ["FAKE_KUBE_DIR"]
+        self.dir.cleanup()
+
+    def delay(self, context, seconds):
+        with open(os.path.join(self.state, "delay-" + context), "w") as f:
+            f.write(str(seconds))
+
+    def pod_lists(self):
+        with open(os.path.join(self.state, "calls")) as f:
+            return [
+                c
+                for c in f.read().splitlines()
+                if " get pods " in c and "--watch" not in c
+            ]
+
+    def test_every_context(self):
+        self.delay("prod", 0.5)
+        labels = [pod_label(c, p) for c, p in self.kube.all_pods()]
+        self.assertEqual(labels, ["prod/web/api", "staging/web/api"])
+
+    def test_slow_context_is_skipped(self):
+        self.delay("prod", 5)
+        start = time.monotonic()
+        labels = [pod_label(c, p) for c, p in self.kube.all_pods(timeout=0.5)]
+        self.assertLess(time.monotonic() - start, 3)
+        self.assertEqual(labels, ["staging/web/api"])
+
+    def test_served_from_the_pod_caches(self):
+        self.kube.all_pods()
+        self.assertEqual(len(self.kube.all_pods()), 2)
+        self.assertEqual(len(self.pod_lists()), 2)
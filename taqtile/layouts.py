@@ -1,10 +1,137 @@
 import logging
+from libqtile.layout.base import _ClientList
 from libqtile.layout.max import Max as QMax
 
 logger = logging.getLogger(__name__)
 
 
+class IndexedClientList(_ClientList):
+    """
+    _ClientList with constant time membership and position lookups.
+
+    The plain list stays the source of order. A set answers ``in`` and a
+    client -> position map, rebuilt lazily after the order changes, answers
+    ``index``. Cycling focus without adding or moving windows never
+    rescans the list.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._members = set()
+        self._positions = None
+
+    def _reordered(self):
+        self._positions = None
+
+    def index(self, client):
+        if self._positions is None:
+            self._positions = {c: i for i, c in enumerate(self.clients)}
+        try:
+            return self._positions[client]
+        except KeyError:
+            # same error as list.index for callers that expect it
+            raise ValueError("%r is not in list" % (client,)) from None
+
+    def __contains__(self, client):
+        return client in self._members
+
+    @_ClientList.current_client.setter
+    def current_client(self, client):
+        self._current_idx = self.index(client)
+
+    def add_client(self, client, offset_to_current=0, client_position=None):
+        if client_position == "after_current":
+            offset_to_current = 1
+        elif client_position == "before_current":
+            offset_to_current = 0
+        if client_position == "top":
+            pos = 0
+        elif client_position == "bottom":
+            pos = len(self.clients)
+        else:
+            pos = min(max(0, self._current_idx + offset_to_current), len(self))
+        self.clients.insert(pos, client)
+        self._members.add(client)
+        if self._positions is not None and pos == len(self.clients) - 1:
+            # appending shifts nobody
+            self._positions[client] = pos
+        else:
+            self._reordered()
+        self._current_idx = pos
+
+    def append_head(self, client):
+        self._members.add(client)
+        self._reordered()
+        super().append_head(client)
+
+    def append(self, client):
+        super().append(client)
+        self._members.add(client)
+        if self._positions is not None:
+            self._positions[client] = len(self.clients) - 1
+
+    def remove(self, client):
+        if client not in self._members:
+            return None
+        if self._positions is None:
+            # one scan beats rebuilding the map that the removal invalidates
+            idx = self.clients.index(client)
+        else:
+            idx = self._positions[client]
+        self._members.discard(client)
+        del self.clients[idx]
+        if idx == len(self.clients) and self._positions is not None:
+            del self._positions[client]
+        else:
+            self._reordered()
+        if len(self) == 0:
+            self._current_idx = 0
+        elif idx <= self._current_idx:
+            self._current_idx = max(0, self._current_idx - 1)
+        return self[self._current_idx]
+
+    def join(self, other, offset_to_current=0):
+        self._members.update(other.clients)
+        self._reordered()
+        super().join(other, offset_to_current)
+
+    def __setitem__(self, i, value):
+        self._members.discard(self.clients[i])
+        self._members.add(value)
+        self._reordered()
+        super().__setitem__(i, value)
+
+    def rotate_up(self, maintain_index=True):
+        self._reordered()
+        super().rotate_up(maintain_index)
+
+    def rotate_down(self, maintain_index=True):
+        self._reordered()
+        super().rotate_down(maintain_index)
+
+    def swap(self, c1, c2, focus=1):
+        self._reordered()
+        super().swap(c1, c2, focus)
+
+    def shuffle_up(self, maintain_index=True):
+        self._reordered()
+        super().shuffle_up(maintain_index)
+
+    def shuffle_down(self, maintain_index=True):
+        self._reordered()
+        super().shuffle_down(maintain_index)
+
+
 class Max(QMax):
+    def __init__(self, **config):
+        super().__init__(**config)
+        self.clients = IndexedClientList()
+
+    def clone(self, group):
+        c = super().clone(group)
+        c.clients = IndexedClientList()
+        return c
+
     def add_client(self, client, offset_to_current=0, client_position=None):
         if client in self.clients:
             return
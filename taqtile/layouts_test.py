@@ -0,0 +1,95 @@
+import os
+import time
+from unittest import TestCase, skipIf
+
+from taqtile.startup_test import can_import_widgets
+
+# clients added, cycled through and removed by the benchmark
+BENCH_CLIENTS = int(os.environ.get("TAQTILE_LAYOUT_BENCH_CLIENTS", 3000))
+
+
+class Client:
+    def __init__(self, name):
+        self.name = name
+
+
+def exercise(layout, clients):
+    """Add, cycle focus through and remove ``clients``, returns seconds."""
+    start = time.perf_counter()
+    for client in clients:
+        layout.add_client(client)
+        # restarts and set_groups add windows that are already there
+        layout.add_client(client)
+    current = clients[0]
+    for _ in clients:
+        current = layout.focus_next(current)
+        layout.focus(current)
+    for _ in clients:
+        current = layout.focus_previous(current)
+    for client in clients:
+        layout.remove(client)
+    return time.perf_counter() - start
+
+
+@skipIf(not can_import_widgets(), "qtile layouts cannot be imported here")
+class IndexedMaxTest(TestCase):
+    def setUp(self):
+        from taqtile.layouts import Max
+
+        self.layout = Max()
+        self.clients = [Client(str(i)) for i in range(5)]
+        for client in self.clients:
+            self.layout.add_client(client)
+
+    def test_order_matches_client_list(self):
+        from libqtile.layout.base import _ClientList
+
+        plain = _ClientList()
+        for client in self.clients:
+            plain.add_client(client)
+        plain.add_client(Client("top"), client_position="top")
+        self.layout.clients.add_client(Client("top"), client_position="top")
+        self.assertEqual(
+            [c.name for c in self.layout.clients], [c.name for c in plain]
+        )
+        self.assertEqual(
+            self.layout.clients.current_index, plain.current_index
+        )
+
+    def test_duplicates_are_ignored(self):
+        self.layout.add_client(self.clients[2])
+        self.assertEqual(len(self.layout.clients), 5)
+
+    def test_focus_cycles_and_wraps(self):
+        order = list(self.layout.clients)
+        self.assertEqual(self.layout.focus_next(order[-1]), order[0])
+        self.assertEqual(self.layout.focus_previous(order[0]), order[-1])
+        self.assertEqual(self.layout.focus_next(order[1]), order[2])
+
+    def test_remove_and_reorder_keep_index_current(self):
+        clients = self.layout.clients
+        order = list(clients)
+        self.layout.remove(order[1])
+        self.assertNotIn(order[1], clients)
+        self.assertEqual(clients.index(order[2]), 1)
+        clients.rotate_up()
+        self.assertEqual(clients.index(order[2]), 0)
+        clients.swap(order[2], order[0])
+        self.assertEqual(clients.index(order[0]), 0)
+        self.assertEqual(self.layout.focus_previous(order[0]), order[2])
+
+
+@skipIf(not can_import_widgets(), "qtile layouts cannot be imported here")
+class MaxBenchmark(TestCase):
+    def test_add_cycle_remove(self):
+        from libqtile.layout.base import _ClientList
+
+        from taqtile.layouts import Max
+
+        clients = [Client(str(i)) for i in range(BENCH_CLIENTS)]
+        # the same layout on qtile's list backed collection
+        listed = Max()
+        listed.clients = _ClientList()
+        baseline = exercise(listed, clients)
+        indexed = exercise(Max(), clients)
+        self.assertLess(indexed, baseline)
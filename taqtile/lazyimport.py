@@ -0,0 +1,86 @@
+"""Deferred imports for optional subsystems.
+
+Sound effects, OBS, pulse and bluetooth pull in numpy, scipy, pydub,
+websocket and dbus. ``from plumbum.cmd import dmenu`` even searches ``PATH``
+at import and fails if the binary is missing. Loading ``config.py`` paid for
+all of this on hosts that never use those features. :func:`lazy_module` and
+:func:`lazy_command` return stand-ins that do the import or the ``PATH``
+lookup on first use.
+"""
+
+import importlib
+import threading
+
+_lock = threading.Lock()
+
+
+class LazyModule:
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["_name"])
+                    self.__dict__["_module"] = module
+        return module
+
+    @property
+    def loaded(self):
+        return self.__dict__["_module"] is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __repr__(self):
+        state = "loaded" if self.loaded else "not loaded"
+        return "<lazy module %s (%s)>" % (self.__dict__["_name"], state)
+
+
+def lazy_module(name):
+    """Module stand-in that imports ``name`` on first attribute access."""
+    return LazyModule(name)
+
+
+class LazyCommand:
+    """plumbum command resolved on ``PATH`` when first used."""
+
+    def __init__(self, name):
+        self.name = name
+        self._command = None
+
+    @property
+    def command(self):
+        if self._command is None:
+            from plumbum import local
+
+            self._command = local[self.name]
+        return self._command
+
+    def __call__(self, *args, **kwargs):
+        return self.command(*args, **kwargs)
+
+    def __getitem__(self, args):
+        return self.command[args]
+
+    def __lshift__(self, data):
+        return self.command << data
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.command, attr)
+
+    def __repr__(self):
+        return "<lazy command %s>" % self.name
+
+
+def lazy_command(name):
+    return LazyCommand(name)
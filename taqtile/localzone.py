@@ -0,0 +1,117 @@
+"""Local timezone resolution off the startup path.
+
+``screens.py`` used to run ``tzupdate`` at import, blocking every start and
+restart on a geoip lookup for up to five seconds. The
+:class:`TimezoneProvider` starts from the last zone it resolved, saved in
+``~/.cache/taqtile/timezone``, and runs ``tzupdate`` in the background once
+something subscribes. Subscribers such as the ``CalClock`` widget are called
+with the new zone when it differs from the saved one.
+"""
+
+import asyncio
+import logging
+import os
+import time
+
+logger = logging.getLogger("taqtile")
+
+DEFAULT_ZONE = "Australia/Sydney"
+STATE_FILE = os.path.expanduser("~/.cache/taqtile/timezone")
+TZUPDATE = ("tzupdate", "-p", "-s", "5")
+
+
+class TimezoneProvider:
+    def __init__(
+        self, state_file=STATE_FILE, default=DEFAULT_ZONE, command=TZUPDATE
+    ):
+        self.state_file = state_file
+        self.command = command
+        start = time.perf_counter()
+        self.saved = self._load()
+        self.zone = self.saved or default
+        self.load_time = time.perf_counter() - start
+        self.resolve_time = None
+        self.callbacks = []
+        self._task = None
+
+    def _load(self):
+        try:
+            with open(self.state_file) as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def _save(self, zone):
+        try:
+            os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
+            with open(self.state_file, "w") as f:
+                f.write(zone + "\n")
+        except OSError:
+            logger.exception("failed to save timezone to %s", self.state_file)
+
+    def subscribe(self, callback):
+        """Call ``callback(zone)`` whenever the resolved zone changes."""
+        self.callbacks.append(callback)
+        if self._task is None:
+            self._task = asyncio.get_event_loop().create_task(self.resolve())
+
+    def unsubscribe(self, callback):
+        if callback in self.callbacks:
+            self.callbacks.remove(callback)
+
+    async def resolve(self):
+        start = time.perf_counter()
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *self.command,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            stdout, _ = await proc.communicate()
+        except OSError:
+            logger.exception("failed to run %s", self.command[0])
+            return self.zone
+        self.resolve_time = time.perf_counter() - start
+        zone = stdout.decode().strip()
+        if proc.returncode != 0 or not zone:
+            logger.warning(
+                "%s exited with %s, keeping %s",
+                self.command[0],
+                proc.returncode,
+                self.zone,
+            )
+            return self.zone
+        logger.info(self.report())
+        self.set_zone(zone)
+        return zone
+
+    def set_zone(self, zone):
+        if zone == self.saved:
+            return
+        self.saved = self.zone = zone
+        self._save(zone)
+        for callback in list(self.callbacks):
+            try:
+                callback(zone)
+            except Exception:
+                logger.exception("timezone subscriber failed")
+
+    def report(self):
+        """Startup timing: the saved zone lookup against the blocking resolve."""
+        report = "timezone %s loaded in %.2fms" % (self.zone, self.load_time * 1000)
+        if self.resolve_time is not None:
+            report += ", %.2fs of %s kept off the startup path" % (
+                self.resolve_time,
+                self.command[0],
+            )
+        return report
+
+
+_timezone_provider = None
+
+
+def get_timezone_provider():
+    global _timezone_provider
+    if _timezone_provider is None:
+        _timezone_provider = TimezoneProvider()
+    return _timezone_provider
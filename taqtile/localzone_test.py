@@ -0,0 +1,42 @@
+import os
+import sys
+from tempfile import TemporaryDirectory
+from unittest import IsolatedAsyncioTestCase
+
+from taqtile.localzone import TimezoneProvider
+
+
+def echo(zone, code=0):
+    return (sys.executable, "-c", "print(%r); raise SystemExit(%d)" % (zone, code))
+
+
+class TimezoneProviderTest(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.state_file = os.path.join(self.tmp.name, "cache", "timezone")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    async def test_resolves_in_background_and_persists(self):
+        provider = TimezoneProvider(self.state_file, command=echo("Europe/Lisbon"))
+        self.assertEqual(provider.zone, "Australia/Sydney")
+        changes = []
+        provider.subscribe(changes.append)
+        self.assertEqual(provider.zone, "Australia/Sydney")
+        await provider._task
+        self.assertEqual(changes, ["Europe/Lisbon"])
+        self.assertIn("kept off the startup path", provider.report())
+        restarted = TimezoneProvider(self.state_file, command=echo("Europe/Lisbon"))
+        self.assertEqual(restarted.zone, "Europe/Lisbon")
+        restarted.subscribe(changes.append)
+        await restarted._task
+        self.assertEqual(changes, ["Europe/Lisbon"])
+
+    async def test_failed_lookup_keeps_saved_zone(self):
+        provider = TimezoneProvider(self.state_file, command=echo("", 1))
+        changes = []
+        provider.subscribe(changes.append)
+        self.assertEqual(await provider._task, "Australia/Sydney")
+        self.assertEqual(changes, [])
+        self.assertFalse(os.path.exists(self.state_file))
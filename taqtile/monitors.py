@@ -0,0 +1,173 @@
+"""Monitor topology from RandR.
+
+``get_num_monitors`` used to fork ``xrandr | grep | cut`` through a shell and
+cache the answer for the life of the process, and ``hdmi_connected`` read
+sysfs at import. :class:`MonitorTopology` asks RandR directly over one X
+connection. It pipelines the output and crtc requests, and skips them
+entirely while the server's timestamps are unchanged. The configuration
+timestamp only moves with output changes, crtc changes such as
+``xrandr --off`` or a new position move the other one. It watches
+RandR notify events, plus qtile's ``screen_change`` hook, to stay current,
+and calls subscribers with the outputs that changed.
+"""
+
+import logging
+from collections import namedtuple
+
+import xcffib
+import xcffib.randr
+
+logger = logging.getLogger("taqtile")
+
+Output = namedtuple("Output", "name connected x y width height")
+
+RANDR_EVENTS = (
+    xcffib.randr.NotifyMask.ScreenChange
+    | xcffib.randr.NotifyMask.CrtcChange
+    | xcffib.randr.NotifyMask.OutputChange
+)
+
+
+class MonitorTopology:
+    def __init__(self, conn=None, display=None):
+        self.display = display
+        self._conn = conn
+        self.outputs = {}
+        self.timestamps = None
+        self.callbacks = []
+        self.queries = 0
+        self._queried = False
+        self._watching = False
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = xcffib.connect(display=self.display)
+        return self._conn
+
+    @property
+    def root(self):
+        return self.conn.get_setup().roots[self.conn.pref_screen].root
+
+    def _randr(self):
+        return self.conn(xcffib.randr.key)
+
+    def refresh(self):
+        """Re-query RandR, returns the names of outputs that changed."""
+        try:
+            outputs = self._query()
+        except Exception:
+            logger.exception("failed to query RandR outputs")
+            return []
+        if outputs is None:
+            return []
+        changed = [
+            name
+            for name in set(outputs) | set(self.outputs)
+            if outputs.get(name) != self.outputs.get(name)
+        ]
+        self.outputs = outputs
+        if changed:
+            logger.debug("monitor outputs changed: %s", changed)
+            for callback in list(self.callbacks):
+                try:
+                    callback(changed)
+                except Exception:
+                    logger.exception("monitor subscriber failed")
+        return changed
+
+    def _query(self):
+        randr = self._randr()
+        resources = randr.GetScreenResourcesCurrent(self.root).reply()
+        timestamps = (resources.timestamp, resources.config_timestamp)
+        if timestamps == self.timestamps:
+            return None
+        self.queries += 1
+        timestamp = resources.config_timestamp
+        # send every request before waiting on the first reply
+        infos = [
+            randr.GetOutputInfo(output, timestamp) for output in resources.outputs
+        ]
+        infos = [cookie.reply() for cookie in infos]
+        crtcs = {
+            info.crtc: randr.GetCrtcInfo(info.crtc, timestamp)
+            for info in infos
+            if info.crtc
+        }
+        crtcs = {crtc: cookie.reply() for crtc, cookie in crtcs.items()}
+        outputs = {}
+        for info in infos:
+            name = bytes(info.name).decode()
+            crtc = crtcs.get(info.crtc)
+            outputs[name] = Output(
+                name,
+                info.connection == xcffib.randr.Connection.Connected,
+                crtc.x if crtc else 0,
+                crtc.y if crtc else 0,
+                crtc.width if crtc else 0,
+                crtc.height if crtc else 0,
+            )
+        self.timestamps = timestamps
+        return outputs
+
+    def _ensure(self):
+        if not self._queried:
+            self._queried = True
+            self.refresh()
+
+    @property
+    def connected(self):
+        """Connected outputs, left to right and top to bottom."""
+        self._ensure()
+        return sorted(
+            (output for output in self.outputs.values() if output.connected),
+            key=lambda output: (output.x, output.y, output.name),
+        )
+
+    @property
+    def num_monitors(self):
+        return max(len(self.connected), 1)
+
+    def is_connected(self, prefix):
+        """True if an output whose name starts with ``prefix`` is connected."""
+        return any(output.name.startswith(prefix) for output in self.connected)
+
+    def subscribe(self, callback):
+        """Call ``callback(names)`` with the outputs changed by a refresh."""
+        self.callbacks.append(callback)
+
+    def watch(self, loop):
+        """Refresh on RandR notify events read from ``loop``."""
+        if self._watching:
+            return
+        try:
+            self._randr().SelectInput(self.root, RANDR_EVENTS)
+            self.conn.flush()
+        except Exception:
+            logger.exception("failed to watch RandR events")
+            return
+        loop.add_reader(self.conn.get_file_descriptor(), self._on_events)
+        self._watching = True
+
+    def _on_events(self):
+        pending = False
+        while self.conn.poll_for_event():
+            pending = True
+        if pending:
+            self.refresh()
+
+    def on_screen_change(self, *args):
+        self.refresh()
+
+
+_monitor_topology = None
+
+
+def get_monitor_topology():
+    global _monitor_topology
+    if _monitor_topology is None:
+        from libqtile import hook
+
+        _monitor_topology = MonitorTopology()
+        hook.subscribe.screen_change(_monitor_topology.on_screen_change)
+    return _monitor_topology
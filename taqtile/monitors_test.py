@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+import xcffib.randr
+
+from taqtile.monitors import MonitorTopology
+
+CONNECTED = xcffib.randr.Connection.Connected
+DISCONNECTED = xcffib.randr.Connection.Disconnected
+
+
+class Cookie:
+    def __init__(self, log, reply):
+        self.log = log
+        self._reply = reply
+
+    def reply(self):
+        self.log.append("reply")
+        return self._reply
+
+
+class FakeRandr:
+    def __init__(self):
+        self.log = []
+        self.timestamp = 1
+        self.config_timestamp = 1
+        self.outputs = {
+            1: ("eDP-1", CONNECTED, 10),
+            2: ("HDMI-A-1", DISCONNECTED, 0),
+        }
+        self.crtcs = {10: (0, 0, 1920, 1080)}
+
+    def GetScreenResourcesCurrent(self, root):
+        return Cookie(
+            [],
+            SimpleNamespace(
+                timestamp=self.timestamp,
+                config_timestamp=self.config_timestamp,
+                outputs=list(self.outputs),
+            ),
+        )
+
+    def GetOutputInfo(self, output, timestamp):
+        self.log.append("request")
+        name, connection, crtc = self.outputs[output]
+        return Cookie(
+            self.log,
+            SimpleNamespace(name=list(name.encode()), connection=connection, crtc=crtc),
+        )
+
+    def GetCrtcInfo(self, crtc, timestamp):
+        self.log.append("request")
+        x, y, width, height = self.crtcs[crtc]
+        return Cookie(self.log, SimpleNamespace(x=x, y=y, width=width, height=height))
+
+
+class FakeConnection:
+    pref_screen = 0
+
+    def __init__(self):
+        self.randr = FakeRandr()
+
+    def __call__(self, key):
+        return self.randr
+
+    def get_setup(self):
+        return SimpleNamespace(roots=[SimpleNamespace(root=1)])
+
+
+def test_topology_queries_once_until_config_changes():
+    conn = FakeConnection()
+    topology = MonitorTopology(conn=conn)
+    assert topology.num_monitors == 1
+    assert not topology.is_connected("HDMI")
+    assert topology.connected[0].width == 1920
+    # requests are pipelined ahead of the replies
+    assert conn.randr.log == ["request"] * 2 + ["reply"] * 2 + ["request", "reply"]
+    assert topology.refresh() == []
+    assert topology.queries == 1
+
+    changes = []
+    topology.subscribe(changes.append)
+    conn.randr.config_timestamp = 2
+    conn.randr.outputs[2] = ("HDMI-A-1", CONNECTED, 11)
+    conn.randr.crtcs[11] = (1920, 0, 2560, 1440)
+    topology.refresh()
+    assert changes == [["HDMI-A-1"]]
+    assert topology.num_monitors == 2
+    assert topology.is_connected("HDMI")
+    assert [o.name for o in topology.connected] == ["eDP-1", "HDMI-A-1"]
+
+
+def test_topology_follows_crtc_changes():
+    conn = FakeConnection()
+    topology = MonitorTopology(conn=conn)
+    assert topology.connected[0].x == 0
+    changes = []
+    topology.subscribe(changes.append)
+    # SetCrtcConfig moves the timestamp but not the config timestamp
+    conn.randr.timestamp = 2
+    conn.randr.crtcs[10] = (1920, 0, 1920, 1080)
+    topology.refresh()
+    assert changes == [["eDP-1"]]
+    assert topology.connected[0].x == 1920
+    assert topology.queries == 2
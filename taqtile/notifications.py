@@ -0,0 +1,134 @@
+"""Notification queue for the bar's Notify widget.
+
+The widget used to render every notification as it arrived, so a chat app
+flooding the notification server caused several full-width bar redraws a
+second. :class:`NotificationQueue` sits between the server and the widget.
+It keeps at most one pending entry per app, ordered by urgency. An app shows
+at most one notification per ``min_interval``, and whatever arrives in the
+meantime is collapsed into the pending entry ("12 new from slack"). The
+widget pops one entry per frame tick.
+"""
+
+import itertools
+import time
+
+# apps whose notifications are always treated as urgent
+URGENT_APPS = ("slack",)
+
+
+def hint_urgency(notif):
+    """The urgency ``notif`` was sent with."""
+    return getattr(notif.hints.get("urgency"), "value", 1)
+
+
+def urgency(notif, urgent_apps=URGENT_APPS):
+    """The urgency ``notif`` is queued and drawn with."""
+    if notif.app_name.lower() in urgent_apps:
+        return 2
+    return hint_urgency(notif)
+
+
+def expire_after(notif, timeouts):
+    """Seconds until ``notif`` is cleared, None to keep it.
+
+    ``timeouts`` are the widget's defaults per urgency. They are picked by
+    the urgency the notification was sent with, not the forced one of
+    :data:`URGENT_APPS`, whose notifications would otherwise never expire.
+    """
+    if notif.timeout and notif.timeout > 0:
+        return notif.timeout / 1000
+    return timeouts[min(hint_urgency(notif), 2)]
+
+
+class Pending:
+    __slots__ = ("app", "notif", "urgency", "count", "seq")
+
+    def __init__(self, app, notif, urgency, seq):
+        self.app = app
+        self.notif = notif
+        self.urgency = urgency
+        self.count = 1
+        self.seq = seq
+
+    @property
+    def summary(self):
+        if self.count > 1:
+            return "%d new from %s" % (self.count, self.notif.app_name)
+        return self.notif.summary
+
+    @property
+    def body(self):
+        if self.count > 1:
+            return self.notif.summary
+        return self.notif.body
+
+
+class NotificationQueue:
+    def __init__(
+        self,
+        maxlen=32,
+        min_interval=2.0,
+        urgent_apps=URGENT_APPS,
+        clock=time.monotonic,
+    ):
+        self.maxlen = maxlen
+        self.min_interval = min_interval
+        self.urgent_apps = urgent_apps
+        self.clock = clock
+        self.pending = {}
+        self.last_shown = {}
+        self.dropped = 0
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self.pending)
+
+    def push(self, notif):
+        """Queue ``notif``, merging it into its app's pending entry."""
+        app = notif.app_name.lower()
+        level = urgency(notif, self.urgent_apps)
+        entry = self.pending.get(app)
+        if entry is not None:
+            entry.notif = notif
+            entry.count += 1
+            entry.urgency = max(entry.urgency, level)
+            return entry
+        if len(self.pending) >= self.maxlen:
+            # evict the newest of the least urgent entries, or drop the
+            # incoming one if everything pending is more urgent
+            victim = min(
+                self.pending.values(), key=lambda e: (e.urgency, -e.seq)
+            )
+            if victim.urgency > level:
+                self.dropped += 1
+                return None
+            del self.pending[victim.app]
+            self.dropped += victim.count
+        entry = self.pending[app] = Pending(app, notif, level, next(self._seq))
+        return entry
+
+    def ready_in(self, entry, now=None):
+        """Seconds until ``entry``'s app may show another notification."""
+        now = self.clock() if now is None else now
+        last = self.last_shown.get(entry.app)
+        if last is None:
+            return 0
+        return max(last + self.min_interval - now, 0)
+
+    def pop(self):
+        """Return the most urgent entry whose app is not rate limited."""
+        now = self.clock()
+        ready = [e for e in self.pending.values() if not self.ready_in(e, now)]
+        if not ready:
+            return None
+        entry = min(ready, key=lambda e: (-e.urgency, e.seq))
+        del self.pending[entry.app]
+        self.last_shown[entry.app] = now
+        return entry
+
+    def next_ready(self):
+        """Seconds until :meth:`pop` can return something, None if empty."""
+        if not self.pending:
+            return None
+        now = self.clock()
+        return min(self.ready_in(e, now) for e in self.pending.values())
@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+from unittest import TestCase
+
+from taqtile.notifications import NotificationQueue, expire_after
+
+
+def notif(app, summary, urgency=1, timeout=-1):
+    return SimpleNamespace(
+        app_name=app,
+        summary=summary,
+        body="",
+        timeout=timeout,
+        hints={"urgency": SimpleNamespace(value=urgency)},
+    )
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class NotificationQueueTest(TestCase):
+    def setUp(self):
+        self.clock = Clock()
+        self.queue = NotificationQueue(maxlen=3, min_interval=2, clock=self.clock)
+
+    def test_burst_is_collapsed(self):
+        for i in range(12):
+            self.queue.push(notif("Slack", "message %s" % i))
+        self.assertEqual(len(self.queue), 1)
+        entry = self.queue.pop()
+        self.assertEqual(entry.summary, "12 new from Slack")
+        self.assertEqual(entry.body, "message 11")
+        self.assertEqual(entry.urgency, 2)
+
+    def test_per_app_rate_limit(self):
+        self.queue.push(notif("chat", "one"))
+        self.assertEqual(self.queue.pop().summary, "one")
+        self.queue.push(notif("chat", "two"))
+        self.queue.push(notif("chat", "three"))
+        self.assertIsNone(self.queue.pop())
+        self.assertEqual(self.queue.next_ready(), 2)
+        self.clock.now = 2
+        self.assertEqual(self.queue.pop().summary, "2 new from chat")
+        self.assertIsNone(self.queue.next_ready())
+
+    def test_most_urgent_first(self):
+        self.queue.push(notif("mail", "low", urgency=0))
+        self.queue.push(notif("cal", "meeting", urgency=2))
+        self.queue.push(notif("build", "done"))
+        self.assertEqual(
+            [self.queue.pop().summary for _ in range(3)], ["meeting", "done", "low"]
+        )
+
+    def test_bounded(self):
+        self.queue.push(notif("a", "urgent", urgency=2))
+        self.queue.push(notif("b", "normal"))
+        self.queue.push(notif("c", "normal"))
+        self.assertIsNone(self.queue.push(notif("d", "low", urgency=0)))
+        self.queue.push(notif("e", "urgent", urgency=2))
+        self.assertEqual(sorted(self.queue.pending), ["a", "b", "e"])
+        self.assertEqual(self.queue.dropped, 2)
+
+    def test_forced_urgency_keeps_normal_timeout(self):
+        # qtile's defaults for low, normal and critical notifications
+        timeouts = (10, 10, None)
+        self.queue.push(notif("Slack", "message"))
+        entry = self.queue.pop()
+        self.assertEqual(entry.urgency, 2)
+        self.assertEqual(expire_after(entry.notif, timeouts), 10)
+        self.assertIsNone(expire_after(notif("cal", "now", 2), timeouts))
+        self.assertEqual(
+            expire_after(notif("Slack", "x", timeout=1500), timeouts), 1.5
+        )
@@ -0,0 +1,232 @@
+"""Persistent asyncio client for the OBS websocket (protocol v5).
+
+The old helpers opened an ``obsws_python.ReqClient`` lazily and then made a
+blocking ``get_version`` round trip before every call. That happened on each
+``setgroup``, with a three second timeout when OBS was not running.
+:class:`OBSClient` keeps one connection open on its own event loop thread and
+reconnects with exponential backoff. Requests are pipelined: each one carries
+a request id and is matched to its response, so callers never wait on each
+other. The client subscribes to scene events to track the current program
+scene, so switching to the scene already shown costs nothing. Calls made
+while OBS is unreachable fail straight away instead of blocking.
+"""
+
+import asyncio
+import base64
+import hashlib
+import itertools
+import json
+import logging
+import threading
+
+from taqtile.lazyimport import lazy_module
+
+logger = logging.getLogger("taqtile")
+
+websockets = lazy_module("websockets")
+
+OBS_URL = "ws://localhost:4444"
+# EventSubscription.Scenes
+EVENT_SCENES = 1 << 2
+
+OP_HELLO = 0
+OP_IDENTIFY = 1
+OP_IDENTIFIED = 2
+OP_EVENT = 5
+OP_REQUEST = 6
+OP_RESPONSE = 7
+
+
+class OBSRequestError(Exception):
+    def __init__(self, request_type, code, comment=None):
+        super().__init__(
+            "%s failed with %s: %s" % (request_type, code, comment or "")
+        )
+        self.code = code
+
+
+def auth_string(password, salt, challenge):
+    secret = base64.b64encode(
+        hashlib.sha256((password + salt).encode()).digest()
+    )
+    return base64.b64encode(
+        hashlib.sha256(secret + challenge.encode()).digest()
+    ).decode()
+
+
+class OBSClient:
+    def __init__(
+        self,
+        url=OBS_URL,
+        password=None,
+        timeout=3,
+        backoff=1,
+        max_backoff=60,
+        loop=None,
+    ):
+        self.url = url
+        self.password = password
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.loop = loop
+        self.current_scene = None
+        self.connects = 0
+        self.skipped = 0
+        self._ws = None
+        self._pending = {}
+        self._ids = itertools.count(1)
+        self._task = None
+
+    @property
+    def connected(self):
+        return self._ws is not None
+
+    def start(self):
+        """Start connecting, on a private loop thread unless given a loop."""
+        if self._task is not None:
+            return
+        if self.loop is None:
+            self.loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=self.loop.run_forever, name="taqtile-obs", daemon=True
+            ).start()
+        self._task = asyncio.run_coroutine_threadsafe(self._run(), self.loop)
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        delay = self.backoff
+        while True:
+            try:
+                async with websockets.connect(
+                    self.url, open_timeout=self.timeout, max_size=None
+                ) as ws:
+                    await self._identify(ws)
+                    self._ws = ws
+                    self.connects += 1
+                    delay = self.backoff
+                    logger.info("connected to OBS at %s", self.url)
+                    self.loop.create_task(self._sync_scene())
+                    async for message in ws:
+                        self._dispatch(json.loads(message))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug("OBS connection failed: %s", e)
+            finally:
+                self._disconnected()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
+
+    async def _identify(self, ws):
+        hello = json.loads(await ws.recv())["d"]
+        identify = {"rpcVersion": 1, "eventSubscriptions": EVENT_SCENES}
+        auth = hello.get("authentication")
+        if auth:
+            identify["authentication"] = auth_string(
+                self.password or "", auth["salt"], auth["challenge"]
+            )
+        await ws.send(json.dumps({"op": OP_IDENTIFY, "d": identify}))
+        reply = json.loads(await ws.recv())
+        if reply.get("op") != OP_IDENTIFIED:
+            raise ConnectionError("OBS did not identify us: %s" % reply)
+
+    def _disconnected(self):
+        self._ws = None
+        self.current_scene = None
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError("OBS connection lost"))
+
+    async def _sync_scene(self):
+        try:
+            data = await self.request("GetCurrentProgramScene")
+            self.current_scene = data.get("currentProgramSceneName")
+        except Exception:
+            logger.debug("failed to read the current OBS scene", exc_info=True)
+
+    def _dispatch(self, message):
+        op, data = message.get("op"), message.get("d", {})
+        if op == OP_RESPONSE:
+            future = self._pending.pop(data.get("requestId"), None)
+            if future is None or future.done():
+                return
+            status = data.get("requestStatus", {})
+            if status.get("result"):
+                future.set_result(data.get("responseData") or {})
+            else:
+                future.set_exception(
+                    OBSRequestError(
+                        data.get("requestType"),
+                        status.get("code"),
+                        status.get("comment"),
+                    )
+                )
+        elif op == OP_EVENT:
+            if data.get("eventType") == "CurrentProgramSceneChanged":
+                self.current_scene = data["eventData"]["sceneName"]
+
+    async def request(self, request_type, data=None):
+        """Send a request and wait for its response data.
+
+        Any number of requests can be in flight at once.
+        """
+        ws = self._ws
+        if ws is None:
+            raise ConnectionError("OBS is not connected")
+        request_id = str(next(self._ids))
+        future = self._pending[request_id] = asyncio.get_running_loop().create_future()
+        payload = {"requestType": request_type, "requestId": request_id}
+        if data:
+            payload["requestData"] = data
+        try:
+            await ws.send(json.dumps({"op": OP_REQUEST, "d": payload}))
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def set_scene(self, name):
+        if name == self.current_scene:
+            self.skipped += 1
+            return False
+        previous, self.current_scene = self.current_scene, name
+        try:
+            await self.request("SetCurrentProgramScene", {"sceneName": name})
+        except Exception:
+            self.current_scene = previous
+            raise
+        return True
+
+    def submit(self, coro, wait=None):
+        """Run ``coro`` on the client loop from any thread.
+
+        Returns a concurrent future, or its result when ``wait`` seconds are
+        given.
+        """
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+        if wait is None:
+            future.add_done_callback(_log_failure)
+            return future
+        return future.result(wait)
+
+
+def _log_failure(future):
+    if not future.cancelled() and future.exception() is not None:
+        logger.debug("OBS call failed: %s", future.exception())
+
+
+_obs_client = None
+
+
+def get_obs_client():
+    global _obs_client
+    if _obs_client is None:
+        _obs_client = OBSClient()
+        _obs_client.start()
+    return _obs_client
@@ -0,0 +1,120 @@
+import asyncio
+import json
+from unittest import IsolatedAsyncioTestCase
+
+from websockets.asyncio.server import serve
+
+from taqtile.obs import OBSClient, OBSRequestError, auth_string
+
+
+class FakeOBS:
+    """Just enough of the OBS websocket v5 protocol for the client."""
+
+    def __init__(self, password=None):
+        self.password = password
+        self.scene = "main"
+        self.requests = []
+        self.connections = []
+
+    async def handler(self, ws):
+        self.connections.append(ws)
+        hello = {"rpcVersion": 1}
+        if self.password:
+            hello["authentication"] = {"salt": "salt", "challenge": "chal"}
+        await ws.send(json.dumps({"op": 0, "d": hello}))
+        identify = json.loads(await ws.recv())["d"]
+        if self.password and identify.get("authentication") != auth_string(
+            self.password, "salt", "chal"
+        ):
+            await ws.close(4009)
+            return
+        await ws.send(json.dumps({"op": 2, "d": {"negotiatedRpcVersion": 1}}))
+        batch = []
+        async for message in ws:
+            request = json.loads(message)["d"]
+            self.requests.append(request["requestType"])
+            batch.append(request)
+            if request["requestType"] == "Hold":
+                continue
+            # answer everything held so far, newest first
+            for held in reversed(batch):
+                await ws.send(json.dumps(self.respond(held)))
+            batch = []
+
+    def respond(self, request):
+        kind = request["requestType"]
+        data, ok = {}, True
+        if kind == "GetCurrentProgramScene":
+            data = {"currentProgramSceneName": self.scene}
+        elif kind == "SetCurrentProgramScene":
+            self.scene = request["requestData"]["sceneName"]
+        elif kind == "Hold":
+            data = {"held": request["requestId"]}
+        else:
+            ok = False
+        return {
+            "op": 7,
+            "d": {
+                "requestType": kind,
+                "requestId": request["requestId"],
+                "requestStatus": {"result": ok, "code": 100 if ok else 204},
+                "responseData": data,
+            },
+        }
+
+
+class OBSClientTest(IsolatedAsyncioTestCase):
+    async def start(self, password=None):
+        self.obs = FakeOBS(password)
+        self.server = await serve(self.obs.handler, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.client = OBSClient(
+            "ws://127.0.0.1:%s" % port,
+            password=password,
+            backoff=0.05,
+            loop=asyncio.get_running_loop(),
+        )
+        self.client.start()
+        await self.until(lambda: self.client.current_scene)
+
+    async def asyncTearDown(self):
+        self.client.stop()
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def until(self, condition, timeout=2):
+        for _ in range(int(timeout / 0.01)):
+            if condition():
+                return
+            await asyncio.sleep(0.01)
+        self.fail("timed out")
+
+    async def test_tracks_scene_and_skips_redundant_switches(self):
+        await self.start(password="secret")
+        self.assertEqual(self.client.current_scene, "main")
+        self.assertTrue(await self.client.set_scene("face"))
+        self.assertFalse(await self.client.set_scene("face"))
+        self.assertFalse(await self.client.set_scene("face"))
+        self.assertEqual(self.obs.requests.count("SetCurrentProgramScene"), 1)
+        self.assertEqual(self.client.skipped, 2)
+        with self.assertRaises(OBSRequestError):
+            await self.client.request("Unknown")
+
+    async def test_pipelined_requests(self):
+        await self.start()
+        first = asyncio.ensure_future(self.client.request("Hold"))
+        second = asyncio.ensure_future(self.client.request("Hold"))
+        await self.until(lambda: self.obs.requests.count("Hold") == 2)
+        third = await self.client.request("GetCurrentProgramScene")
+        self.assertEqual(third["currentProgramSceneName"], "main")
+        self.assertNotEqual((await first)["held"], (await second)["held"])
+        self.assertEqual(len(self.obs.connections), 1)
+
+    async def test_reconnects(self):
+        await self.start()
+        await self.obs.connections[0].close()
+        await self.until(lambda: not self.client.connected)
+        with self.assertRaises(ConnectionError):
+            await self.client.request("GetCurrentProgramScene")
+        await self.until(lambda: self.client.connects == 2)
+        await self.until(lambda: self.client.current_scene == "main")
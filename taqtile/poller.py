@@ -0,0 +1,151 @@
+"""Shared HTTP polling for bar widgets.
+
+Every url widget used to poll on its own timer with a fresh connection, so
+the same ticker shown on several bars was fetched once per bar. The
+:class:`HTTPPoller` fetches each url once per interval for all subscribers,
+over one pooled ``requests.Session``. It sends ``If-None-Match`` and
+``If-Modified-Since`` so unchanged resources cost a 304, honours
+``Cache-Control: max-age``, backs off on errors and fans the parsed body out
+to every subscriber.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import time
+
+import requests
+
+logger = logging.getLogger("taqtile")
+
+re_max_age = re.compile(r"max-age=(\d+)")
+
+
+class Feed:
+    def __init__(self, url, interval, headers=None, json=True):
+        self.url = url
+        self.interval = interval
+        self.headers = dict(headers or {})
+        self.json = json
+        self.callbacks = []
+        self.body = None
+        self.etag = None
+        self.last_modified = None
+        self.expires = 0
+        self.failures = 0
+        self.fetches = 0
+        self.inflight = None
+        self.task = None
+
+
+class HTTPPoller:
+    def __init__(self, session=None, timeout=10, max_backoff=1800):
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.max_backoff = max_backoff
+        self.feeds = {}
+
+    def subscribe(self, url, callback, interval=600, headers=None, json=True):
+        """Call ``callback(body)`` whenever ``url`` returns a new body.
+
+        Subscribers of the same url share one fetch at the shortest of their
+        intervals. A cached body is delivered straight away. Returns a
+        function that removes the subscription.
+        """
+        feed = self.feeds.get(url)
+        if feed is None:
+            feed = self.feeds[url] = Feed(url, interval, headers, json)
+        feed.interval = min(feed.interval, interval)
+        feed.callbacks.append(callback)
+        if feed.body is not None:
+            self._deliver(callback, feed.body)
+        if feed.task is None or feed.task.done():
+            feed.task = asyncio.get_event_loop().create_task(self._run(feed))
+
+        def unsubscribe():
+            if callback in feed.callbacks:
+                feed.callbacks.remove(callback)
+            if not feed.callbacks and feed.task:
+                feed.task.cancel()
+                feed.task = None
+
+        return unsubscribe
+
+    def _deliver(self, callback, body):
+        try:
+            callback(body)
+        except Exception:
+            logger.exception("poller subscriber failed for %s", callback)
+
+    async def _run(self, feed):
+        while feed.callbacks:
+            changed = await self.fetch(feed)
+            if changed:
+                for callback in list(feed.callbacks):
+                    self._deliver(callback, feed.body)
+            await asyncio.sleep(self._delay(feed))
+
+    def _delay(self, feed):
+        if feed.failures:
+            return min(feed.interval * 2**feed.failures, self.max_backoff)
+        return max(feed.expires - time.monotonic(), feed.interval)
+
+    async def fetch(self, feed):
+        """Fetch ``feed`` unless it is fresh, returns True if the body changed.
+
+        Concurrent callers for the same feed share one request.
+        """
+        if feed.inflight is not None:
+            return await asyncio.shield(feed.inflight)
+        if feed.body is not None and time.monotonic() < feed.expires:
+            return False
+        loop = asyncio.get_event_loop()
+        feed.inflight = loop.run_in_executor(None, self._fetch, feed)
+        try:
+            changed = await asyncio.shield(feed.inflight)
+            feed.failures = 0
+            return changed
+        except Exception:
+            feed.failures += 1
+            logger.warning(
+                "polling %s failed %s times", feed.url, feed.failures
+            )
+            return False
+        finally:
+            feed.inflight = None
+
+    def _fetch(self, feed):
+        headers = dict(feed.headers)
+        if feed.etag:
+            headers["If-None-Match"] = feed.etag
+        if feed.last_modified:
+            headers["If-Modified-Since"] = feed.last_modified
+        response = self.session.get(
+            feed.url, headers=headers, timeout=self.timeout
+        )
+        feed.fetches += 1
+        max_age = re_max_age.search(response.headers.get("Cache-Control", ""))
+        feed.expires = time.monotonic() + max(
+            int(max_age.group(1)) if max_age else 0, feed.interval
+        )
+        if response.status_code == 304:
+            return False
+        response.raise_for_status()
+        feed.etag = response.headers.get("ETag")
+        feed.last_modified = response.headers.get("Last-Modified")
+        body = json.loads(response.text) if feed.json else response.text
+        if body == feed.body:
+            return False
+        feed.body = body
+        return True
+
+
+_http_poller = None
+
+
+def get_http_poller():
+    global _http_poller
+    if _http_poller is None:
+        _http_poller = HTTPPoller()
+    return _http_poller
@@ -0,0 +1,72 @@
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import IsolatedAsyncioTestCase
+
+from taqtile.poller import HTTPPoller
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = []
+    price = 1
+
+    def do_GET(self):
+        StubHandler.requests.append(dict(self.headers))
+        etag = '"%s"' % StubHandler.price
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.dumps({"price": StubHandler.price}).encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HTTPPollerTest(IsolatedAsyncioTestCase):
+    def setUp(self):
+        StubHandler.requests = []
+        StubHandler.price = 1
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = "http://127.0.0.1:%s/price" % self.server.server_port
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    async def test_subscribers_share_requests(self):
+        poller = HTTPPoller()
+        first, second = [], []
+        unsub1 = poller.subscribe(self.url, first.append, interval=60)
+        unsub2 = poller.subscribe(self.url, second.append, interval=60)
+        await asyncio.sleep(0.3)
+        self.assertEqual(len(StubHandler.requests), 1)
+        self.assertEqual(first, [{"price": 1}])
+        self.assertEqual(second, [{"price": 1}])
+        # a late subscriber is served from the cache
+        third = []
+        unsub3 = poller.subscribe(self.url, third.append, interval=60)
+        self.assertEqual(third, [{"price": 1}])
+        for unsub in (unsub1, unsub2, unsub3):
+            unsub()
+        self.assertIsNone(poller.feeds[self.url].task)
+
+    async def test_conditional_requests(self):
+        poller = HTTPPoller()
+        feed_body = []
+        unsub = poller.subscribe(self.url, feed_body.append, interval=0.1)
+        await asyncio.sleep(0.35)
+        unsub()
+        self.assertGreater(len(StubHandler.requests), 1)
+        self.assertEqual(StubHandler.requests[1].get("If-None-Match"), '"1"')
+        # 304 responses are not fanned out again
+        self.assertEqual(feed_body, [{"price": 1}])
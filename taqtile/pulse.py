@@ -0,0 +1,193 @@
+"""In-memory model of the PulseAudio graph.
+
+The dmenu audio actions used to fork ``pactl --format=json list ...`` two or
+three times per menu and parse full JSON dumps just to build labels.
+:class:`PulseModel` keeps sinks, sources, sink inputs and source outputs in
+memory. One pulse connection owned by a worker thread loads them once and
+then follows pulse's subscription events, re-reading only the object an
+event names. Menus read the model without any round trip. Move and volume
+commands are queued to the worker and run over the same connection.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from taqtile.lazyimport import lazy_module
+
+logger = logging.getLogger("taqtile")
+
+pulsectl = lazy_module("pulsectl")
+
+FACILITIES = ("sink", "source", "sink_input", "source_output")
+
+
+def prop(obj, key, default=None):
+    """Property ``key`` of a pulse object, e.g. ``application.name``."""
+    return obj.proplist.get(key, default)
+
+
+class PulseModel:
+    def __init__(
+        self,
+        client_name="taqtile-pulse",
+        connect=None,
+        loop_stop=None,
+        poll_timeout=1,
+        max_backoff=30,
+    ):
+        self.connect = connect or (lambda: pulsectl.Pulse(client_name))
+        self.loop_stop = loop_stop
+        self.poll_timeout = poll_timeout
+        self.max_backoff = max_backoff
+        self.objects = {facility: {} for facility in FACILITIES}
+        self.ready = threading.Event()
+        self.connects = 0
+        self._events = []
+        self._commands = queue.SimpleQueue()
+        self._pulse = None
+        self._thread = None
+
+    @property
+    def sinks(self):
+        return list(self.objects["sink"].values())
+
+    @property
+    def sources(self):
+        return list(self.objects["source"].values())
+
+    @property
+    def sink_inputs(self):
+        return list(self.objects["sink_input"].values())
+
+    @property
+    def source_outputs(self):
+        return list(self.objects["source_output"].values())
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, name="taqtile-pulse", daemon=True
+            )
+            self._thread.start()
+
+    def wait_ready(self, timeout=2):
+        self.start()
+        return self.ready.wait(timeout)
+
+    def _run(self):
+        delay = 1
+        while True:
+            try:
+                self._serve()
+            except Exception:
+                logger.exception("pulse connection failed")
+            self.ready.clear()
+            self._pulse = None
+            self._fail_commands()
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
+
+    def _serve(self):
+        if self.loop_stop is None:
+            self.loop_stop = pulsectl.PulseLoopStop
+        pulse = self.connect()
+        try:
+            self._pulse = pulse
+            self.connects += 1
+            for facility in FACILITIES:
+                self.objects[facility] = {
+                    obj.index: obj for obj in getattr(pulse, facility + "_list")()
+                }
+            pulse.event_mask_set(*FACILITIES)
+            pulse.event_callback_set(self._on_event)
+            self.ready.set()
+            while True:
+                pulse.event_listen(timeout=self.poll_timeout)
+                self._apply_events(pulse)
+                self._run_commands(pulse)
+        finally:
+            pulse.close()
+
+    def _on_event(self, event):
+        # pulse calls can not be made from the callback, leave the loop
+        self._events.append(event)
+        raise self.loop_stop
+
+    def _apply_events(self, pulse):
+        events, self._events = self._events, []
+        for event in events:
+            # facilities are pulsectl enum values, they compare equal to names
+            facility = next((f for f in FACILITIES if event.facility == f), None)
+            if facility is None:
+                continue
+            # copy on write, readers on other threads iterate the old dict
+            objects = dict(self.objects[facility])
+            if event.t == "remove":
+                objects.pop(event.index, None)
+            else:
+                try:
+                    objects[event.index] = getattr(pulse, facility + "_info")(
+                        event.index
+                    )
+                except Exception:
+                    # gone again before we looked
+                    objects.pop(event.index, None)
+            self.objects[facility] = objects
+
+    def _run_commands(self, pulse):
+        while True:
+            try:
+                func, future = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(pulse))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _fail_commands(self):
+        while True:
+            try:
+                _, future = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            future.set_exception(ConnectionError("pulse connection lost"))
+
+    def call(self, func, timeout=5):
+        """Run ``func(pulse)`` on the model's connection and return its result."""
+        if not self.wait_ready():
+            raise ConnectionError("pulse is not connected")
+        future = Future()
+        self._commands.put((func, future))
+        pulse = self._pulse
+        if pulse is not None:
+            pulse.event_listen_stop()
+        return future.result(timeout)
+
+    def move_sink_input(self, index, sink):
+        return self.call(lambda pulse: pulse.sink_input_move(index, sink))
+
+    def move_source_output(self, index, source):
+        return self.call(lambda pulse: pulse.source_output_move(index, source))
+
+    def set_sink_input_volume(self, index, percent):
+        stream = self.objects["sink_input"][index]
+        return self.call(
+            lambda pulse: pulse.volume_set_all_chans(stream, percent / 100)
+        )
+
+
+_pulse_model = None
+
+
+def get_pulse_model():
+    global _pulse_model
+    if _pulse_model is None:
+        _pulse_model = PulseModel()
+        _pulse_model.start()
+    return _pulse_model
@@ -0,0 +1,108 @@
+import threading
+import time
+from types import SimpleNamespace
+from unittest import TestCase
+
+from taqtile.pulse import PulseModel, prop
+
+
+class LoopStop(Exception):
+    pass
+
+
+def stream(index, app):
+    return SimpleNamespace(index=index, proplist={"application.name": app})
+
+
+class FakePulse:
+    def __init__(self):
+        self.sinks = {0: stream(0, "speakers"), 1: stream(1, "headset")}
+        self.inputs = {5: stream(5, "mpv")}
+        self.calls = []
+        self.callback = None
+        self.pending = []
+        self.wakeup = threading.Event()
+        self.threads = set()
+
+    def sink_list(self):
+        return list(self.sinks.values())
+
+    def source_list(self):
+        return []
+
+    def sink_input_list(self):
+        self.calls.append("sink_input_list")
+        return list(self.inputs.values())
+
+    def source_output_list(self):
+        return []
+
+    def sink_input_info(self, index):
+        self.calls.append("sink_input_info")
+        return self.inputs[index]
+
+    def sink_input_move(self, index, sink):
+        self.threads.add(threading.current_thread().name)
+        self.calls.append(("move", index, sink))
+        self.emit("change", "sink_input", index)
+
+    def event_mask_set(self, *masks):
+        pass
+
+    def event_callback_set(self, callback):
+        self.callback = callback
+
+    def emit(self, t, facility, index):
+        self.pending.append(SimpleNamespace(t=t, facility=facility, index=index))
+        self.wakeup.set()
+
+    def event_listen(self, timeout=None):
+        self.wakeup.wait(timeout)
+        self.wakeup.clear()
+        while self.pending:
+            try:
+                self.callback(self.pending.pop(0))
+            except LoopStop:
+                return
+
+    def event_listen_stop(self):
+        self.wakeup.set()
+
+    def close(self):
+        pass
+
+
+class PulseModelTest(TestCase):
+    def setUp(self):
+        self.fake = FakePulse()
+        self.model = PulseModel(connect=lambda: self.fake, loop_stop=LoopStop)
+        self.assertTrue(self.model.wait_ready())
+
+    def until(self, condition):
+        for _ in range(200):
+            if condition():
+                return
+            time.sleep(0.01)
+        self.fail("timed out")
+
+    def test_menus_read_the_model(self):
+        names = [prop(s, "application.name") for s in self.model.sink_inputs]
+        self.assertEqual(names, ["mpv"])
+        for _ in range(10):
+            self.model.sink_inputs
+        self.assertEqual(self.fake.calls, ["sink_input_list"])
+
+    def test_events_update_only_the_named_object(self):
+        self.fake.inputs[6] = stream(6, "firefox")
+        self.fake.emit("new", "sink_input", 6)
+        self.until(lambda: 6 in self.model.objects["sink_input"])
+        self.assertEqual(self.fake.calls, ["sink_input_list", "sink_input_info"])
+        del self.fake.inputs[5]
+        self.fake.emit("remove", "sink_input", 5)
+        self.until(lambda: 5 not in self.model.objects["sink_input"])
+
+    def test_commands_share_the_connection(self):
+        self.model.move_sink_input(5, 1)
+        self.assertIn(("move", 5, 1), self.fake.calls)
+        self.assertEqual(self.fake.threads, {"taqtile-pulse"})
+        self.assertEqual(self.model.connects, 1)
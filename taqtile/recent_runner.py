@@ -68,6 +68,23 @@ class RecentRunner:
             sql = "insert into %s values (?, ?, ?)" % self.dbname
             return c.execute(sql, (now, command, 1))
 
+    def insert_many(self, visits):
+        """Record ``{command: (count, date)}`` in one transaction."""
+        sql = (
+            "insert into %s values (?, ?, ?) on conflict(command) do update "
+            "set date = excluded.date, count = count + excluded.count"
+            % self.dbname
+        )
+        with self.conn:
+            self.conn.execute("begin")
+            self.conn.executemany(
+                sql,
+                [
+                    (date, command, count)
+                    for command, (count, date) in visits.items()
+                ],
+            )
+
     def remove(self, command):
         c = self.conn.cursor()
         sql = "delete from %s  where command = ?" % self.dbname
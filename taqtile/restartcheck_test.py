@@ -0,0 +1,58 @@
+import os
+from tempfile import TemporaryDirectory
+from unittest import TestCase, skipIf
+
+from taqtile import restartcheck
+from taqtile.startup_test import can_import_widgets
+
+
+class RestartCheckTest(TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, "qtile")
+        self.cache_file = os.path.join(self.tmp.name, "cache.json")
+        os.makedirs(os.path.join(self.root, "pkg", "widgets"))
+        for i in range(12):
+            self.write("pkg/widgets/w%s.py" % i, "X = %s\n" % i)
+        self.write("config.py", "from pkg import widgets\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, source):
+        with open(os.path.join(self.root, name), "w") as f:
+            f.write(source)
+
+    def validate(self):
+        return restartcheck.validate([self.root], self.cache_file, workers=2)
+
+    def test_whole_tree_is_checked_incrementally(self):
+        compiled = []
+        original = restartcheck.compile_source
+
+        def counting(path):
+            compiled.append(path)
+            return original(path)
+
+        self.assertEqual(self.validate(), [])
+        restartcheck.compile_source = counting
+        try:
+            self.assertEqual(self.validate(), [])
+            self.assertEqual(compiled, [])
+            self.write("pkg/widgets/w3.py", "def broken(:\n")
+            errors = self.validate()
+            self.assertEqual(len(compiled), 1)
+        finally:
+            restartcheck.compile_source = original
+        self.assertEqual(len(errors), 1)
+        self.assertIn("w3.py", errors[0])
+        # failures are not cached, so they are reported until fixed
+        self.assertEqual(len(self.validate()), 1)
+        self.write("pkg/widgets/w3.py", "X = 3\n")
+        self.assertEqual(self.validate(), [])
+
+    @skipIf(not can_import_widgets(), "qtile cannot load its config here")
+    def test_trial_import_reports_load_errors(self):
+        self.write("config.py", "raise RuntimeError('bad config')\n")
+        error = restartcheck.trial_import(os.path.join(self.root, "config.py"))
+        self.assertIn("bad config", error)
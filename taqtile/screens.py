@@ -1,7 +1,6 @@
 import logging
 from os import path
 from os.path import expanduser
-from subprocess import check_output
 from libqtile.lazy import lazy
 
 from libqtile.config import Screen
@@ -16,9 +15,7 @@ from libqtile.widget import (
     CPUGraph,
     Systray,
     DF,
-    CryptoTicker,
     # PulseVolume as Volume,
-    WindowCount,
     CPU,
     Mpd2 as Mpd,
     GenPollCommand,
@@ -33,6 +30,7 @@ from qtile_extras.popup.toolkit import PopupWidget
 from taqtile.widgets.extended_clock import extended_clock
 
 from taqtile import system
+from taqtile.localzone import get_timezone_provider
 from taqtile.themes import current_theme, default_params
 from taqtile.widgets import CalClock, Clock, TextBox, Button
 from taqtile.themes import default_params
@@ -43,7 +41,7 @@ from taqtile.widgets.bar import Bar, Spacer
 from taqtile.widgets.windowname import WindowName
 from taqtile.widgets.multiscreengroupbox import MultiScreenGroupBox
 from taqtile.widgets.gpu import GPU
-from taqtile.widgets.exchange import ExchangeRate, BitcoinFees
+from taqtile.widgets.exchange import ExchangeRate, BitcoinFees, CryptoTicker
 from taqtile.extensions import (
     WindowList,
     Surf,
@@ -58,6 +56,7 @@ from taqtile.widgets.screenrec import ScreenRecord
 from taqtile.widgets.live import VoiceInputStatusWidget
 from taqtile.widgets.obscontrol import OBSStatusWidget
 from taqtile.widgets.windowcleaner import WindowCleaner
+from taqtile.widgets.windowcount import WindowCount
 
 
 # from widgets.bankbalance import BankBalance
@@ -73,11 +72,7 @@ SECONDARY_SCREEN = system.get_screen(1)
 TERTIARY_SCREEN = system.get_screen(0)
 QUATERNARY_SCREEN = system.get_screen(3)
 
-try:
-    localtimezone = check_output(["tzupdate", "-p", "-s", "5"]).decode().strip()
-except:
-    logger.exception("Failed to automatically set timezone")
-    localtimezone = "Australia/Sydney"
+localtimezone = get_timezone_provider().zone
 
 
 class ScreenNameTextBox(TextBox):
@@ -249,7 +244,7 @@ def get_screens(num_monitors, groups):
             #    api_key=system.passstore("/syncthing/threadripper0/apikey", False),
             #    **default_params()
             # ),
-            CalClock(timezone=localtimezone, **clock_params),
+            CalClock(**clock_params),
             Sep(**sep_params),
             WindowCount(
                 text_format="\uf2d2{num}", show_zero=True, **default_params()
@@ -375,7 +370,7 @@ def get_screens(num_monitors, groups):
             Sep(**sep_params),
             Systray(**systray_params),
             Sep(**sep_params),
-            CalClock(timezone=localtimezone, **clock_params),
+            CalClock(**clock_params),
         ]
         logger.debug("get screens started secondary bar")
         if system.get_hostconfig("battery"):
@@ -401,7 +396,7 @@ def get_screens(num_monitors, groups):
             ),
             Sep(**sep_params),
             CurrentLayout(**current_layout_params),
-            CalClock(timezone=localtimezone, **clock_params),
+            CalClock(**clock_params),
         ]
 
     def get_quaternary_bar():
@@ -418,7 +413,7 @@ def get_screens(num_monitors, groups):
             ),
             Sep(**sep_params),
             CurrentLayout(**current_layout_params),
-            CalClock(timezone=localtimezone, **clock_params),
+            CalClock(**clock_params),
         ]
 
     clock_text = default_params()
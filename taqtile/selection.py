@@ -0,0 +1,233 @@
+"""X selections without xclip.
+
+The Surf menu forked ``xclip -o`` every time it opened and
+``clip.copy_xclip`` forked ``xclip`` to write. qtile already converts
+PRIMARY and CLIPBOARD whenever their owner changes and fires
+``selection_change`` with the text, so :class:`SelectionService` caches those
+contents and serves reads from memory. qtile's core never answers
+``SelectionRequest``, so owning a selection needs a window that does.
+The service makes one on its own X connection, like
+:class:`taqtile.monitors.MonitorTopology`, and answers requests from the
+event loop it was given in :meth:`SelectionService.watch`. Writes then set
+the owner and no process is forked. Writes from other threads are handed to
+that loop. Contents are answered in one property write; INCR transfers are
+not implemented, so text larger than one X request is refused and logged.
+"""
+
+import asyncio
+import logging
+import struct
+
+import xcffib
+import xcffib.xproto
+from xcffib.xproto import Atom, EventMask, PropMode, Time, WindowClass
+
+logger = logging.getLogger("taqtile")
+
+SELECTIONS = ("PRIMARY", "CLIPBOARD")
+TEXT_TARGETS = ("UTF8_STRING", "STRING", "TEXT", "text/plain;charset=utf-8")
+ATOM_NAMES = SELECTIONS + TEXT_TARGETS + ("TARGETS", "ATOM")
+
+
+class SelectionService:
+    def __init__(self, conn=None, display=None):
+        self.display = display
+        self._conn = conn
+        self.contents = {name: "" for name in SELECTIONS}
+        self.owned = {}
+        self.served = 0
+        self._atoms = None
+        self._window = None
+        self._loop = None
+
+    @property
+    def conn(self):
+        if self._conn is None:
+            self._conn = xcffib.connect(display=self.display)
+        return self._conn
+
+    @property
+    def atoms(self):
+        if self._atoms is None:
+            # send every InternAtom before waiting on the first reply
+            cookies = [
+                (name, self.conn.core.InternAtom(False, len(name), name))
+                for name in ATOM_NAMES
+            ]
+            self._atoms = {
+                name: cookie.reply().atom for name, cookie in cookies
+            }
+        return self._atoms
+
+    @property
+    def window(self):
+        if self._window is None:
+            setup = self.conn.get_setup()
+            root = setup.roots[self.conn.pref_screen].root
+            self._window = self.conn.generate_id()
+            self.conn.core.CreateWindow(
+                0,
+                self._window,
+                root,
+                -1,
+                -1,
+                1,
+                1,
+                0,
+                WindowClass.InputOnly,
+                0,
+                0,
+                [],
+            )
+        return self._window
+
+    def on_selection_change(self, name, selection):
+        if name in self.contents:
+            self.contents[name] = selection.get("selection", "")
+
+    def seed(self, qtile):
+        """Start from the selections qtile converted before we subscribed."""
+        for name, selection in getattr(qtile.core, "_selection", {}).items():
+            if not self.contents.get(name):
+                self.on_selection_change(name, selection)
+
+    @property
+    def max_bytes(self):
+        """Largest property a single ChangeProperty request can carry."""
+        # the request length is in 4 byte units, 24 bytes are the header
+        return self.conn.get_maximum_request_length() * 4 - 24
+
+    def get(self, name="CLIPBOARD"):
+        return self.contents.get(name, "")
+
+    def set(self, text, name="CLIPBOARD"):
+        """Own selection ``name`` with ``text``, from any thread."""
+        if self._loop is None:
+            try:
+                self.watch(asyncio.get_running_loop())
+            except RuntimeError:
+                raise RuntimeError(
+                    "selection service is not watching an event loop"
+                ) from None
+        try:
+            on_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self._own(text, name)
+        else:
+            self._loop.call_soon_threadsafe(self._own, text, name)
+
+    def _own(self, text, name):
+        if len(text.encode("utf-8", "replace")) > self.max_bytes:
+            logger.warning(
+                "%s selection of %s characters is too large to serve",
+                name,
+                len(text),
+            )
+        self.owned[name] = self.contents[name] = text
+        self.conn.core.SetSelectionOwner(
+            self.window, self.atoms[name], Time.CurrentTime
+        )
+        self.conn.flush()
+
+    def watch(self, loop):
+        """Answer selection requests read from ``loop``."""
+        if self._loop is not None:
+            return
+        self.window
+        self.conn.flush()
+        loop.add_reader(self.conn.get_file_descriptor(), self._on_events)
+        self._loop = loop
+
+    def _on_events(self):
+        while True:
+            event = self.conn.poll_for_event()
+            if event is None:
+                break
+            if isinstance(event, xcffib.xproto.SelectionRequestEvent):
+                self._answer(event)
+            elif isinstance(event, xcffib.xproto.SelectionClearEvent):
+                self._cleared(event)
+        self.conn.flush()
+
+    def _name(self, atom):
+        for name in SELECTIONS:
+            if self.atoms[name] == atom:
+                return name
+        return None
+
+    def _cleared(self, event):
+        name = self._name(event.selection)
+        if name is not None:
+            # someone else owns it now, qtile reports their text
+            self.owned.pop(name, None)
+
+    def _answer(self, event):
+        name = self._name(event.selection)
+        text = self.owned.get(name)
+        # obsolete clients leave the property unset
+        prop = event.property or event.target
+        if text is None or not self._write(
+            event.requestor, prop, event.target, text
+        ):
+            prop = Atom._None
+        notify = xcffib.xproto.SelectionNotifyEvent.synthetic(
+            event.time, event.requestor, event.selection, event.target, prop
+        )
+        self.conn.core.SendEvent(
+            False, event.requestor, EventMask.NoEvent, notify.pack()
+        )
+
+    def _write(self, requestor, prop, target, text):
+        atoms = self.atoms
+        if target == atoms["TARGETS"]:
+            targets = [atoms["TARGETS"]] + [atoms[t] for t in TEXT_TARGETS]
+            self.conn.core.ChangeProperty(
+                PropMode.Replace,
+                requestor,
+                prop,
+                atoms["ATOM"],
+                32,
+                len(targets),
+                struct.pack("=%dI" % len(targets), *targets),
+            )
+            return True
+        for name in TEXT_TARGETS:
+            if target == atoms[name]:
+                data = text.encode(
+                    "utf-8" if name != "STRING" else "latin-1", "replace"
+                )
+                if len(data) > self.max_bytes:
+                    # would need an INCR transfer, refuse the conversion
+                    logger.warning(
+                        "refusing a %s byte selection request", len(data)
+                    )
+                    return False
+                self.conn.core.ChangeProperty(
+                    PropMode.Replace,
+                    requestor,
+                    prop,
+                    target,
+                    8,
+                    len(data),
+                    data,
+                )
+                self.served += 1
+                return True
+        return False
+
+
+_selection_service = None
+
+
+def get_selection_service():
+    global _selection_service
+    if _selection_service is None:
+        from libqtile import hook, qtile
+
+        _selection_service = SelectionService()
+        hook.subscribe.selection_change(_selection_service.on_selection_change)
+        if qtile is not None:
+            _selection_service.seed(qtile)
+    return _selection_service
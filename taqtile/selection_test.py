@@ -0,0 +1,160 @@
+import struct
+import threading
+from types import SimpleNamespace
+from unittest import TestCase
+
+from taqtile.selection import ATOM_NAMES, SelectionService
+
+
+class Cookie:
+    def __init__(self, reply):
+        self._reply = reply
+
+    def reply(self):
+        return self._reply
+
+
+class FakeCore:
+    def __init__(self):
+        self.calls = []
+
+    def InternAtom(self, only_if_exists, length, name):
+        return Cookie(SimpleNamespace(atom=100 + ATOM_NAMES.index(name)))
+
+    def CreateWindow(self, *args):
+        self.calls.append(("CreateWindow", args[1]))
+
+    def SetSelectionOwner(self, window, selection, time):
+        self.calls.append(("SetSelectionOwner", window, selection))
+
+    def ChangeProperty(self, mode, window, prop, type, format, length, data):
+        self.calls.append(("ChangeProperty", window, prop, type, format, data))
+
+    def SendEvent(self, propagate, destination, mask, event):
+        self.calls.append(("SendEvent", destination, event))
+
+
+class FakeConnection:
+    pref_screen = 0
+
+    def __init__(self):
+        self.core = FakeCore()
+
+    def get_setup(self):
+        return SimpleNamespace(roots=[SimpleNamespace(root=1)])
+
+    def generate_id(self):
+        return 42
+
+    def get_file_descriptor(self):
+        return 7
+
+    def get_maximum_request_length(self):
+        return 16
+
+    def flush(self):
+        pass
+
+
+class FakeLoop:
+    def __init__(self):
+        self.readers = []
+        self.handed_over = []
+
+    def add_reader(self, fd, callback):
+        self.readers.append(fd)
+
+    def call_soon_threadsafe(self, callback, *args):
+        self.handed_over.append(threading.current_thread())
+        callback(*args)
+
+
+class SelectionServiceTest(TestCase):
+    def setUp(self):
+        self.conn = FakeConnection()
+        self.service = SelectionService(conn=self.conn)
+        self.loop = FakeLoop()
+        self.service.watch(self.loop)
+        self.atoms = self.service.atoms
+
+    def request(self, target, prop=55, selection="CLIPBOARD"):
+        self.conn.core.calls.clear()
+        self.service._answer(
+            SimpleNamespace(
+                time=0,
+                requestor=9,
+                selection=self.atoms[selection],
+                target=self.atoms.get(target, target),
+                property=prop,
+            )
+        )
+        return self.conn.core.calls
+
+    def test_reads_come_from_selection_events(self):
+        self.service.on_selection_change(
+            "CLIPBOARD", {"owner": 3, "selection": "https://example.com"}
+        )
+        self.service.on_selection_change("SECONDARY", {"selection": "x"})
+        self.assertEqual(self.service.get(), "https://example.com")
+        self.assertEqual(self.service.get("PRIMARY"), "")
+
+    def test_set_owns_selection_and_answers_requests(self):
+        self.service.set("héllo")
+        self.assertEqual(self.loop.readers, [7])
+        self.assertIn(
+            ("SetSelectionOwner", 42, self.atoms["CLIPBOARD"]),
+            self.conn.core.calls,
+        )
+        self.assertEqual(self.service.get(), "héllo")
+        change, notify = self.request("UTF8_STRING")
+        self.assertEqual(
+            change,
+            (
+                "ChangeProperty",
+                9,
+                55,
+                self.atoms["UTF8_STRING"],
+                8,
+                "héllo".encode(),
+            ),
+        )
+        self.assertEqual(notify[:2], ("SendEvent", 9))
+        self.assertEqual(self.service.served, 1)
+
+    def test_targets_and_unsupported_targets(self):
+        self.service.set("text")
+        change, _ = self.request("TARGETS")
+        self.assertEqual(change[3], self.atoms["ATOM"])
+        targets = struct.unpack("=%dI" % (len(change[5]) // 4), change[5])
+        self.assertIn(self.atoms["UTF8_STRING"], targets)
+        calls = self.request(999)
+        self.assertEqual([call[0] for call in calls], ["SendEvent"])
+
+    def test_clear_stops_serving(self):
+        self.service.set("text", "PRIMARY")
+        self.service._cleared(SimpleNamespace(selection=self.atoms["PRIMARY"]))
+        self.assertNotIn("PRIMARY", self.service.owned)
+        calls = self.request("UTF8_STRING", selection="PRIMARY")
+        self.assertEqual([call[0] for call in calls], ["SendEvent"])
+
+    def test_set_from_another_thread_goes_through_the_loop(self):
+        thread = threading.Thread(target=self.service.set, args=("text",))
+        thread.start()
+        thread.join()
+        self.assertEqual(self.loop.handed_over, [thread])
+        self.assertEqual(self.service.owned["CLIPBOARD"], "text")
+
+    def test_set_needs_a_loop(self):
+        service = SelectionService(conn=FakeConnection())
+        with self.assertRaises(RuntimeError):
+            service.set("text")
+
+    def test_large_selections_are_refused(self):
+        # 16 * 4 - 24 bytes fit in one request of the fake connection
+        self.service.set("x" * 40)
+        self.assertEqual(self.request("UTF8_STRING")[0][0], "ChangeProperty")
+        with self.assertLogs("taqtile", "WARNING"):
+            self.service.set("x" * 41)
+        with self.assertLogs("taqtile", "WARNING"):
+            calls = self.request("UTF8_STRING")
+        self.assertEqual([call[0] for call in calls], ["SendEvent"])
@@ -1,21 +1,15 @@
+import logging
 import threading
-import numpy as np
-import simpleaudio as sa
-from pydub import AudioSegment, generators
-from pydub.playback import play
-import io
-import numpy as np
-import simpleaudio as sa
-from scipy.signal import butter, lfilter
+
 from libqtile.hook import subscribe
-from taqtile.widgets.buttons import requires_toggle_button_active
-from subprocess import check_output
 
-import pulsectl
-import alsaaudio
-import simpleaudio as sa
-import logging
+from taqtile.lazyimport import lazy_module
 from taqtile.utils import send_notification
+from taqtile.widgets.buttons import requires_toggle_button_active
+
+np = lazy_module("numpy")
+sa = lazy_module("simpleaudio")
+pulsectl = lazy_module("pulsectl")
 
 
 logger = logging.getLogger("taqtile")
@@ -74,11 +68,8 @@ def thud(duration=0.5, frequency=300, volume=1):
     # Scale the waveform by the volume and convert to an integer format
     waveform = (volume * waveform * (2**15 - 1)).astype(np.int16)
 
-    # Generate a low-frequency thud with a duration of 0.5 seconds and play it
-    play_obj = sa.play_buffer(
-        waveform, num_channels=1, bytes_per_sample=2, sample_rate=44100
-    )
-    play_obj.wait_done()
+    # Generate a low-frequency thud with a duration of 0.5 seconds
+    return waveform
 
 
 def tone(duration=1, frequency=440):
@@ -173,6 +164,9 @@ def _context_switch_sound(duration=0.15, volume=0.3):
 
 
 def context_switch_sound(duration=15, volume=-30):
+    from pydub import AudioSegment, generators
+    from pydub.playback import play
+
     sample_rate = 48000
 
     # Generate multiple sine waves with different frequencies
@@ -206,7 +200,10 @@ def context_switch_sound(duration=15, volume=-30):
 
 @requires_toggle_button_active("sound_effects")
 def play_effect(effect):
-    threading.Thread(target=thud, args=()).start()
+    from taqtile.sounds.mixer import get_mixer
+
+    mixer = get_mixer()
+    mixer.play(effect if effect in mixer.effects else "thud")
 
 
 def play_sound(filename):
@@ -251,41 +248,41 @@ def change_sink_volume(qtile, increment):
 @requires_toggle_button_active("sound_effects")
 def setgroup():
     # sounds.context_switch_sound()
-    from taqtile.sounds import drums
+    from taqtile.sounds.mixer import get_mixer
 
-    threading.Thread(target=drums.snare_drum, args=()).start()
+    get_mixer().play("snare_drum")
 
 
 @subscribe.client_focus
 @requires_toggle_button_active("sound_effects")
 def client_focused(window):
-    from taqtile.sounds import drums
+    from taqtile.sounds.mixer import get_mixer
 
-    threading.Thread(target=drums.hihat_closed, args=()).start()
+    get_mixer().play("hihat_closed")
 
 
 @subscribe.client_killed
 @requires_toggle_button_active("sound_effects")
 def client_killed(window):
-    from taqtile.sounds import drums
+    from taqtile.sounds.mixer import get_mixer
 
-    threading.Thread(target=drums.hihat_open1, args=()).start()
+    get_mixer().play("hihat_open1")
 
 
 @subscribe.current_screen_change
 @requires_toggle_button_active("sound_effects")
 def screen_change():
-    from taqtile.sounds import drums
+    from taqtile.sounds.mixer import get_mixer
 
-    threading.Thread(target=drums.bass_drum, args=()).start()
+    get_mixer().play("bass_drum")
 
 
 @subscribe.client_managed
 @requires_toggle_button_active("sound_effects")
 def set_group(client):
-    from taqtile.sounds import drums
+    from taqtile.sounds.mixer import get_mixer
 
-    threading.Thread(target=drums.hihat_open0, args=()).start()
+    get_mixer().play("hihat_open0")
 
 
 def set_all_volume(volume):
@@ -1,5 +1,4 @@
 import numpy as np
-import simpleaudio as sa
 from scipy.signal import butter, lfilter
 
 
@@ -32,9 +31,7 @@ def hihat_open0(duration=0.4, volume=0.5):
         np.int16
     )
 
-    # Play the audio using the simpleaudio library
-    play_obj = sa.play_buffer(audio_data, 1, 2, sample_rate)
-    play_obj.wait_done()
+    return audio_data
 
 
 def hihat_open1(duration=0.4, volume=0.5):
@@ -76,9 +73,7 @@ def hihat_open1(duration=0.4, volume=0.5):
         np.int16
     )
 
-    # Play the audio using the simpleaudio library
-    play_obj = sa.play_buffer(audio_data, 1, 2, sample_rate)
-    play_obj.wait_done()
+    return audio_data
 
 
 def snare_drum(duration=0.5, volume=0.02):
@@ -102,9 +97,7 @@ def snare_drum(duration=0.5, volume=0.02):
         np.int16
     )
 
-    # Play the audio using the simpleaudio library
-    play_obj = sa.play_buffer(audio_data, 1, 2, sample_rate)
-    play_obj.wait_done()
+    return audio_data
 
 
 def bass_drum(duration=0.5, frequency=60, volume=0.8):
@@ -124,9 +117,7 @@ def bass_drum(duration=0.5, frequency=60, volume=0.8):
         bass_drum_wave * 32767 / np.max(np.abs(bass_drum_wave))
     ).astype(np.int16)
 
-    # Play the audio using the simpleaudio library
-    play_obj = sa.play_buffer(audio_data, 1, 2, sample_rate)
-    play_obj.wait_done()
+    return audio_data
 
 
 def hihat_closed(duration=0.1, volume=0.5):
@@ -158,6 +149,4 @@ def hihat_closed(duration=0.1, volume=0.5):
         np.int16
     )
 
-    # Play the audio using the simpleaudio library
-    play_obj = sa.play_buffer(audio_data, 1, 2, sample_rate)
-    play_obj.wait_done()
+    return audio_data
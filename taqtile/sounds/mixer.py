@@ -0,0 +1,257 @@
+"""Single output stream sound mixer.
+
+Sound effects used to be played by starting a thread per effect that opened
+its own stream with ``simpleaudio.play_buffer``. Rapid focus cycling could
+create dozens of threads and overlapping ALSA streams.
+
+The :class:`Mixer` owns one output stream and one thread. Hooks call
+:meth:`Mixer.play`, which only appends to a deque (atomic in CPython, so no
+lock is taken on the hook side). The mixer thread drains the deque, keeps a
+bounded pool of active voices, sums them with numpy into fixed size blocks
+and writes each block to the stream.
+"""
+import logging
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+try:
+    import alsaaudio
+except ImportError:
+    alsaaudio = None
+
+try:
+    import simpleaudio as sa
+except ImportError:
+    sa = None
+
+logger = logging.getLogger("taqtile")
+
+SAMPLE_RATE = 44100
+BLOCK_SIZE = 512
+MAX_VOICES = 8
+# minimum seconds between two triggers of the same effect
+DEFAULT_MIN_INTERVAL = 0.03
+
+
+class Voice:
+    __slots__ = ("name", "samples", "position", "gain", "started")
+
+    def __init__(self, name, samples, gain=1.0):
+        self.name = name
+        self.samples = samples
+        self.position = 0
+        self.gain = gain
+        self.started = time.monotonic()
+
+    @property
+    def remaining(self):
+        return len(self.samples) - self.position
+
+    def render(self, out):
+        """Add the next block of this voice into ``out``.
+
+        Returns False once the voice has played to the end.
+        """
+        count = min(len(out), self.remaining)
+        if count > 0:
+            out[:count] += (
+                self.samples[self.position : self.position + count] * self.gain
+            )
+            self.position += count
+        return self.remaining > 0
+
+
+class _AlsaStream:
+    def __init__(self, sample_rate, block_size, device="default"):
+        self.pcm = alsaaudio.PCM(
+            alsaaudio.PCM_PLAYBACK,
+            device=device,
+            rate=sample_rate,
+            channels=1,
+            format=alsaaudio.PCM_FORMAT_S16_LE,
+            periodsize=block_size,
+        )
+
+    def write(self, block):
+        self.pcm.write(block.tobytes())
+
+    def close(self):
+        self.pcm.close()
+
+
+class _SimpleAudioStream:
+    """Fallback when pyalsaaudio is missing.
+
+    simpleaudio cannot append to a playing stream, so blocks are collected
+    until the mixer goes idle, or a second of audio is buffered, and played
+    as one buffer. Effects queued during playback start after it.
+    """
+
+    def __init__(self, sample_rate, block_size):
+        self.sample_rate = sample_rate
+        self.max_blocks = max(1, sample_rate // block_size)
+        self.blocks = []
+
+    def write(self, block):
+        self.blocks.append(block)
+        if len(self.blocks) >= self.max_blocks:
+            self.flush()
+
+    def flush(self):
+        if not self.blocks:
+            return
+        data = np.concatenate(self.blocks)
+        self.blocks = []
+        sa.play_buffer(data, 1, 2, self.sample_rate).wait_done()
+
+    def close(self):
+        self.flush()
+
+
+class Mixer:
+    def __init__(
+        self,
+        sample_rate=SAMPLE_RATE,
+        block_size=BLOCK_SIZE,
+        max_voices=MAX_VOICES,
+        stream_factory=None,
+        autostart=True,
+    ):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.max_voices = max_voices
+        self.stream_factory = stream_factory or self._open_stream
+        self.autostart = autostart
+        self.effects = {}
+        self.min_intervals = {}
+        self.last_played = {}
+        self.voices = []
+        self.stolen = 0
+        self.dropped = 0
+        self._pending = deque(maxlen=max_voices * 4)
+        self._wakeup = threading.Event()
+        self._running = False
+        self._thread = None
+        self._stream = None
+
+    def _open_stream(self, sample_rate, block_size):
+        if alsaaudio is not None:
+            return _AlsaStream(sample_rate, block_size)
+        if sa is not None:
+            return _SimpleAudioStream(sample_rate, block_size)
+        raise RuntimeError("no audio output available")
+
+    def register(self, name, func, min_interval=DEFAULT_MIN_INTERVAL, gain=1.0):
+        """Register an effect rendered by ``func``.
+
+        ``func`` returns an int16 or float waveform at ``sample_rate``. It is
+        called once, on first use, and the samples are reused afterwards.
+        """
+        self.effects[name] = [func, None, gain]
+        self.min_intervals[name] = min_interval
+
+    def samples(self, name):
+        effect = self.effects[name]
+        if effect[1] is None:
+            data = np.asarray(effect[0]())
+            if data.dtype == np.int16:
+                data = data.astype(np.float32) / 32767
+            effect[1] = data.astype(np.float32)
+        return effect[1]
+
+    def play(self, name):
+        """Queue the named effect, safe to call from any thread."""
+        if name not in self.effects:
+            logger.debug("unknown sound effect %s", name)
+            return False
+        now = time.monotonic()
+        if now - self.last_played.get(name, 0) < self.min_intervals[name]:
+            self.dropped += 1
+            return False
+        self.last_played[name] = now
+        self._pending.append(name)
+        if self.autostart and not self._running:
+            self.start()
+        self._wakeup.set()
+        return True
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(
+            target=self._run, name="taqtile-mixer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _add_voice(self, name):
+        effect = self.effects[name]
+        voice = Voice(name, self.samples(name), effect[2])
+        if len(self.voices) >= self.max_voices:
+            # steal the voice closest to finishing, it is the least audible
+            victim = min(self.voices, key=lambda v: v.remaining)
+            self.voices.remove(victim)
+            self.stolen += 1
+        self.voices.append(voice)
+
+    def mix_block(self):
+        """Drain queued effects and return the next int16 block."""
+        while self._pending:
+            try:
+                self._add_voice(self._pending.popleft())
+            except Exception:
+                logger.exception("failed to render sound effect")
+        out = np.zeros(self.block_size, dtype=np.float32)
+        self.voices = [voice for voice in self.voices if voice.render(out)]
+        np.clip(out, -1.0, 1.0, out=out)
+        return (out * 32767).astype(np.int16)
+
+    def _run(self):
+        try:
+            while self._running:
+                if not self.voices and not self._pending:
+                    if hasattr(self._stream, "flush"):
+                        self._stream.flush()
+                    self._wakeup.wait()
+                    self._wakeup.clear()
+                    continue
+                if self._stream is None:
+                    self._stream = self.stream_factory(
+                        self.sample_rate, self.block_size
+                    )
+                self._stream.write(self.mix_block())
+        except Exception:
+            logger.exception("sound mixer stopped")
+        finally:
+            self._running = False
+            if self._stream is not None:
+                self._stream.close()
+                self._stream = None
+
+
+_mixer = None
+
+
+def get_mixer():
+    global _mixer
+    if _mixer is None:
+        from taqtile.sounds import drums, thud
+
+        _mixer = Mixer()
+        _mixer.register("thud", thud, min_interval=0.05)
+        _mixer.register("snare_drum", drums.snare_drum)
+        _mixer.register("hihat_closed", drums.hihat_closed)
+        _mixer.register("hihat_open0", drums.hihat_open0)
+        _mixer.register("hihat_open1", drums.hihat_open1)
+        _mixer.register("bass_drum", drums.bass_drum)
+    return _mixer
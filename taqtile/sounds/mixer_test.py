@@ -0,0 +1,104 @@
+import threading
+from unittest import TestCase, skipIf
+
+import numpy as np
+
+from taqtile.startup_test import can_import_widgets
+
+
+class FakeStream:
+    def __init__(self, flushed):
+        self.blocks = []
+        self.flushes = 0
+        self.closed = False
+        self.flushed = flushed
+
+    def write(self, block):
+        self.blocks.append(block)
+
+    def flush(self):
+        self.flushes += 1
+        self.flushed.set()
+
+    def close(self):
+        self.closed = True
+
+
+def tone(value, length):
+    return lambda: np.full(length, value, dtype=np.float32)
+
+
+# taqtile.sounds pulls in the widget modules
+@skipIf(not can_import_widgets(), "qtile widgets cannot be imported here")
+class MixerTest(TestCase):
+    def setUp(self):
+        from taqtile.sounds.mixer import Mixer
+
+        self.Mixer = Mixer
+        self.mixer = Mixer(block_size=4, max_voices=2, autostart=False)
+
+    def test_voices_are_summed_and_clipped(self):
+        self.mixer.register("low", tone(0.25, 6), min_interval=0)
+        self.mixer.register("high", tone(0.75, 2), min_interval=0)
+        self.mixer.play("low")
+        self.mixer.play("high")
+        block = self.mixer.mix_block()
+        self.assertEqual(block.dtype, np.int16)
+        self.assertEqual(list(block), [32767, 32767, 8191, 8191])
+        self.assertEqual([v.name for v in self.mixer.voices], ["low"])
+        self.assertEqual(list(self.mixer.mix_block()), [8191, 8191, 0, 0])
+        self.assertEqual(self.mixer.voices, [])
+
+    def test_int16_effects_are_scaled(self):
+        self.mixer.register(
+            "half", lambda: np.full(4, 16383, dtype=np.int16), min_interval=0
+        )
+        self.mixer.play("half")
+        self.assertEqual(list(self.mixer.mix_block()), [16383] * 4)
+
+    def test_voice_stealing(self):
+        self.mixer.register("long", tone(0.1, 40), min_interval=0)
+        self.mixer.register("short", tone(0.1, 8), min_interval=0)
+        self.mixer.register("new", tone(0.1, 20), min_interval=0)
+        for name in ("long", "short", "new"):
+            self.mixer.play(name)
+        self.mixer.mix_block()
+        # the voice closest to its end is the one that goes
+        self.assertEqual(self.mixer.stolen, 1)
+        self.assertEqual(
+            sorted(v.name for v in self.mixer.voices), ["long", "new"]
+        )
+
+    def test_rate_limit(self):
+        self.mixer.register("thud", tone(0.1, 40), min_interval=60)
+        self.assertTrue(self.mixer.play("thud"))
+        self.assertFalse(self.mixer.play("thud"))
+        self.assertFalse(self.mixer.play("unknown"))
+        self.assertEqual(self.mixer.dropped, 1)
+        self.mixer.mix_block()
+        self.assertEqual(len(self.mixer.voices), 1)
+
+    def test_one_stream_for_many_effects(self):
+        streams = []
+        flushed = threading.Event()
+
+        def factory(sample_rate, block_size):
+            streams.append(FakeStream(flushed))
+            return streams[-1]
+
+        mixer = self.Mixer(block_size=4, stream_factory=factory)
+        mixer.register("a", tone(0.1, 10), min_interval=0)
+        mixer.register("b", tone(0.1, 10), min_interval=0)
+        try:
+            mixer.play("a")
+            mixer.play("b")
+            # the stream is flushed whenever the mixer runs out of voices
+            self.assertTrue(flushed.wait(5))
+            flushed.clear()
+            mixer.play("a")
+            self.assertTrue(flushed.wait(5))
+        finally:
+            mixer.stop()
+        self.assertEqual(len(streams), 1)
+        self.assertTrue(streams[0].closed)
+        self.assertGreaterEqual(len(streams[0].blocks), 3)
@@ -0,0 +1,128 @@
+"""Startup profiling for config load.
+
+``config.py`` starts the profiler before importing anything else. Milestones
+such as "config loaded" and "first bar draw" are always recorded since they
+cost one dict write. Per-module import timing is opt-in: set
+``TAQTILE_PROFILE_IMPORTS=1``. It installs a meta path finder that times each
+module's execution, split into cumulative time and self time without
+submodules. The report is logged once the first bar has been drawn.
+"""
+
+import logging
+import os
+import sys
+import time
+from importlib.abc import MetaPathFinder
+
+logger = logging.getLogger("taqtile")
+
+
+class _TimedLoader:
+    def __init__(self, loader, name, profiler):
+        self.loader = loader
+        self.name = name
+        self.profiler = profiler
+
+    def create_module(self, spec):
+        return self.loader.create_module(spec)
+
+    def exec_module(self, module):
+        # the module should report its real loader
+        module.__loader__ = self.loader
+        self.profiler._children.append(0.0)
+        start = time.perf_counter()
+        try:
+            self.loader.exec_module(module)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self.profiler._children.pop()
+            if self.profiler._children:
+                self.profiler._children[-1] += elapsed
+            self.profiler.imports[self.name] = (elapsed, elapsed - children)
+
+    def __getattr__(self, attr):
+        return getattr(self.loader, attr)
+
+
+class ImportTimer(MetaPathFinder):
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def find_spec(self, name, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(
+                    spec.loader, "exec_module"
+                ):
+                    spec.loader = _TimedLoader(spec.loader, name, self.profiler)
+                return spec
+        return None
+
+
+class StartupProfiler:
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.started = None
+        self.milestones = {}
+        self.imports = {}
+        self._children = []
+        self._finder = None
+        self.reported = False
+
+    def start(self, profile_imports=None):
+        if self.started is not None:
+            return
+        self.started = self.clock()
+        if profile_imports is None:
+            profile_imports = bool(os.environ.get("TAQTILE_PROFILE_IMPORTS"))
+        if profile_imports:
+            self._finder = ImportTimer(self)
+            sys.meta_path.insert(0, self._finder)
+
+    def stop_imports(self):
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        self._finder = None
+
+    def mark(self, name):
+        """Record seconds since :meth:`start` for the first ``name`` mark."""
+        if self.started is None or name in self.milestones:
+            return None
+        elapsed = self.milestones[name] = self.clock() - self.started
+        return elapsed
+
+    def first_draw(self):
+        if self.reported:
+            return
+        self.reported = True
+        self.mark("first bar draw")
+        self.stop_imports()
+        logger.info(self.report())
+
+    def report(self, limit=15):
+        lines = ["startup profile:"]
+        for name, elapsed in sorted(self.milestones.items(), key=lambda m: m[1]):
+            lines.append("  %-24s %8.1fms" % (name, elapsed * 1000))
+        if self.imports:
+            lines.append("  slowest imports (cumulative / self):")
+            slowest = sorted(
+                self.imports.items(), key=lambda item: item[1][1], reverse=True
+            )
+            for name, (total, own) in slowest[:limit]:
+                lines.append(
+                    "    %-40s %8.1fms %8.1fms" % (name, total * 1000, own * 1000)
+                )
+        return "\n".join(lines)
+
+
+_startup_profiler = None
+
+
+def get_startup_profiler():
+    global _startup_profiler
+    if _startup_profiler is None:
+        _startup_profiler = StartupProfiler()
+    return _startup_profiler
@@ -0,0 +1,102 @@
+import os
+import subprocess
+import sys
+import time
+from unittest import TestCase, skipIf
+
+from taqtile.lazyimport import lazy_command, lazy_module
+from taqtile.startup import StartupProfiler
+
+# seconds allowed for a cold import of the modules config.py pulls in
+COLD_START_BUDGET = float(os.environ.get("TAQTILE_COLD_START_BUDGET", 3.0))
+# optional subsystems that must stay unloaded until they are used
+HEAVY_MODULES = [
+    "numpy",
+    "scipy",
+    "pydub",
+    "simpleaudio",
+    "pulsectl",
+    "alsaaudio",
+    "obsws_python",
+    "websocket",
+    "dbus",
+    "guppy",
+]
+COLD_START_MODULES = [
+    "taqtile.sounds",
+    "taqtile.dmenu",
+    "taqtile.widgets.live",
+    "taqtile.widgets.obscontrol",
+]
+COLD_START = """
+import sys, time
+start = time.perf_counter()
+for name in %r:
+    __import__(name)
+print(time.perf_counter() - start)
+print(" ".join(m for m in %r if m in sys.modules))
+""" % (
+    COLD_START_MODULES,
+    HEAVY_MODULES,
+)
+
+
+def run_python(code):
+    return subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(__file__)),
+    )
+
+
+def can_import_widgets():
+    return run_python("import cairocffi, libqtile.widget.base").returncode == 0
+
+
+class LazyImportTest(TestCase):
+    def test_module_loads_on_first_use(self):
+        sys.modules.pop("colorsys", None)
+        colorsys = lazy_module("colorsys")
+        self.assertNotIn("colorsys", sys.modules)
+        self.assertFalse(colorsys.loaded)
+        self.assertEqual(colorsys.rgb_to_hsv(1, 0, 0), (0, 1, 1))
+        self.assertTrue(colorsys.loaded)
+
+    def test_command_resolves_on_first_use(self):
+        missing = lazy_command("taqtile-no-such-binary")
+        with self.assertRaises(Exception):
+            missing("--help")
+        self.assertEqual(lazy_command("echo")("hi").strip(), "hi")
+
+
+class StartupProfilerTest(TestCase):
+    def test_import_times_and_milestones(self):
+        profiler = StartupProfiler()
+        profiler.start(profile_imports=True)
+        try:
+            sys.modules.pop("json.tool", None)
+            import json.tool  # noqa: F401
+        finally:
+            profiler.stop_imports()
+        profiler.mark("config loaded")
+        self.assertIn("json.tool", profiler.imports)
+        total, own = profiler.imports["json.tool"]
+        self.assertLessEqual(own, total)
+        time.sleep(0.001)
+        profiler.first_draw()
+        self.assertGreater(
+            profiler.milestones["first bar draw"],
+            profiler.milestones["config loaded"],
+        )
+        self.assertIn("json.tool", profiler.report())
+
+
+@skipIf(not can_import_widgets(), "qtile widgets cannot be imported here")
+class ColdStartBenchmark(TestCase):
+    def test_cold_start(self):
+        result = run_python(COLD_START)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        elapsed, loaded = result.stdout.splitlines()[-2:]
+        self.assertEqual(loaded.split(), [])
+        self.assertLess(float(elapsed), COLD_START_BUDGET)
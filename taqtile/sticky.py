@@ -0,0 +1,130 @@
+"""Windows that stay on top of their screen across group switches.
+
+``keys.client_focus`` and ``keys.setgroup`` walked the whole global
+``win_map`` on every focus change and raised each stuck window one by one,
+logging inside the loop. Killed windows were never removed.
+:class:`StickyWindows` indexes stuck windows by screen, drops them on
+``client_killed``, and only restacks when one round trip for the stacking
+order shows another window of the current group above a stuck one. The
+restack itself sends every configure request before a single flush and
+client list update.
+"""
+
+import logging
+
+import xcffib.xproto
+
+logger = logging.getLogger("taqtile")
+
+
+class StickyWindows:
+    def __init__(self):
+        self.screens = {}
+        self.screen_of = {}
+        self.restacks = 0
+
+    def stuck(self, screen):
+        """Windows stuck to ``screen``, in the order they were stuck."""
+        return list(self.screens.get(screen, {}).values())
+
+    def is_stuck(self, window):
+        return window.wid in self.screen_of
+
+    def stick(self, window, screen):
+        self.unstick(window)
+        self.screens.setdefault(screen, {})[window.wid] = window
+        self.screen_of[window.wid] = screen
+
+    def unstick(self, window):
+        screen = self.screen_of.pop(window.wid, None)
+        if screen is None:
+            return False
+        windows = self.screens[screen]
+        del windows[window.wid]
+        if not windows:
+            del self.screens[screen]
+        return True
+
+    def toggle(self, window, screen):
+        """Stick or unstick ``window``, returns True if it is now stuck."""
+        if self.unstick(window):
+            return False
+        self.stick(window, screen)
+        return True
+
+    def on_client_killed(self, window):
+        self.unstick(window)
+
+    def on_setgroup(self, qtile):
+        """Pull the current screen's stuck windows into its new group."""
+        group = qtile.current_group
+        if group.screen is None:
+            return
+        moved = [
+            w for w in self.stuck(group.screen.index) if w.group is not group
+        ]
+        for window in moved:
+            window.togroup(group.name)
+        if moved:
+            moved[-1].focus()
+
+    def on_focus(self, qtile):
+        group = qtile.current_group
+        if group.screen is None:
+            return
+        stuck = [
+            w
+            for w in self.stuck(group.screen.index)
+            if w.group is group and w.get_wm_type() != "desktop"
+        ]
+        if not stuck:
+            return
+        order = self.stacking_order(qtile)
+        if self.needs_raise(order, group, stuck):
+            self.restack(qtile, stuck, order)
+
+    def stacking_order(self, qtile):
+        root = getattr(qtile.core, "_root", None)
+        return None if root is None else list(root.query_tree())
+
+    def needs_raise(self, order, group, stuck):
+        if order is None:
+            # no stacking order to look at, raise to be safe
+            return True
+        position = {wid: i for i, wid in enumerate(order)}
+        stuck_wids = {w.wid for w in stuck}
+        lowest = min(position.get(wid, -1) for wid in stuck_wids)
+        return any(
+            position.get(w.wid, -1) > lowest
+            for w in group.windows
+            if w.wid not in stuck_wids
+        )
+
+    def restack(self, qtile, stuck, order=None):
+        self.restacks += 1
+        if order is None:
+            for window in stuck:
+                window.bring_to_front()
+            return
+        # what bring_to_front does, with one client list update and flush
+        for window in stuck:
+            if window.get_wm_type() == "desktop":
+                continue
+            window.window.configure(stackmode=xcffib.xproto.StackMode.Above)
+            # transient dialogs stay above their parent
+            window.raise_children(order)
+        qtile.core.update_client_lists()
+        qtile.core.conn.flush()
+
+
+_sticky_windows = None
+
+
+def get_sticky_windows():
+    global _sticky_windows
+    if _sticky_windows is None:
+        from libqtile import hook
+
+        _sticky_windows = StickyWindows()
+        hook.subscribe.client_killed(_sticky_windows.on_client_killed)
+    return _sticky_windows
@@ -0,0 +1,128 @@
+from types import SimpleNamespace
+from unittest import TestCase
+
+from taqtile.sticky import StickyWindows
+
+
+class FakeXWindow:
+    def __init__(self, wid, log):
+        self.wid = wid
+        self.log = log
+
+    def configure(self, **kwargs):
+        self.log.append(("configure", self.wid))
+
+
+class FakeWindow:
+    def __init__(self, wid, group, log, wm_type="normal"):
+        self.wid = wid
+        self.group = group
+        self.log = log
+        self.wm_type = wm_type
+        self.window = FakeXWindow(wid, log)
+        group.windows.append(self)
+
+    def get_wm_type(self):
+        return self.wm_type
+
+    def raise_children(self, stack=None):
+        self.log.append(("raise_children", self.wid, stack))
+
+    def togroup(self, name):
+        self.log.append(("togroup", self.wid, name))
+
+    def focus(self):
+        self.log.append(("focus", self.wid))
+
+
+class FakeRoot:
+    def __init__(self, order, log):
+        self.order = order
+        self.log = log
+
+    def query_tree(self):
+        self.log.append("query_tree")
+        return list(self.order)
+
+
+class FakeCore:
+    def __init__(self, root, log):
+        self._root = root
+        self.log = log
+        self.conn = SimpleNamespace(flush=lambda: log.append("flush"))
+
+    def update_client_lists(self):
+        self.log.append("update_client_lists")
+
+
+def group(name, screen):
+    return SimpleNamespace(
+        name=name, screen=SimpleNamespace(index=screen), windows=[]
+    )
+
+
+class StickyWindowsTest(TestCase):
+    def setUp(self):
+        self.log = []
+        self.group = group("a", 0)
+        self.tiled = FakeWindow(1, self.group, self.log)
+        self.video = FakeWindow(2, self.group, self.log)
+        self.notes = FakeWindow(3, self.group, self.log)
+        self.root = FakeRoot([1, 2, 3], self.log)
+        self.qtile = SimpleNamespace(
+            current_group=self.group, core=FakeCore(self.root, self.log)
+        )
+        self.sticky = StickyWindows()
+
+    def test_toggle_and_kill(self):
+        self.assertTrue(self.sticky.toggle(self.video, 0))
+        self.assertEqual(self.sticky.stuck(0), [self.video])
+        self.assertFalse(self.sticky.toggle(self.video, 0))
+        self.assertEqual(self.sticky.stuck(0), [])
+        self.sticky.stick(self.video, 0)
+        self.sticky.on_client_killed(self.video)
+        self.assertEqual(self.sticky.screens, {})
+        self.assertEqual(self.sticky.screen_of, {})
+
+    def test_focus_without_stuck_windows_does_nothing(self):
+        self.sticky.stick(self.video, 1)
+        self.sticky.on_focus(self.qtile)
+        self.assertEqual(self.log, [])
+
+    def test_restacks_only_when_covered(self):
+        self.sticky.stick(self.video, 0)
+        self.sticky.stick(self.notes, 0)
+        self.root.order = [1, 2, 3]
+        self.sticky.on_focus(self.qtile)
+        self.assertEqual(self.log, ["query_tree"])
+        self.log.clear()
+        self.root.order = [2, 3, 1]
+        self.sticky.on_focus(self.qtile)
+        self.assertEqual(
+            self.log,
+            [
+                "query_tree",
+                ("configure", 2),
+                ("raise_children", 2, [2, 3, 1]),
+                ("configure", 3),
+                ("raise_children", 3, [2, 3, 1]),
+                "update_client_lists",
+                "flush",
+            ],
+        )
+        self.assertEqual(self.sticky.restacks, 1)
+
+    def test_desktop_windows_are_not_raised(self):
+        wallpaper = FakeWindow(4, self.group, self.log, wm_type="desktop")
+        self.sticky.stick(wallpaper, 0)
+        self.sticky.stick(self.video, 0)
+        self.root.order = [4, 2, 1]
+        self.sticky.on_focus(self.qtile)
+        self.assertNotIn(("configure", 4), self.log)
+        self.assertIn(("configure", 2), self.log)
+
+    def test_setgroup_pulls_stuck_windows_into_new_group(self):
+        self.sticky.stick(self.video, 0)
+        self.qtile.current_group = group("b", 0)
+        self.sticky.on_setgroup(self.qtile)
+        self.assertEqual(self.log, [("togroup", 2, "b"), ("focus", 2)])
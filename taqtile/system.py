@@ -1,14 +1,15 @@
 """Platform specific configurtation options
 """
-import glob
 import logging
 import os
 import platform
 import re
 import signal
 import subprocess
-from functools import lru_cache
+import time
+from collections.abc import Mapping
 from os.path import expanduser
+from types import MappingProxyType
 from plumbum import local
 import os
 import psutil
@@ -148,15 +149,153 @@ platform_specific = {
 }
 
 
+HOSTCONFIG_FILES = (
+    expanduser("~/.config/taqtile/host.toml"),
+    expanduser("~/.config/taqtile/host.yaml"),
+)
+
+
+def freeze(value):
+    """Read only copy of nested dicts and lists."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value):
+    if isinstance(value, MappingProxyType):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+def load_config_file(path):
+    if path.endswith(".toml"):
+        import tomllib
+
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    import yaml
+
+    with open(path) as f:
+        return yaml.safe_load(f) or {}
+
+
+class HostConfig:
+    """Host configuration resolved once into a read only mapping.
+
+    The defaults are merged with the overrides for this host and then with
+    the first config file found in ``paths``. A ``hosts`` table in the file
+    can override keys per host. The file's mtime is checked at most every
+    ``check_interval`` seconds, and a changed file is reloaded in place, so
+    edits apply without restarting qtile.
+    """
+
+    def __init__(
+        self,
+        defaults=default_config,
+        overrides=platform_specific,
+        paths=HOSTCONFIG_FILES,
+        host=None,
+        check_interval=2,
+    ):
+        self.defaults = defaults
+        self.overrides = overrides
+        self.paths = paths
+        self.host = host or platform.node().split(".", 1)[0].lower()
+        self.check_interval = check_interval
+        self.callbacks = []
+        self._path = None
+        self._mtime = None
+        self._checked = 0
+        self.reload()
+
+    def _find_file(self):
+        for path in self.paths:
+            try:
+                return path, os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+        return None, None
+
+    def reload(self):
+        path, mtime = self._find_file()
+        config = dict(self.defaults)
+        config.update(self.overrides.get(self.host, self.defaults))
+        if path:
+            try:
+                data = load_config_file(path)
+                hosts = data.pop("hosts", {})
+                config.update(data)
+                config.update(hosts.get(self.host, {}))
+            except Exception:
+                logger.exception("failed to load host config %s", path)
+        if config.get("screens"):
+            # toml table keys are always strings, screens are looked up by
+            # their index
+            try:
+                config["screens"] = {
+                    int(k): v for k, v in config["screens"].items()
+                }
+            except ValueError:
+                logger.warning("screens keys must be screen indexes")
+        self.config = freeze(config)
+        self.account_patterns = {
+            (account, app): re.compile(settings["regex"], re.I)
+            for account, apps in self.config.get("browser_accounts", {}).items()
+            for app, settings in apps.items()
+            if isinstance(settings, Mapping) and settings.get("regex")
+        }
+        self._path, self._mtime = path, mtime
+        self._checked = time.monotonic()
+        for callback in list(self.callbacks):
+            try:
+                callback(self)
+            except Exception:
+                logger.exception("host config subscriber failed")
+
+    def check(self):
+        """Reload if the config file changed, returns the current mapping."""
+        now = time.monotonic()
+        if now - self._checked >= self.check_interval:
+            self._checked = now
+            if self._find_file() != (self._path, self._mtime):
+                logger.info("host config changed, reloading")
+                self.reload()
+        return self.config
+
+    def get(self, key, default=None):
+        return self.check().get(key, default)
+
+    def account_pattern(self, account, app):
+        """Compiled, case insensitive ``regex`` of a browser account app."""
+        self.check()
+        return self.account_patterns.get((account, app))
+
+    def subscribe(self, callback):
+        """Call ``callback(hostconfig)`` after every reload."""
+        self.callbacks.append(callback)
+
+
+_hostconfig = None
+
+
+def get_host_config():
+    global _hostconfig
+    if _hostconfig is None:
+        _hostconfig = HostConfig()
+    return _hostconfig
+
+
 def get_hostconfig_dict():
-    host = platform.node().split(".", 1)[0].lower()
-    config = dict(default_config)
-    config.update(platform_specific.get(host, default_config))
-    return config
+    return thaw(get_host_config().check())
 
 
 def get_hostconfig(key, default=None):
-    return get_hostconfig_dict().get(key, default)
+    return get_host_config().get(key, default)
 
 
 def get_screen(index):
@@ -178,29 +317,16 @@ def get_group_affinity(app):
     return str(ret)
 
 
-@lru_cache(maxsize=1)
 def get_num_monitors():
-    try:
-        output = subprocess.Popen(
-            'xrandr | grep -e "\ connected" | cut -d" " -f1',
-            shell=True,
-            stdout=subprocess.PIPE,
-        ).communicate()[0]
+    from taqtile.monitors import get_monitor_topology
 
-        displays = output.strip().decode("utf8").split("\n")
-        logger.debug("Number of displays detected : %s", displays)
-        return len(displays)
-    except Exception:
-        logging.exception("failed to get number of monitors")
-        return 1
+    return get_monitor_topology().num_monitors
 
 
 def hdmi_connected():
-    for hdmi in glob.glob("/sys/class/drm/card0/*HDMI-A-1/status"):
-        if open(hdmi).read().strip() == "connected":
-            logger.info("HDMI connected")
-            return True
-    return False
+    from taqtile.monitors import get_monitor_topology
+
+    return get_monitor_topology().is_connected("HDMI")
 
 
 def window_exists(qtile, regex):
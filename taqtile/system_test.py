@@ -8,3 +8,36 @@ def test_get_default_config():
 
 def test_get_hostconfig():
     print(yaml.dump(get_hostconfig_dict()))
+
+
+def test_hostconfig_is_frozen_and_reloads(tmp_path):
+    import os
+    from types import MappingProxyType
+
+    from taqtile.system import HostConfig
+
+    path = tmp_path / "host.toml"
+    path.write_text('battery = "BAT9"\n[hosts.testhost]\nlaptop = true\n')
+    config = HostConfig(paths=(str(path),), host="testhost", check_interval=0)
+    assert config.get("battery") == "BAT9"
+    assert config.get("laptop") is True
+    assert isinstance(config.get("browser_accounts"), MappingProxyType)
+    pattern = config.account_pattern("steven@stevenjoseph.in", "mail")
+    assert pattern.match("Inbox - STEVEN@stevenjoseph.in")
+
+    reloads = []
+    config.subscribe(reloads.append)
+    path.write_text('battery = "BAT0"\n')
+    os.utime(path, ns=(0, 10**9))
+    assert config.get("battery") == "BAT0"
+    assert config.get("laptop") is None
+    assert reloads == [config]
+
+
+def test_toml_screens_are_keyed_by_index(tmp_path):
+    from taqtile.system import HostConfig
+
+    path = tmp_path / "host.toml"
+    path.write_text('[screens]\n0 = 1\n1 = 0\n')
+    config = HostConfig(paths=(str(path),), host="testhost", check_interval=0)
+    assert dict(config.get("screens")) == {0: 1, 1: 0}
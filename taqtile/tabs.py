@@ -0,0 +1,139 @@
+"""Background index of browser tabs listed by brotab.
+
+``BroTab.tabs`` ran ``brotab list`` once and kept the result on the instance
+for good, so the menu went stale. The only other option was a synchronous
+``brotab list`` on the event loop. :class:`TabIndex` lists tabs in an
+executor, on a TTL and shortly after a browser window changes its title.
+Each new listing is merged into the old one: tabs that are still open keep
+their position, closed tabs are dropped and new tabs are appended, so the
+menu does not reshuffle between refreshes. Menu items are ranked with the
+``qtile_brotab`` history and served from memory.
+"""
+
+import asyncio
+import logging
+import time
+from collections import namedtuple
+
+from taqtile.lazyimport import lazy_command
+
+logger = logging.getLogger("taqtile")
+
+brotab = lazy_command("brotab")
+
+BROWSER_CLASSES = ("brave-browser", "firefox", "chromium", "google-chrome")
+Tab = namedtuple("Tab", "id title url")
+
+
+def parse_tab(line):
+    """``prefix.window.tab<TAB>title<TAB>url`` as a :class:`Tab`."""
+    tab_id, _, rest = line.partition("\t")
+    title, _, url = rest.rpartition("\t")
+    return Tab(tab_id, title, url)
+
+
+def tab_line(tab):
+    return "%s\t%s\t%s" % tab
+
+
+def history_key(entry):
+    # history entries are whole menu lines, tabs are matched by url
+    return entry.rpartition("\t")[2]
+
+
+def list_tabs():
+    return [parse_tab(line) for line in brotab("list").splitlines() if line]
+
+
+class TabIndex:
+    def __init__(
+        self, lister=list_tabs, ttl=60, debounce=0.5, clock=time.monotonic
+    ):
+        self.lister = lister
+        self.ttl = ttl
+        self.debounce = debounce
+        self.clock = clock
+        self.tabs = []
+        self.refreshed = None
+        self.refreshes = 0
+        self._inflight = None
+        self._scheduled = None
+
+    @property
+    def stale(self):
+        return (
+            self.refreshed is None or self.clock() - self.refreshed >= self.ttl
+        )
+
+    def merge(self, listing):
+        """Replace the tabs with ``listing``, keeping the old order."""
+        new = {tab.id: tab for tab in listing}
+        tabs = [new.pop(tab.id) for tab in self.tabs if tab.id in new]
+        tabs.extend(new.values())
+        self.tabs = tabs
+        self.refreshed = self.clock()
+        self.refreshes += 1
+
+    def refresh(self, loop=None):
+        """List tabs in an executor unless a listing is already running."""
+        if self._inflight is not None and not self._inflight.done():
+            return self._inflight
+        loop = loop or asyncio.get_event_loop()
+        self._inflight = loop.run_in_executor(None, self.lister)
+        self._inflight.add_done_callback(self._listed)
+        return self._inflight
+
+    def _listed(self, future):
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            logger.warning("brotab list failed: %s", future.exception())
+            return
+        self.merge(future.result())
+
+    def schedule_refresh(self, loop=None):
+        """Refresh once after ``debounce`` seconds, coalescing bursts."""
+        if self._scheduled is not None:
+            return
+        loop = loop or asyncio.get_event_loop()
+
+        def run():
+            self._scheduled = None
+            self.refresh(loop)
+
+        self._scheduled = loop.call_later(self.debounce, run)
+
+    def on_title_change(self, client):
+        wm_class = client.get_wm_class() or ()
+        if any(name.lower() in BROWSER_CLASSES for name in wm_class):
+            self.schedule_refresh()
+
+    def items(self, history=()):
+        """Menu lines, most recently used first, then in index order.
+
+        Starts a background refresh when the index is past its TTL. Only the
+        very first call waits for a listing.
+        """
+        if self.refreshed is None:
+            self.merge(self.lister())
+        elif self.stale:
+            self.refresh()
+        rank = {history_key(entry): i for i, entry in enumerate(history)}
+        tabs = sorted(
+            enumerate(self.tabs),
+            key=lambda item: (-rank.get(item[1].url, -1), item[0]),
+        )
+        return [tab_line(tab) for _, tab in tabs]
+
+
+_tab_index = None
+
+
+def get_tab_index():
+    global _tab_index
+    if _tab_index is None:
+        from libqtile import hook
+
+        _tab_index = TabIndex()
+        hook.subscribe.client_name_updated(_tab_index.on_title_change)
+    return _tab_index
@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from taqtile.tabs import Tab, TabIndex, parse_tab, tab_line
+
+
+def tab(n, url=None):
+    return Tab("a.1.%s" % n, "title %s" % n, url or "https://%s.example" % n)
+
+
+class Lister:
+    def __init__(self, *listing):
+        self.listing = list(listing)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return list(self.listing)
+
+
+class TabIndexTest(TestCase):
+    def test_parse_round_trip(self):
+        line = "a.1.2\tSearch\tresults\thttps://example.com"
+        self.assertEqual(parse_tab(line).url, "https://example.com")
+        self.assertEqual(tab_line(parse_tab(line)), line)
+
+    def test_merge_keeps_order_of_open_tabs(self):
+        index = TabIndex(lister=Lister())
+        index.merge([tab(1), tab(2), tab(3)])
+        index.merge([tab(4), tab(3), tab(1, "https://moved.example")])
+        self.assertEqual(
+            [t.id for t in index.tabs], ["a.1.1", "a.1.3", "a.1.4"]
+        )
+        self.assertEqual(index.tabs[0].url, "https://moved.example")
+
+    def test_recent_tabs_rank_first(self):
+        index = TabIndex(lister=Lister(tab(1), tab(2), tab(3)))
+        history = [tab_line(tab(3)), "a.9.9\told title\t" + tab(2).url]
+        items = index.items(history)
+        self.assertEqual(
+            [parse_tab(item).id for item in items], ["a.1.2", "a.1.3", "a.1.1"]
+        )
+
+
+class TabRefreshTest(IsolatedAsyncioTestCase):
+    async def test_stale_index_refreshes_in_background(self):
+        now = [0]
+        lister = Lister(tab(1))
+        index = TabIndex(lister=lister, ttl=60, clock=lambda: now[0])
+        index.items()
+        self.assertEqual(lister.calls, 1)
+        lister.listing.append(tab(2))
+        now[0] = 30
+        self.assertEqual(len(index.items()), 1)
+        self.assertEqual(lister.calls, 1)
+        now[0] = 61
+        # served from memory while the refresh runs
+        self.assertEqual(len(index.items()), 1)
+        await index.refresh()
+        await asyncio.sleep(0)
+        self.assertEqual(lister.calls, 2)
+        self.assertEqual(len(index.items()), 2)
+
+    async def test_title_changes_are_debounced(self):
+        lister = Lister(tab(1))
+        index = TabIndex(lister=lister, debounce=0.01)
+        browser = SimpleNamespace(
+            get_wm_class=lambda: ("brave-browser", "Brave-browser")
+        )
+        terminal = SimpleNamespace(get_wm_class=lambda: ("st", "St"))
+        for _ in range(10):
+            index.on_title_change(browser)
+        index.on_title_change(terminal)
+        await asyncio.sleep(0.05)
+        await index._inflight
+        await asyncio.sleep(0)
+        self.assertEqual(lister.calls, 1)
+        self.assertEqual(index.refreshes, 1)
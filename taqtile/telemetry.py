@@ -0,0 +1,449 @@
+"""In-process telemetry with fixed memory.
+
+Nothing told us what the window manager costs at runtime: how many
+processes it forks, how long each polling widget takes, how often hooks
+fire, or how late the event loop runs its callbacks. :class:`Telemetry`
+keeps counters and histograms in ring buffers of ``slots`` time slots,
+each ``interval`` seconds wide. A slot is reset when its time comes round
+again, so memory stays the same however long qtile runs. Cumulative totals
+are kept next to the rings for Prometheus, which wants monotonic counters.
+
+Sources:
+
+* an audit hook counts ``subprocess.Popen`` by executable and ``os.fork``,
+  which covers qtile's own ``spawn`` and every helper in this package;
+* :func:`instrument_widgets` times ``poll`` of every ``ThreadPoolText``;
+* :func:`count_hooks` counts every qtile hook as it fires;
+* :class:`LoopLagProbe` measures how late a timer runs on the event loop.
+
+:meth:`Telemetry.snapshot` is reachable over the qtile command interface
+through ``eval``. :func:`remote_snapshot` wraps that for ``bin/qsh``, and
+:meth:`Telemetry.export` writes the Prometheus text format to a
+node-exporter textfile periodically.
+"""
+
+import ast
+import bisect
+import logging
+import os
+import sys
+import threading
+import time
+
+logger = logging.getLogger("taqtile")
+
+# seconds, upper bounds of the histogram buckets
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+
+EVAL_SNAPSHOT = (
+    "__import__('taqtile.telemetry', fromlist=['get_telemetry'])"
+    ".get_telemetry().snapshot(%r)"
+)
+
+
+class RingCounter:
+    def __init__(self, slots, interval):
+        self.interval = interval
+        self.counts = [0] * slots
+        self.ticks = [-1] * slots
+        self.total = 0
+
+    def _slot(self, now):
+        tick = int(now // self.interval)
+        i = tick % len(self.counts)
+        if self.ticks[i] != tick:
+            self.ticks[i] = tick
+            self._reset(i)
+        return i
+
+    def _reset(self, i):
+        self.counts[i] = 0
+
+    def _recent(self, now, window):
+        """Slot indexes that cover the last ``window`` seconds."""
+        tick = int(now // self.interval)
+        oldest = tick - max(1, int(window // self.interval)) + 1
+        return [i for i, t in enumerate(self.ticks) if oldest <= t <= tick]
+
+    def add(self, now, n=1):
+        self.counts[self._slot(now)] += n
+        self.total += n
+
+    def recent(self, now, window):
+        return sum(self.counts[i] for i in self._recent(now, window))
+
+
+class RingHistogram(RingCounter):
+    def __init__(self, slots, interval, bounds):
+        super().__init__(slots, interval)
+        self.bounds = tuple(bounds)
+        # one bucket per bound and one above the last bound
+        self.buckets = [[0] * (len(self.bounds) + 1) for _ in range(slots)]
+        self.sums = [0.0] * slots
+        self.total_buckets = [0] * (len(self.bounds) + 1)
+        self.total_sum = 0.0
+
+    def _reset(self, i):
+        super()._reset(i)
+        self.buckets[i] = [0] * (len(self.bounds) + 1)
+        self.sums[i] = 0.0
+
+    def observe(self, now, value):
+        i = self._slot(now)
+        bucket = bisect.bisect_left(self.bounds, value)
+        self.counts[i] += 1
+        self.buckets[i][bucket] += 1
+        self.sums[i] += value
+        self.total += 1
+        self.total_buckets[bucket] += 1
+        self.total_sum += value
+
+    def recent(self, now, window):
+        slots = self._recent(now, window)
+        buckets = [0] * (len(self.bounds) + 1)
+        for i in slots:
+            for b, n in enumerate(self.buckets[i]):
+                buckets[b] += n
+        count = sum(buckets)
+        total = sum(self.sums[i] for i in slots)
+        return {
+            "count": count,
+            "mean": total / count if count else 0.0,
+            "p50": self._quantile(buckets, count, 0.5),
+            "p95": self._quantile(buckets, count, 0.95),
+            "max": self._quantile(buckets, count, 1.0),
+        }
+
+    def _quantile(self, buckets, count, q):
+        """Upper bound of the bucket holding quantile ``q``."""
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for bound, n in zip(self.bounds, buckets):
+            seen += n
+            if seen >= rank:
+                return bound
+        # above the last bound, there is no finite upper bound to report
+        return self.bounds[-1]
+
+
+def _key(name, labels):
+    return (name, tuple(sorted(labels.items())) if labels else ())
+
+
+def _label_text(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{%s}" % ",".join(
+        '%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in pairs
+    )
+
+
+class Telemetry:
+    def __init__(
+        self, slots=60, interval=10, max_series=512, clock=time.monotonic
+    ):
+        self.slots = slots
+        self.interval = interval
+        self.max_series = max_series
+        self.clock = clock
+        self.counters = {}
+        self.histograms = {}
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._export = None
+        self._hook_counters = {}
+        self.probe = None
+
+    def _series(self, table, key, make):
+        series = table.get(key)
+        if series is None:
+            if len(self.counters) + len(self.histograms) >= self.max_series:
+                if not self.dropped:
+                    logger.warning(
+                        "telemetry series limit %s reached, dropping %s",
+                        self.max_series,
+                        key[0],
+                    )
+                self.dropped += 1
+                return None
+            series = table[key] = make()
+        return series
+
+    def count(self, name, n=1, **labels):
+        with self._lock:
+            series = self._series(
+                self.counters,
+                _key(name, labels),
+                lambda: RingCounter(self.slots, self.interval),
+            )
+            if series is not None:
+                series.add(self.clock(), n)
+
+    def observe(self, name, value, buckets=DURATION_BUCKETS, **labels):
+        with self._lock:
+            series = self._series(
+                self.histograms,
+                _key(name, labels),
+                lambda: RingHistogram(self.slots, self.interval, buckets),
+            )
+            if series is not None:
+                series.observe(self.clock(), value)
+
+    def timed(self, func, name, **labels):
+        """Wrap ``func`` to observe its duration in seconds as ``name``."""
+
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.observe(name, time.perf_counter() - start, **labels)
+
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    def snapshot(self, window=60):
+        """Totals and rates over the last ``window`` seconds, as plain data."""
+        now = self.clock()
+        window = min(window, self.slots * self.interval)
+        with self._lock:
+            counters = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "total": series.total,
+                    "recent": series.recent(now, window),
+                    "per_minute": series.recent(now, window) * 60 / window,
+                }
+                for (name, labels), series in sorted(self.counters.items())
+            ]
+            histograms = [
+                dict(
+                    series.recent(now, window),
+                    name=name,
+                    labels=dict(labels),
+                    total=series.total,
+                )
+                for (name, labels), series in sorted(self.histograms.items())
+            ]
+        return {
+            "window": window,
+            "counters": counters,
+            "histograms": histograms,
+            "dropped": self.dropped,
+        }
+
+    def prometheus(self, prefix="taqtile_"):
+        lines = []
+        typed = set()
+        with self._lock:
+            for (name, labels), series in sorted(self.counters.items()):
+                metric = prefix + name + "_total"
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append("# TYPE %s counter" % metric)
+                lines.append(
+                    "%s%s %d" % (metric, _label_text(labels), series.total)
+                )
+            for (name, labels), series in sorted(self.histograms.items()):
+                metric = prefix + name
+                if metric not in typed:
+                    typed.add(metric)
+                    lines.append("# TYPE %s histogram" % metric)
+                cumulative = 0
+                for bound, n in zip(
+                    series.bounds + ("+Inf",), series.total_buckets
+                ):
+                    cumulative += n
+                    lines.append(
+                        "%s_bucket%s %d"
+                        % (
+                            metric,
+                            _label_text(labels, [("le", bound)]),
+                            cumulative,
+                        )
+                    )
+                lines.append(
+                    "%s_sum%s %r"
+                    % (metric, _label_text(labels), series.total_sum)
+                )
+                lines.append(
+                    "%s_count%s %d"
+                    % (metric, _label_text(labels), series.total)
+                )
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Replace ``path`` atomically, node-exporter may read it any time."""
+        # node-exporter only reads *.prom, so the temporary file is skipped
+        tmp = "%s.%d.tmp" % (path, os.getpid())
+        with open(tmp, "w") as f:
+            f.write(self.prometheus())
+        os.replace(tmp, path)
+
+    def export(self, loop, path, interval=30):
+        """Write the textfile at ``path`` every ``interval`` seconds."""
+        if self._export is not None:
+            self._export.cancel()
+
+        def write():
+            try:
+                self.write_textfile(path)
+            except OSError:
+                logger.exception("failed to write telemetry to %s", path)
+            self._export = loop.call_later(interval, write)
+
+        write()
+
+    def stop_export(self):
+        if self._export is not None:
+            self._export.cancel()
+            self._export = None
+
+    def stop(self):
+        """Cancel the loop lag probe and the textfile export."""
+        self.stop_export()
+        if self.probe is not None:
+            self.probe.stop()
+            self.probe = None
+
+    def hook_counter(self, name):
+        """The same counting callback for ``name`` on every call, so
+        subscribing it again does not count twice."""
+        counter = self._hook_counters.get(name)
+        if counter is None:
+
+            def counter(*args, **kwargs):
+                self.count("hook_fires", hook=name)
+
+            self._hook_counters[name] = counter
+        return counter
+
+
+class LoopLagProbe:
+    """Observe how late a timer fires, every ``interval`` seconds."""
+
+    def __init__(self, telemetry, interval=1):
+        self.telemetry = telemetry
+        self.interval = interval
+        self._handle = None
+
+    def start(self, loop):
+        if self._handle is None:
+            self._schedule(loop)
+
+    def _schedule(self, loop):
+        due = loop.time() + self.interval
+        self._handle = loop.call_at(due, self._fired, loop, due)
+
+    def _fired(self, loop, due):
+        self.telemetry.observe(
+            "event_loop_lag_seconds", max(0.0, loop.time() - due), LAG_BUCKETS
+        )
+        self._schedule(loop)
+
+    def stop(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+
+_SPAWN_EVENTS = frozenset(("subprocess.Popen", "os.fork"))
+# subscribing to these has side effects: suspend and resume make qtile take
+# a logind sleep inhibitor, user is a decorator factory and not a hook
+SKIP_HOOKS = frozenset(("suspend", "resume", "user"))
+# a config reload runs importlib.reload on this module, which keeps its
+# namespace: audit hooks cannot be removed, so remember the one installed
+_audit_installed = globals().get("_audit_installed", False)
+
+
+def count_spawns(telemetry):
+    """Count processes started anywhere in qtile, audit hooks stay forever."""
+    global _audit_installed
+    if _audit_installed:
+        return
+
+    def audit(event, args):
+        if event not in _SPAWN_EVENTS:
+            return
+        if event == "os.fork":
+            exe = "fork"
+        else:
+            # Popen has already resolved the executable, shell included
+            exe = os.path.basename(os.fsdecode(args[0]))
+        telemetry.count("subprocess_spawns", exe=exe)
+
+    sys.addaudithook(audit)
+    _audit_installed = True
+
+
+def count_hooks(telemetry, hook=None):
+    """Subscribe a counter to every qtile hook."""
+    if hook is None:
+        from libqtile import hook
+
+    for name in list(hook.subscribe.hooks):
+        if name not in SKIP_HOOKS:
+            getattr(hook.subscribe, name)(telemetry.hook_counter(name))
+
+
+def instrument_widgets(telemetry, widgets):
+    """Time ``poll`` of each ``ThreadPoolText`` in ``widgets``."""
+    widgets = list(widgets)
+    if not widgets:
+        return 0
+    from libqtile.widget.base import ThreadPoolText
+
+    timed = 0
+    for widget in widgets:
+        if not isinstance(widget, ThreadPoolText):
+            continue
+        if hasattr(widget.poll, "__wrapped__"):
+            continue
+        widget.poll = telemetry.timed(
+            widget.poll, "widget_poll_seconds", widget=widget.name
+        )
+        timed += 1
+    return timed
+
+
+def remote_snapshot(client, window=60):
+    """:meth:`Telemetry.snapshot` of a running qtile, through ``client``."""
+    ok, result = client.eval(EVAL_SNAPSHOT % window)
+    if not ok:
+        raise RuntimeError(result)
+    return ast.literal_eval(result)
+
+
+# kept across config reloads, for the audit hook that counts into it
+_telemetry = globals().get("_telemetry")
+
+
+def get_telemetry():
+    global _telemetry
+    if _telemetry is None:
+        _telemetry = Telemetry()
+        count_spawns(_telemetry)
+    return _telemetry
+
+
+def start_telemetry(qtile, loop, textfile=None, hook=None):
+    """Hook the telemetry sources into a running qtile.
+
+    qtile fires ``startup`` again on every config reload, so the probe and
+    export of the previous start are stopped first.
+    """
+    telemetry = get_telemetry()
+    telemetry.stop()
+    count_hooks(telemetry, hook)
+    instrument_widgets(telemetry, qtile.widgets_map.values())
+    telemetry.probe = LoopLagProbe(telemetry)
+    telemetry.probe.start(loop)
+    if textfile:
+        telemetry.export(loop, os.path.expanduser(textfile))
+    return telemetry
@@ -0,0 +1,168 @@
+import asyncio
+import os
+import subprocess
+import tempfile
+from types import SimpleNamespace
+from unittest import TestCase
+
+from taqtile.telemetry import (
+    LoopLagProbe,
+    Telemetry,
+    count_hooks,
+    get_telemetry,
+    remote_snapshot,
+    start_telemetry,
+)
+
+
+def fake_hook(names):
+    subscribers = {}
+
+    def subscriber(name):
+        return lambda func: subscribers.setdefault(name, []).append(func)
+
+    hook = SimpleNamespace(
+        subscribe=SimpleNamespace(
+            hooks=dict.fromkeys(names),
+            **{name: subscriber(name) for name in names}
+        )
+    )
+    return hook, subscribers
+
+
+class TelemetryTest(TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.telemetry = Telemetry(
+            slots=6, interval=10, max_series=4, clock=lambda: self.now
+        )
+
+    def counter(self, name, **labels):
+        for entry in self.telemetry.snapshot(60)["counters"]:
+            if entry["name"] == name and entry["labels"] == labels:
+                return entry
+        return None
+
+    def test_ring_forgets_old_slots(self):
+        self.telemetry.count("spawns", 3)
+        self.now += 30
+        self.telemetry.count("spawns")
+        self.assertEqual(self.counter("spawns")["recent"], 4)
+        # the first slot falls out of the window, and is reused later
+        self.now += 40
+        self.telemetry.count("spawns")
+        entry = self.counter("spawns")
+        self.assertEqual(entry["recent"], 2)
+        self.assertEqual(entry["total"], 5)
+        self.now += 600
+        self.assertEqual(self.counter("spawns")["recent"], 0)
+
+    def test_histogram(self):
+        for value in (0.002, 0.002, 0.002, 0.3, 10):
+            self.telemetry.observe("poll", value, widget="cpu")
+        (entry,) = self.telemetry.snapshot()["histograms"]
+        self.assertEqual(entry["labels"], {"widget": "cpu"})
+        self.assertEqual(entry["count"], 5)
+        self.assertEqual(entry["p50"], 0.005)
+        self.assertEqual(entry["p95"], 5)
+        self.assertAlmostEqual(entry["mean"], 10.306 / 5)
+
+    def test_series_limit(self):
+        for i in range(6):
+            self.telemetry.count("hook_fires", hook=str(i))
+        snapshot = self.telemetry.snapshot()
+        self.assertEqual(len(snapshot["counters"]), 4)
+        self.assertEqual(snapshot["dropped"], 2)
+
+    def test_prometheus_textfile(self):
+        self.telemetry.count("subprocess_spawns", 2, exe='we"ird')
+        self.telemetry.observe("loop_lag", 0.02, buckets=(0.01, 0.1))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "taqtile.prom")
+            self.telemetry.write_textfile(path)
+            self.assertEqual(os.listdir(tmp), ["taqtile.prom"])
+            with open(path) as f:
+                lines = f.read().splitlines()
+        self.assertIn("# TYPE taqtile_subprocess_spawns_total counter", lines)
+        self.assertIn(
+            'taqtile_subprocess_spawns_total{exe="we\\"ird"} 2', lines
+        )
+        self.assertIn('taqtile_loop_lag_bucket{le="0.01"} 0', lines)
+        self.assertIn('taqtile_loop_lag_bucket{le="0.1"} 1', lines)
+        self.assertIn('taqtile_loop_lag_bucket{le="+Inf"} 1', lines)
+        self.assertIn("taqtile_loop_lag_count 1", lines)
+
+    def test_count_hooks(self):
+        hook, subscribers = fake_hook(
+            ("setgroup", "client_killed", "suspend", "resume", "user")
+        )
+        count_hooks(self.telemetry, hook)
+        self.assertEqual(sorted(subscribers), ["client_killed", "setgroup"])
+        subscribers["setgroup"][0]()
+        subscribers["client_killed"][0](object())
+        subscribers["client_killed"][0](object())
+        self.assertEqual(
+            self.counter("hook_fires", hook="setgroup")["total"], 1
+        )
+        self.assertEqual(
+            self.counter("hook_fires", hook="client_killed")["total"], 2
+        )
+
+    def test_loop_lag(self):
+        loop = asyncio.new_event_loop()
+        probe = LoopLagProbe(self.telemetry, interval=0.01)
+        try:
+            probe.start(loop)
+            loop.run_until_complete(asyncio.sleep(0.05))
+        finally:
+            probe.stop()
+            loop.close()
+        (entry,) = self.telemetry.snapshot()["histograms"]
+        self.assertEqual(entry["name"], "event_loop_lag_seconds")
+        self.assertGreater(entry["count"], 0)
+
+
+class StartTest(TestCase):
+    def test_restart_stops_previous_probe_and_export(self):
+        telemetry = get_telemetry()
+        hook, subscribers = fake_hook(("setgroup",))
+        qtile = SimpleNamespace(widgets_map={})
+        loop = asyncio.new_event_loop()
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, "taqtile.prom")
+                start_telemetry(qtile, loop, path, hook)
+                probe, export = telemetry.probe, telemetry._export
+                # startup fires again on a config reload
+                start_telemetry(qtile, loop, path, hook)
+                self.assertIsNot(telemetry.probe, probe)
+                self.assertIsNone(probe._handle)
+                self.assertTrue(export.cancelled())
+                self.assertFalse(telemetry._export.cancelled())
+                telemetry.stop()
+                self.assertIsNone(telemetry.probe)
+                self.assertIsNone(telemetry._export)
+        finally:
+            loop.close()
+        # the same callback, which the hook subscribed twice
+        self.assertIs(subscribers["setgroup"][0], subscribers["setgroup"][1])
+
+
+class SpawnsTest(TestCase):
+    def test_spawns_counted_and_remote_snapshot(self):
+        telemetry = get_telemetry()
+        subprocess.run(["true"], check=True)
+
+        class Client:
+            # what qtile's eval command does with the code it receives
+            def eval(self, code):
+                return True, str(eval(code))
+
+        snapshot = remote_snapshot(Client())
+        spawns = {
+            entry["labels"]["exe"]: entry["total"]
+            for entry in snapshot["counters"]
+            if entry["name"] == "subprocess_spawns"
+        }
+        self.assertGreaterEqual(spawns.get("true", 0), 1)
+        self.assertIs(telemetry, get_telemetry())
@@ -3,7 +3,6 @@ from taqtile import QTILE_NOTIFICATION_ID
 import asyncio
 from libqtile.log_utils import logger
 from random import randint
-from typing import Any
 
 try:
     from dbus_next import AuthError, Message, Variant
@@ -53,95 +52,128 @@ def send_notification(
     except RuntimeError:
         logger.warning("Eventloop has not started. Cannot send notification.")
     else:
-        loop.create_task(_notify(title, message, urgency, timeout, id_, value))
+        get_notification_client().notify(
+            loop, title, message, urgency, timeout, id_, value
+        )
 
     return id_
 
 
-async def _notify(
-    title: str, message: str, urgency: int, timeout: int, id_: int, value: int
-) -> None:
-    notification = [
-        "qtile",  # Application name
-        id_,  # id
-        "",  # icon
-        title,  # summary
-        message,  # body
-        [],  # actions
-        {
-            "urgency": Variant("y", urgency),
-            "value": Variant("u", value),
-        },  # hints
-        timeout,
-    ]  # timeout
-
-    bus, msg = await _send_dbus_message(
-        True,
-        MessageType.METHOD_CALL,
-        "org.freedesktop.Notifications",
-        "org.freedesktop.Notifications",
-        "/org/freedesktop/Notifications",
-        "Notify",
-        "susssasa{sv}i",
-        notification,
-    )
-
-    if msg and msg.message_type == MessageType.ERROR:
-        logger.warning(
-            "Unable to send notification. Is a notification server running?"
-        )
-
-    # a new bus connection is made each time a notification is sent so
-    # we disconnect when the notification is done
-    if bus:
-        bus.disconnect()
-
-
-async def _send_dbus_message(
-    session_bus: bool,
-    message_type: MessageType,
-    destination: str | None,
-    interface: str | None,
-    path: str | None,
-    member: str | None,
-    signature: str,
-    body: Any,
-    negotiate_unix_fd: bool = False,
-) -> tuple[MessageBus | None, Message | None]:
+class NotificationClient:
     """
-    Private method to send messages to dbus via dbus_next.
+    Sends notifications over one long lived dbus connection.
 
-    Returns a tuple of the bus object and message response.
+    The connection is made on first use and again after it drops. Updates
+    for the same id_ that arrive within ``frame_interval`` seconds are
+    coalesced so only the latest one is sent, e.g. holding a volume key only
+    sends the final volume to the notification daemon.
     """
-    if session_bus:
-        bus_type = BusType.SESSION
-    else:
-        bus_type = BusType.SYSTEM
-
-    if isinstance(body, str):
-        body = [body]
 
-    try:
-        bus = await MessageBus(
-            bus_type=bus_type, negotiate_unix_fd=negotiate_unix_fd
-        ).connect()
-    except (AuthError, Exception):
-        logger.warning("Unable to connect to dbus.")
-        return None, None
-
-    # Ignore types here: dbus-next has default values of `None` for certain
-    # parameters but the signature is `str` so passing `None` results in an
-    # error in mypy.
-    msg = await bus.call(
-        Message(
-            message_type=message_type,
-            destination=destination,
-            interface=interface,
-            path=path,
-            member=member,
-            signature=signature,
-            body=body,
-        )
-    )
+    def __init__(
+        self,
+        bus_address: str | None = None,
+        frame_interval: float = 1 / 30,
+        app_name: str = "qtile",
+    ):
+        self.bus_address = bus_address
+        self.frame_interval = frame_interval
+        self.app_name = app_name
+        self.bus: MessageBus | None = None
+        self.sent = 0
+        self._pending: dict[int, list] = {}
+        self._flush_task: asyncio.Task | None = None
+        self._connect_lock: asyncio.Lock | None = None
+
+    def notify(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        title: str,
+        message: str,
+        urgency: int,
+        timeout: int,
+        id_: int,
+        value: int | None = None,
+    ) -> None:
+        hints = {"urgency": Variant("y", urgency)}
+        if value is not None:
+            hints["value"] = Variant("u", value)
+        self._pending[id_] = [
+            self.app_name,  # Application name
+            id_,  # id
+            "",  # icon
+            title,  # summary
+            message,  # body
+            [],  # actions
+            hints,  # hints
+            timeout,  # timeout
+        ]
+        if self._flush_task is None:
+            self._flush_task = loop.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        await asyncio.sleep(self.frame_interval)
+        pending, self._pending = self._pending, {}
+        self._flush_task = None
+        for notification in pending.values():
+            await self._send(notification)
+
+    async def _get_bus(self) -> MessageBus | None:
+        if self.bus is not None and self.bus.connected:
+            return self.bus
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self.bus is None or not self.bus.connected:
+                try:
+                    if self.bus_address:
+                        bus = MessageBus(bus_address=self.bus_address)
+                    else:
+                        bus = MessageBus(bus_type=BusType.SESSION)
+                    self.bus = await bus.connect()
+                except (AuthError, Exception):
+                    logger.warning("Unable to connect to dbus.")
+                    self.bus = None
+        return self.bus
+
+    async def _send(self, notification: list) -> None:
+        bus = await self._get_bus()
+        if bus is None:
+            return
+        try:
+            msg = await bus.call(
+                Message(
+                    message_type=MessageType.METHOD_CALL,
+                    destination="org.freedesktop.Notifications",
+                    interface="org.freedesktop.Notifications",
+                    path="/org/freedesktop/Notifications",
+                    member="Notify",
+                    signature="susssasa{sv}i",
+                    body=notification,
+                )
+            )
+        except Exception:
+            logger.warning("Lost dbus connection sending notification.")
+            self.disconnect()
+            return
+
+        self.sent += 1
+        if msg and msg.message_type == MessageType.ERROR:
+            logger.warning(
+                "Unable to send notification. Is a notification server running?"
+            )
+
+    def disconnect(self) -> None:
+        if self.bus is not None:
+            self.bus.disconnect()
+            self.bus = None
+
+
+_notification_client: NotificationClient | None = None
+
+
+def get_notification_client() -> NotificationClient:
+    global _notification_client
+    if _notification_client is None:
+        _notification_client = NotificationClient()
+    return _notification_client
 
-    return bus, msg
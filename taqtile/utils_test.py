@@ -0,0 +1,73 @@
+import asyncio
+import shutil
+import subprocess
+from unittest import IsolatedAsyncioTestCase, skipUnless
+
+from dbus_next.aio import MessageBus
+from dbus_next.service import ServiceInterface, method
+
+from taqtile.utils import NotificationClient
+
+
+class StubNotifications(ServiceInterface):
+    def __init__(self):
+        super().__init__("org.freedesktop.Notifications")
+        self.received = []
+
+    @method()
+    def Notify(
+        self,
+        app_name: "s",
+        replaces_id: "u",
+        app_icon: "s",
+        summary: "s",
+        body: "s",
+        actions: "as",
+        hints: "a{sv}",
+        expire_timeout: "i",
+    ) -> "u":
+        self.received.append((replaces_id, summary, body))
+        return replaces_id
+
+
+@skipUnless(shutil.which("dbus-daemon"), "dbus-daemon not installed")
+class NotificationClientTest(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.daemon = subprocess.Popen(
+            ["dbus-daemon", "--session", "--nofork", "--print-address"],
+            stdout=subprocess.PIPE,
+        )
+        self.address = self.daemon.stdout.readline().decode().strip()
+        self.service_bus = await MessageBus(bus_address=self.address).connect()
+        self.stub = StubNotifications()
+        self.service_bus.export("/org/freedesktop/Notifications", self.stub)
+        await self.service_bus.request_name("org.freedesktop.Notifications")
+
+    async def asyncTearDown(self):
+        self.service_bus.disconnect()
+        self.daemon.terminate()
+        self.daemon.wait()
+
+    async def test_coalesces_updates_for_same_id(self):
+        client = NotificationClient(bus_address=self.address)
+        loop = asyncio.get_running_loop()
+        for volume in range(30):
+            client.notify(loop, "Volume", str(volume), 1, -1, 42, volume)
+        client.notify(loop, "Other", "x", 1, -1, 7)
+        await asyncio.sleep(client.frame_interval * 5)
+        self.assertEqual(
+            sorted(self.stub.received), [(7, "Other", "x"), (42, "Volume", "29")]
+        )
+        client.disconnect()
+
+    async def test_reuses_connection(self):
+        client = NotificationClient(bus_address=self.address)
+        loop = asyncio.get_running_loop()
+        client.notify(loop, "one", "1", 1, -1, 1)
+        await asyncio.sleep(client.frame_interval * 3)
+        bus = client.bus
+        client.notify(loop, "two", "2", 1, -1, 1)
+        await asyncio.sleep(client.frame_interval * 3)
+        self.assertIs(client.bus, bus)
+        self.assertEqual(client.sent, 2)
+        client.disconnect()
@@ -3,6 +3,7 @@ from datetime import datetime
 from libqtile.widget import Clock as QClock, TextBox as QTextBox
 from pytz import timezone
 
+from taqtile.localzone import get_timezone_provider
 from taqtile.log import logger
 from taqtile.system import execute_once
 from taqtile.themes import default_params
@@ -52,6 +53,28 @@ class Clock(QClock):
 
 
 class CalClock(Clock):
+    """Clock following the local timezone unless ``timezone`` is given.
+
+    Starts on the last resolved zone and switches when the background
+    ``tzupdate`` lookup finds a different one.
+    """
+
+    def __init__(self, **config):
+        self.follow_local = "timezone" not in config
+        if self.follow_local:
+            config["timezone"] = get_timezone_provider().zone
+        super().__init__(**config)
+
+    def _configure(self, qtile, bar):
+        super()._configure(qtile, bar)
+        if self.follow_local:
+            get_timezone_provider().subscribe(self.update_timezone)
+
+    def finalize(self):
+        if self.follow_local:
+            get_timezone_provider().unsubscribe(self.update_timezone)
+        super().finalize()
+
     # def button_release(self, x, y, button):
 
     def button_press(self, x, y, button):
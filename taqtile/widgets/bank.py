@@ -8,6 +8,8 @@ import requests
 import re
 import os
 import logging
+import threading
+import time
 from plumbum import local
 
 
@@ -23,16 +25,96 @@ from plumbum import local
 #            "client_secret": client_secret})
 
 
+class AccountCache:
+    """Account data shared between everything that polls the same login.
+
+    Entries are keyed by credentials and kept for ``ttl`` seconds. Concurrent
+    callers for the same key wait on one request instead of each logging in.
+    Each key logs in on its own session, so two logins never share cookies.
+    Failed logins are retried with exponential backoff, serving the last good
+    data in the meantime.
+    """
+
+    def __init__(
+        self, ttl=300, backoff=30, max_backoff=3600, clock=time.monotonic
+    ):
+        self.ttl = ttl
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.clock = clock
+        self.entries = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, key):
+        with self._lock:
+            return self.entries.setdefault(
+                key,
+                {
+                    "lock": threading.Lock(),
+                    "session": None,
+                    "data": None,
+                    "expires": 0,
+                    "retry_at": 0,
+                    "failures": 0,
+                    "error": None,
+                },
+            )
+
+    def get(self, bank):
+        entry = self._entry(bank.cache_key)
+        with entry["lock"]:
+            now = self.clock()
+            if entry["data"] is not None and now < entry["expires"]:
+                return entry["data"]
+            if now < entry["retry_at"]:
+                if entry["data"] is not None:
+                    return entry["data"]
+                raise entry["error"]
+            if entry["session"] is None:
+                entry["session"] = requests.Session()
+            try:
+                data = bank.fetch(entry["session"])
+            except Exception as e:
+                entry["failures"] += 1
+                entry["error"] = e
+                entry["retry_at"] = now + min(
+                    self.backoff * 2 ** (entry["failures"] - 1),
+                    self.max_backoff,
+                )
+                logging.warning(
+                    "CommBank login failed %s times, retrying in %ss",
+                    entry["failures"],
+                    entry["retry_at"] - now,
+                )
+                if entry["data"] is not None:
+                    return entry["data"]
+                raise
+            entry["failures"] = 0
+            entry["error"] = None
+            entry["data"] = data
+            entry["expires"] = now + self.ttl
+            return data
+
+
+ACCOUNT_CACHE = AccountCache()
+
+
 class CommBank:
     loginUrl = "https://www2.my.commbank.com.au/mobile/t/ajaxcalls.aspx"
     total_credit = 1300.0
     regex_currency = re.compile(r"^\$(\d+(\.\d*)?|\.\d+)(.*)")
 
-    def __init__(self, clientnumber, password):
+    def __init__(self, clientnumber, password, cache=None):
         self.clientNumber = clientnumber
         self.password = password
+        self.cache = cache or ACCOUNT_CACHE
+        self.data = None
 
-    def update(self):
+    @property
+    def cache_key(self):
+        return (self.loginUrl, str(self.clientNumber), str(self.password))
+
+    def fetch(self, session):
         postdata = {
             "Params": [
                 {"Name": "Request", "Value": "login"},
@@ -45,13 +127,20 @@ class CommBank:
         postdata = json.dumps(postdata)
         headers = {
             "content-type": "application/json",
-            "content-length": len(postdata),
+            "content-length": str(len(postdata)),
         }
-        response = requests.post(self.loginUrl, data=postdata, headers=headers)
+        response = session.post(
+            self.loginUrl, data=postdata, headers=headers, timeout=30
+        )
+        response.raise_for_status()
         try:
-            self.data = json.loads(response.text[2:-2])
+            return json.loads(response.text[2:-2])
         except Exception as e:
             logging.exception("Error decoding : %s" % response.text)
+            raise
+
+    def update(self):
+        self.data = self.cache.get(self)
 
     def get_currency(self, value):
         if not value:
@@ -70,6 +159,25 @@ class CommBank:
     def total_credits(self):
         return self.get_currency(self.data["AccountGroups"][0]["TotalCredits"])
 
+    def summary(self):
+        accountgroup_format = (
+            "TotalCredits: {TotalCredits}\n" "NetPosition: {NetPosition}"
+        )
+        account_format = "{AccountName}: " "{AvailableFunds}" "/{Balance}"
+        notifications = []
+        for accountGroup in self.data["AccountGroups"]:
+            notifications.append(accountgroup_format.format(**accountGroup))
+            for account in accountGroup["ListAccount"]:
+                if account["ProductTypeCode"] not in ["54", "04"]:
+                    continue
+                account = dict(account)
+                account["AvailableFunds"] = self.get_currency(
+                    account["AvailableFunds"]
+                )
+                account["Balance"] = self.get_currency(account["Balance"])
+                notifications.append(account_format.format(**account))
+        return "\n".join(notifications)
+
 
 if __name__ == "__main__":
     unixpass = local["pass"]
@@ -77,23 +185,8 @@ if __name__ == "__main__":
         unixpass("financial/commbank/debit/user").strip(),
         unixpass("financial/commbank/debit/pass").strip(),
     )
-    accountgroup_format = (
-        "TotalCredits: {TotalCredits}\n" "NetPosition: {NetPosition}"
-    )
-    account_format = "{AccountName}: " "{AvailableFunds}" "/{Balance}"
-    # import ipdb; ipdb.set_trace()
-    notifications = []
-    for accountGroup in commbank.data["AccountGroups"]:
-        notifications.append(accountgroup_format.format(**accountGroup))
-        for account in accountGroup["ListAccount"]:
-            if account["ProductTypeCode"] not in ["54", "04"]:
-                continue
-            account["AvailableFunds"] = commbank.get_currency(
-                account["AvailableFunds"]
-            )
-            account["Balance"] = commbank.get_currency(account["Balance"])
-            notifications.append(account_format.format(**account))
-    notification = "\n".join(notifications)
+    commbank.update()
+    notification = commbank.summary()
     print(notification)
     notify_send = local["notify-send"]
     notify_send(notification)  # , _env=os.environ)
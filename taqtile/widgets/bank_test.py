@@ -0,0 +1,119 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase
+
+from .bank import AccountCache, CommBank
+
+ACCOUNT_DATA = {
+    "AccountGroups": [
+        {
+            "TotalCredits": "$100.00 CR",
+            "NetPosition": "$100.00 CR",
+            "ListAccount": [],
+        }
+    ]
+}
+
+
+class FakeCommBank(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    requests = 0
+    fail = False
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["content-length"]))
+        FakeCommBank.requests += 1
+        if FakeCommBank.fail:
+            self.send_response(500)
+            self.send_header("content-length", "0")
+            self.end_headers()
+            return
+        # the real endpoint wraps the json in two characters each side
+        body = ("([%s])" % json.dumps(ACCOUNT_DATA)).encode()
+        self.send_response(200)
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Clock:
+    now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class AccountCacheTest(TestCase):
+    def setUp(self):
+        FakeCommBank.requests = 0
+        FakeCommBank.fail = False
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeCommBank)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.clock = Clock()
+        self.cache = AccountCache(ttl=60, backoff=10, clock=self.clock)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def bank(self, user="user"):
+        bank = CommBank(user, "pass", cache=self.cache)
+        bank.loginUrl = "http://127.0.0.1:%s/" % self.server.server_port
+        return bank
+
+    def test_concurrent_updates_share_one_login(self):
+        banks = [self.bank() for _ in range(5)]
+        threads = [threading.Thread(target=bank.update) for bank in banks]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(FakeCommBank.requests, 1)
+        for bank in banks:
+            self.assertEqual(bank.net_position, 100.0)
+
+    def test_ttl_expiry_refreshes(self):
+        bank = self.bank()
+        bank.update()
+        self.clock.now = 59
+        bank.update()
+        self.assertEqual(FakeCommBank.requests, 1)
+        self.clock.now = 61
+        bank.update()
+        self.assertEqual(FakeCommBank.requests, 2)
+
+    def test_backoff_serves_stale_data(self):
+        bank = self.bank()
+        bank.update()
+        FakeCommBank.fail = True
+        self.clock.now = 61
+        bank.update()
+        self.assertEqual(FakeCommBank.requests, 2)
+        self.assertEqual(bank.net_position, 100.0)
+        # inside the backoff window no request is made
+        self.clock.now = 65
+        bank.update()
+        self.assertEqual(FakeCommBank.requests, 2)
+        # the second failure doubles the delay
+        self.clock.now = 72
+        bank.update()
+        self.clock.now = 85
+        bank.update()
+        self.assertEqual(FakeCommBank.requests, 3)
+
+    def test_session_per_login(self):
+        first, second = self.bank("first"), self.bank("second")
+        first.update()
+        second.update()
+        first.update()
+        self.assertEqual(FakeCommBank.requests, 2)
+        sessions = [
+            self.cache.entries[bank.cache_key]["session"]
+            for bank in (first, second)
+        ]
+        self.assertIsNotNone(sessions[0])
+        self.assertIsNot(sessions[0], sessions[1])
@@ -1,4 +1,3 @@
-from os.path import expanduser
 import subprocess
 
 try:
@@ -26,7 +25,7 @@ class BankBalance(base.ThreadedPollText):
     ]
     fixed_upper_bound = False
     amount = None
-    CACHE = {}
+    commbank = None
 
     def __init__(self, **config):
         # graph._Graph.__init__(self, **config)
@@ -105,15 +104,16 @@ class BankBalance(base.ThreadedPollText):
         return str(text)
 
     def button_press(self, x, y, button):
-        send_notification(
-            str(
-                subprocess.check_output(
-                    [
-                        "python",
-                        expanduser("~/.bin/bank.py"),
-                    ]
-                )
-                .strip()
-                .decode("utf8")
-            )
-        )
+        if not self.commbank:
+            return
+        # usually served from the shared account cache, but an expired
+        # entry logs in, which must not block the event loop
+        future = self.qtile.run_in_executor(self.commbank.update)
+        future.add_done_callback(self._show_summary)
+
+    def _show_summary(self, future):
+        try:
+            future.result()
+            send_notification("Bank", self.commbank.summary())
+        except Exception:
+            logger.exception("BankBalance: failed to show summary")
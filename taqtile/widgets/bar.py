@@ -3,13 +3,43 @@ from libqtile.bar import Bar as QBar
 from libqtile import bar, hook, pangocffi
 from libqtile.widget import base
 
+from taqtile.startup import get_startup_profiler
+
 logger = logging.getLogger("taqtile")
 
 
+class FocusHighlightMixin:
+    """Widgets that change colour on the bar of the focused screen.
+
+    The bar calls ``set_focused`` on screen change and then repaints only the
+    widgets it damaged, so the widget does not reconfigure itself.
+    """
+
+    def set_focused(self, focused):
+        self.background = (
+            self.focused_background if focused else self.default_background
+        )
+        if hasattr(self, "focused_foreground"):
+            self.foreground = (
+                self.focused_foreground
+                if focused
+                else self.default_foreground
+            )
+            if getattr(self, "layout", None):
+                self.layout.colour = self.foreground
+
+
 class Bar(QBar):
     default_background = None
+    _drawn = False
     defaults = [
         ("focused_background", "#000000", "Background colour."),
+        (
+            "focus_redraw",
+            "partial",
+            "'partial' repaints only the widgets affected by a screen focus "
+            "change, 'full' reconfigures and redraws the whole bar.",
+        ),
     ]
 
     def __init__(self, widgets, **config):
@@ -18,27 +48,110 @@ class Bar(QBar):
         self.add_defaults(Bar.defaults)
         self.default_background = self.background
         self.default_foreground = self.foreground
+        self._focused = None
+        self._damaged = []
+        self._damage_queued = False
         hook.subscribe.current_screen_change(self._hook_current_screen_change)
 
     def _hook_current_screen_change(self, *args):
         if not self.qtile:
             return
+        focused = self.screen == self.qtile.current_screen
+        if focused == self._focused:
+            # only the bars losing and gaining focus need a repaint
+            return
+        self._focused = focused
         logger.debug(
             f"current_screen_change current_screen: {self.qtile.current_screen.index} self.screen:{self.screen.index}"
         )
 
-        if self.screen == self.qtile.current_screen:
+        if focused:
             self.background = self.focused_background
         else:
             self.background = self.default_background
-        try:
-            self._configure(self.qtile, self.screen, reconfigure=True)
-        except Exception as e:
-            logger.error(f"Error configuring Bar {self}")
-        self.draw()
 
+        if self.focus_redraw != "partial":
+            for widget in self.widgets:
+                if isinstance(widget, FocusHighlightMixin):
+                    widget.set_focused(focused)
+            try:
+                self._configure(self.qtile, self.screen, reconfigure=True)
+            except Exception as e:
+                logger.error(f"Error configuring Bar {self}")
+            self.draw()
+            return
+
+        for widget in self.widgets:
+            if isinstance(widget, FocusHighlightMixin):
+                widget.set_focused(focused)
+                self.damage(widget)
+            elif not widget.background:
+                # painted with the bar background
+                self.damage(widget)
+        self.damage(self)
+
+    def _actual_draw(self):
+        super()._actual_draw()
+        if not Bar._drawn:
+            Bar._drawn = True
+            get_startup_profiler().first_draw()
+
+    def damage(self, widget):
+        """Queue ``widget`` (or the bar itself) for a partial repaint."""
+        if widget not in self._damaged:
+            self._damaged.append(widget)
+        if not self._damage_queued:
+            self._damage_queued = True
+            self.qtile.call_soon(self._draw_damaged)
+
+    def _draw_damaged(self):
+        self._damage_queued = False
+        damaged, self._damaged = self._damaged, []
+        if self._draw_queued:
+            # a full redraw is already pending and covers everything
+            return
+        for widget in damaged:
+            if widget is self:
+                self._draw_unused()
+            else:
+                widget.draw()
+
+    def _draw_unused(self):
+        """Fill the bar space after the last widget with the background."""
+        if not self.widgets:
+            return
+        last = self.widgets[-1]
+        if self.horizontal:
+            bar_end = self._length + self.border_width[3]
+            widget_end = last.offsetx + last.length
+            rect = (
+                widget_end,
+                self.border_width[0],
+                bar_end - widget_end,
+                self.height,
+            )
+        else:
+            bar_end = self._length + self.border_width[0]
+            widget_end = last.offsety + last.length
+            rect = (
+                self.border_width[3],
+                widget_end,
+                self.width,
+                bar_end - widget_end,
+            )
+        if widget_end >= bar_end:
+            return
+        self.drawer.clear_rect(*rect)
+        self.drawer.ctx.rectangle(*rect)
+        self.drawer.set_source_rgb(self.background)
+        self.drawer.ctx.fill()
+        x, y, width, height = rect
+        self.drawer.draw(
+            offsetx=x, offsety=y, width=width, height=height, src_x=x, src_y=y
+        )
 
-class Spacer(base._Widget):
+
+class Spacer(FocusHighlightMixin, base._Widget):
     """Just an empty space on the bar
 
     Often used with length equal to bar.STRETCH to push bar widgets to the
@@ -64,21 +177,6 @@ class Spacer(base._Widget):
         base._Widget.__init__(self, length, **config)
         self.add_defaults(Spacer.defaults)
         self.default_background = self.background
-        hook.subscribe.current_screen_change(self._hook_current_screen_change)
-
-    def _hook_current_screen_change(self, *args):
-        if not self.qtile:
-            return
-        logger.debug(
-            f"current_screen_change current_screen: {self.qtile.current_screen.index} self.bar.screen:{self.bar.screen.index}"
-        )
-
-        if self.bar.screen == self.qtile.current_screen:
-            self.background = self.focused_background
-        else:
-            self.background = self.default_background
-        self._configure(self.qtile, self.bar)
-        self.draw()
 
     def draw(self):
         if self.length > 0:
@@ -0,0 +1,115 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+from .bar import Bar, FocusHighlightMixin
+
+NUM_SCREENS = 4
+WIDGETS_PER_BAR = 25
+# most widgets leave background unset and are painted with the bar's
+INHERITING_PER_BAR = 15
+WIDGET_LENGTH = 40
+
+
+class FakeWidget:
+    def __init__(self, background=None):
+        self.background = background
+        self.draws = 0
+        self.length = WIDGET_LENGTH
+        self.offsetx = 0
+
+    def draw(self):
+        self.draws += 1
+
+
+class FakeFocusWidget(FocusHighlightMixin, FakeWidget):
+    focused_background = "#ff0000"
+    default_background = "#000000"
+
+    def __init__(self):
+        FakeWidget.__init__(self, self.default_background)
+
+
+class FakeQtile:
+    def __init__(self, screens):
+        self.screens = screens
+        self.current_screen = screens[0]
+
+    def call_soon(self, func, *args):
+        func(*args)
+
+
+def make_bar(qtile, screen):
+    bar = Bar.__new__(Bar)
+    bar.qtile = qtile
+    bar.screen = screen
+    bar.focused_background = "#ffffff"
+    bar.default_background = bar.background = "#000000"
+    bar.focus_redraw = "partial"
+    bar._focused = None
+    bar._damaged = []
+    bar._damage_queued = False
+    bar._draw_queued = False
+    bar._configure = Mock()
+    bar.widgets = [FakeFocusWidget()]
+    for i in range(WIDGETS_PER_BAR - 1):
+        bar.widgets.append(
+            FakeWidget(None if i < INHERITING_PER_BAR else "#111111")
+        )
+    for i, widget in enumerate(bar.widgets):
+        widget.offsetx = i * WIDGET_LENGTH
+    # the unused tail after the last widget is painted by the bar itself
+    bar.horizontal = True
+    bar.border_width = [0, 0, 0, 0]
+    bar.height = 24
+    bar.width = bar._length = (WIDGETS_PER_BAR + 5) * WIDGET_LENGTH
+    bar.drawer = Mock()
+    return bar
+
+
+class BarFocusRepaintTest(TestCase):
+    def setUp(self):
+        screens = [Mock(index=i) for i in range(NUM_SCREENS)]
+        self.qtile = FakeQtile(screens)
+        self.bars = [make_bar(self.qtile, screen) for screen in screens]
+        self.switch(0)
+        for bar in self.bars:
+            bar.drawer.reset_mock()
+            for widget in bar.widgets:
+                widget.draws = 0
+
+    def switch(self, index):
+        self.qtile.current_screen = self.qtile.screens[index]
+        for bar in self.bars:
+            bar._hook_current_screen_change()
+
+    def draws(self):
+        return sum(w.draws for bar in self.bars for w in bar.widgets)
+
+    def tail_draws(self):
+        return sum(bar.drawer.draw.call_count for bar in self.bars)
+
+    def test_only_focus_widgets_repaint(self):
+        self.switch(1)
+        # the focus aware and inheriting widgets of the bar losing and of
+        # the bar gaining focus, and the unused tail of both
+        self.assertEqual(self.draws(), 2 * (1 + INHERITING_PER_BAR))
+        self.assertEqual(self.tail_draws(), 2)
+        for bar in self.bars[2:]:
+            self.assertEqual(sum(w.draws for w in bar.widgets), 0)
+        self.assertEqual(
+            self.bars[1].drawer.set_source_rgb.call_args.args, ("#ffffff",)
+        )
+        for bar in self.bars:
+            bar._configure.assert_not_called()
+        self.assertEqual(self.bars[1].background, "#ffffff")
+        self.assertEqual(self.bars[0].background, "#000000")
+        self.assertEqual(self.bars[1].widgets[0].background, "#ff0000")
+
+    def test_repaint_cost_per_screen_switch(self):
+        switches = 1000
+        for i in range(switches):
+            self.switch(i % NUM_SCREENS)
+        self.assertLessEqual(
+            self.draws() / switches, 2 * (1 + INHERITING_PER_BAR)
+        )
+        self.assertLessEqual(self.tail_draws() / switches, 2)
@@ -9,6 +9,7 @@ from qtile_extras.widget.mixins import TooltipMixin
 from libqtile.lazy import lazy
 from libqtile import qtile
 
+from taqtile.widgets.bar import FocusHighlightMixin
 
 
 
@@ -50,7 +51,7 @@ class CloseButton(Button):
         
 
 
-class ToggleButton(GenPollText, TooltipMixin):
+class ToggleButton(FocusHighlightMixin, GenPollText, TooltipMixin):
     def __init__(self, name, **config):
         GenPollText.__init__(self, **config)
         TooltipMixin.__init__(self, **config)
@@ -85,26 +86,6 @@ class ToggleButton(GenPollText, TooltipMixin):
         self.check_state()
         self.default_background = self.background
         self.default_foreground = self.foreground
-        hook.subscribe.current_screen_change(self._hook_current_screen_change)
-
-    def _hook_current_screen_change(self, *args):
-        if not getattr(self, "qtile", None):
-            return
-        logger.debug(
-            f"current_screen_change current_screen: {self.qtile.current_screen.index} self.bar.screen:{self.bar.screen.index}"
-        )
-
-        if self.bar.screen == self.qtile.current_screen:
-            self.background = self.focused_background
-            self.foreground = self.focused_foreground
-        else:
-            self.background = self.default_background
-            self.foreground = self.default_foreground
-        try:
-            self._configure(self.qtile, self.bar)
-        except Exception as e:
-            logger.error(f"Error configuring ToggleButton {self.name}")
-        self.draw()
 
     def _update_background(self):
         self.background = (
@@ -1,8 +1,47 @@
 from libqtile import widget
-import requests
+from libqtile.log_utils import logger
+from libqtile.widget import CryptoTicker as QCryptoTicker
 
+from taqtile.poller import get_http_poller
 
-class ExchangeRate(widget.GenPollUrl):
+
+class SharedPollUrl:
+    """Mixin for GenPollUrl widgets that fetch through the shared poller.
+
+    Bars on different screens showing the same url share one request, and
+    unchanged responses are not re-parsed or redrawn.
+    """
+
+    _unsubscribe = None
+
+    def timer_setup(self):
+        if not self.parse or not self.url:
+            self.update("Invalid config")
+            return
+        self._unsubscribe = get_http_poller().subscribe(
+            self.url,
+            self._on_body,
+            interval=self.update_interval or 600,
+            headers=self.headers,
+            json=self.json,
+        )
+
+    def _on_body(self, body):
+        try:
+            text = self.parse(body)
+        except Exception:
+            logger.exception("got exception polling widget")
+            text = "Can't parse"
+        self.update(text)
+
+    def finalize(self):
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
+        super().finalize()
+
+
+class ExchangeRate(SharedPollUrl, widget.GenPollUrl):
     def __init__(self, amount, from_currency, to_currency, **config):
         self.from_currency = from_currency
         self.to_currency = to_currency
@@ -17,7 +56,7 @@ class ExchangeRate(widget.GenPollUrl):
         return f"{self.amount} {self.from_currency} = {self.amount * body[self.to_currency]} {self.to_currency}"
 
 
-class BitcoinFees(widget.GenPollUrl):
+class BitcoinFees(SharedPollUrl, widget.GenPollUrl):
     def __init__(self, **config):
         super().__init__(
             json=True,
@@ -32,3 +71,7 @@ class BitcoinFees(widget.GenPollUrl):
         transaction_fees = btc_price_usd * 0.005
 
         return f"fee: {transaction_fees}"
+
+
+class CryptoTicker(SharedPollUrl, QCryptoTicker):
+    pass
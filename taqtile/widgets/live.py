@@ -1,7 +1,6 @@
 import logging
 
-import pulsectl
-
+from taqtile.lazyimport import lazy_module
 from taqtile.widgets.buttons import ToggleButton
 from libqtile import hook
 from pprint import pformat
@@ -9,6 +8,8 @@ from libqtile import qtile
 
 logger = logging.getLogger(__name__)
 
+pulsectl = lazy_module("pulsectl")
+
 
 class VoiceInputStatusWidget(ToggleButton):
     def _check_state(self):
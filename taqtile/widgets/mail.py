@@ -1,3 +1,8 @@
+import glob
+import os
+import threading
+import time
+
 from libqtile.widget import base
 from taqtile.log import logger
 
@@ -9,19 +14,98 @@ except ImportError:
     pass
 
 
+INBOX_QUERY = "(tag:INBOX or tag:inbox) and not (tag:misc or tag:deleted) and date:30d..0s and tag:unread and tag:me"
+
+
+class MailCounter:
+    """Shared notmuch message counts.
+
+    Counts are cached per query string and recomputed when the xapian
+    database changes on disk, or after ``max_age`` seconds since queries like
+    ``date:30d..0s`` change with the time alone. All registered queries are
+    counted in one read only database session.
+    """
+
+    def __init__(self, max_age=60, clock=time.monotonic):
+        self.max_age = max_age
+        self.clock = clock
+        self.queries = []
+        self.counts = {}
+        self.db_path = None
+        self.signature = None
+        self.counted_at = None
+        self._lock = threading.Lock()
+
+    def add_query(self, query):
+        with self._lock:
+            if query not in self.queries:
+                self.queries.append(query)
+                # force a recount so the new query gets a value
+                self.signature = None
+
+    def _signature(self):
+        if not self.db_path:
+            return None
+        xapian = os.path.join(self.db_path, ".notmuch", "xapian")
+        try:
+            return max(
+                os.stat(path).st_mtime_ns
+                for path in [xapian] + glob.glob(os.path.join(xapian, "*"))
+            )
+        except (OSError, ValueError):
+            return None
+
+    def refresh(self):
+        """Recount all queries if the database changed, return the counts."""
+        if not notmuch:
+            return {}
+        with self._lock:
+            signature = self._signature()
+            now = self.clock()
+            if (
+                signature is not None
+                and signature == self.signature
+                and now - self.counted_at < self.max_age
+            ):
+                return dict(self.counts)
+            db = notmuch.Database(mode=notmuch.Database.MODE.READ_ONLY)
+            try:
+                self.db_path = self.db_path or db.get_path()
+                for query in self.queries:
+                    self.counts[query] = db.create_query(query).count_messages()
+            finally:
+                db.close()
+            self.signature = signature or self._signature()
+            self.counted_at = now
+            return dict(self.counts)
+
+    def count(self, query):
+        self.add_query(query)
+        return self.refresh().get(query, 0)
+
+
+_mail_counter = None
+
+
+def get_mail_counter():
+    global _mail_counter
+    if _mail_counter is None:
+        _mail_counter = MailCounter()
+    return _mail_counter
+
+
 class NotmuchCount(base.ThreadedPollText):
     def __init__(self, **config):
         base.ThreadedPollText.__init__(self, **config)
-        self.query = "(tag:INBOX or tag:inbox) and not (tag:misc or tag:deleted) and date:30d..0s and tag:unread and tag:me"
+        self.query = INBOX_QUERY
         self.update_interval = 5
+        get_mail_counter().add_query(self.query)
 
     def poll(self):
         if not notmuch:
             return ""
-        db = notmuch.Database()
-        query = db.create_query(self.query)
         try:
-            count = query.count_messages()
+            count = get_mail_counter().count(self.query)
             if count:
                 return "\u2709 %s" % count
             else:
@@ -0,0 +1,85 @@
+import os
+import tempfile
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import patch
+
+from . import mail
+from .mail import MailCounter
+
+
+class FakeDatabase:
+    MODE = SimpleNamespace(READ_ONLY=0)
+    path = None
+    counts = {}
+    sessions = 0
+
+    def __init__(self, mode):
+        FakeDatabase.sessions += 1
+
+    def get_path(self):
+        return self.path
+
+    def create_query(self, query):
+        return SimpleNamespace(count_messages=lambda: self.counts[query])
+
+    def close(self):
+        pass
+
+
+class MailCounterTest(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.xapian = os.path.join(self.dir.name, ".notmuch", "xapian")
+        os.makedirs(self.xapian)
+        self.touch(1)
+        FakeDatabase.path = self.dir.name
+        FakeDatabase.counts = {"tag:inbox": 3, "tag:draft": 1}
+        FakeDatabase.sessions = 0
+        patcher = patch.object(
+            mail, "notmuch", SimpleNamespace(Database=FakeDatabase)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.now = 0
+        self.counter = MailCounter(max_age=60, clock=lambda: self.now)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def touch(self, mtime):
+        os.utime(self.xapian, ns=(mtime, mtime))
+
+    def test_unchanged_database_is_not_recounted(self):
+        self.assertEqual(self.counter.count("tag:inbox"), 3)
+        FakeDatabase.counts["tag:inbox"] = 4
+        self.now = 30
+        self.assertEqual(self.counter.count("tag:inbox"), 3)
+        self.assertEqual(FakeDatabase.sessions, 1)
+
+    def test_changed_database_is_recounted(self):
+        self.counter.count("tag:inbox")
+        FakeDatabase.counts["tag:inbox"] = 4
+        self.touch(2)
+        self.assertEqual(self.counter.count("tag:inbox"), 4)
+        self.assertEqual(FakeDatabase.sessions, 2)
+
+    def test_counts_expire(self):
+        # date:30d..0s matches fewer messages as time passes
+        self.counter.count("tag:inbox")
+        FakeDatabase.counts["tag:inbox"] = 2
+        self.now = 61
+        self.assertEqual(self.counter.count("tag:inbox"), 2)
+        self.assertEqual(FakeDatabase.sessions, 2)
+
+    def test_added_query_is_counted(self):
+        self.counter.count("tag:inbox")
+        self.counter.add_query("tag:draft")
+        self.assertEqual(self.counter.queries, ["tag:inbox", "tag:draft"])
+        self.assertEqual(
+            self.counter.refresh(), {"tag:inbox": 3, "tag:draft": 1}
+        )
+        # registering it again does not force another recount
+        self.counter.add_query("tag:draft")
+        self.counter.refresh()
+        self.assertEqual(FakeDatabase.sessions, 2)
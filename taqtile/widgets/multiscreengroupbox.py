@@ -1,46 +1,87 @@
-from libqtile import widget
+from libqtile import hook, widget
 from taqtile.system import get_current_screen
 from taqtile.log import logger
 from taqtile.themes import default_params
 
 
+# (label, font, fontsize, markup) -> (width, height), shared by every group box
+_label_metrics = {}
+
+
+def group_monitor(name):
+    """Monitor a group is pinned to by its name, None for named groups.
+
+    Single digit names belong to the first monitor, longer numeric names
+    carry the monitor index in their first digit.
+    """
+    if not name.isdigit():
+        return None
+    if len(name) == 1:
+        return 0
+    return int(name[0])
+
+
 class _MultiScreenGroupBox(widget.GroupBox):
     def __init__(self, **config):
         self.screen = config.pop("screen", {})
         super().__init__(**config)
         self.center_aligned = False
+        self._partition = None
 
-    def _box_width(self, groups):
-        width, height = self.drawer.max_layout_size(
-            [self.get_label(i.name) for i in groups], self.font, self.fontsize
-        )
-        return width  # + self.padding_x + self.margin_x + self.borderwidth
-        # return (
-        #    width
-        #    + self.padding_x * 2
-        #    + self.margin_x * 2
-        #    + self.borderwidth * 2
-        # )
+    def setup_hooks(self):
+        super().setup_hooks()
+        hook.subscribe.addgroup(self._invalidate_partition)
+        hook.subscribe.delgroup(self._invalidate_partition)
+        hook.subscribe.screens_reconfigured(self._invalidate_partition)
+
+    def remove_hooks(self):
+        super().remove_hooks()
+        hook.unsubscribe.addgroup(self._invalidate_partition)
+        hook.unsubscribe.delgroup(self._invalidate_partition)
+        hook.unsubscribe.screens_reconfigured(self._invalidate_partition)
 
-    def _get_label(self, group):
-        return self.namemap.get(group)
+    def _invalidate_partition(self, *args, **kwargs):
+        self._partition = None
+
+    def label_size(self, label):
+        key = (label, self.font, self.fontsize, self.markup)
+        size = _label_metrics.get(key)
+        if size is None:
+            size = _label_metrics[key] = self.drawer.max_layout_size(
+                [label], self.font, self.fontsize, self.markup
+            )
+        return size
+
+    def box_width(self, groups):
+        width = max(self.label_size(self.fmt.format(i.label))[0] for i in groups)
+        return width + self.padding_x * 2 + self.borderwidth * 2
+
+    @property
+    def partition(self):
+        """Groups pinned to this screen plus the named groups.
+
+        Group names are only parsed when groups are added or removed, draws
+        reuse the cached list.
+        """
+        if self._partition is None:
+            self._partition = [
+                group
+                for group in self.qtile.groups
+                if group_monitor(group.name) in (None, self.screen)
+                and (
+                    not self.visible_groups or group.name in self.visible_groups
+                )
+            ]
+        return self._partition
 
     @property
     def groups(self):
         grp0 = []
-        grps = super().groups
-        for group in grps:
-            if group.name.isdigit():
-                if len(group.name) == 1:
-                    mon = 0
-                else:
-                    mon = int(group.name[0])
-                if mon != self.screen:
-                    continue
-            # logger.debug(
-            #    "Group screen: %s: GroupBox screen %s"
-            #    % (group.screen.index, self.screen)
-            # )
+        for group in self.partition:
+            if not group.label:
+                continue
+            if self.hide_unused and not (group.windows or group.screen):
+                continue
             if group.screen and group.screen.index != self.screen:
                 continue
             grp0.append(group)
@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+from unittest import TestCase
+from unittest.mock import Mock
+
+from . import multiscreengroupbox
+from .multiscreengroupbox import _MultiScreenGroupBox, group_monitor
+
+
+def make_group(name, screen=None, windows=()):
+    return SimpleNamespace(name=name, label=name, screen=screen, windows=list(windows))
+
+
+def make_box(groups, screen=1):
+    box = _MultiScreenGroupBox.__new__(_MultiScreenGroupBox)
+    box.screen = screen
+    box.qtile = SimpleNamespace(groups=groups)
+    box.visible_groups = None
+    box.hide_unused = False
+    box.font = "sans"
+    box.fontsize = 12
+    box.markup = False
+    box.fmt = "{}"
+    box.padding_x = 1
+    box.borderwidth = 1
+    box._partition = None
+    box.drawer = Mock()
+    box.drawer.max_layout_size.side_effect = lambda texts, *a: (len(texts[0]) * 7, 10)
+    return box
+
+
+class MultiScreenGroupBoxTest(TestCase):
+    def setUp(self):
+        multiscreengroupbox._label_metrics.clear()
+        self.groups = [make_group(str(i)) for i in range(1, 10)]
+        self.groups += [make_group("1%s" % i) for i in range(10)]
+        self.groups += [make_group("mail")]
+
+    def test_group_monitor(self):
+        self.assertEqual(group_monitor("3"), 0)
+        self.assertEqual(group_monitor("13"), 1)
+        self.assertIsNone(group_monitor("mail"))
+
+    def test_partition_is_cached_until_invalidated(self):
+        box = make_box(self.groups)
+        names = [g.name for g in box.groups]
+        self.assertEqual(names, ["1%s" % i for i in range(10)] + ["mail"])
+        self.assertIs(box.partition, box.partition)
+        self.groups.append(make_group("1a"))
+        self.groups.append(make_group("news"))
+        self.assertNotIn("news", [g.name for g in box.groups])
+        box._invalidate_partition("news")
+        self.assertIn("news", [g.name for g in box.groups])
+
+    def test_groups_shown_on_other_screens_are_hidden(self):
+        box = make_box(self.groups)
+        self.groups[-1].screen = SimpleNamespace(index=0)
+        self.assertNotIn("mail", [g.name for g in box.groups])
+        self.groups[-1].screen = SimpleNamespace(index=1)
+        self.assertIn("mail", [g.name for g in box.groups])
+
+    def test_label_metrics_are_shared(self):
+        first, second = make_box(self.groups), make_box(self.groups, screen=0)
+        for _ in range(10):
+            self.assertEqual(first.box_width([self.groups[-1]]), 4 * 7 + 4)
+            second.box_width([self.groups[-1]])
+        self.assertEqual(first.drawer.max_layout_size.call_count, 1)
+        second.drawer.max_layout_size.assert_not_called()
@@ -1,15 +1,35 @@
+from os import path
+
 from libqtile.widget import Notify as QNotify
 from libqtile import bar, pangocffi, utils
 from libqtile.log_utils import logger
 from libqtile.notify import ClosedReason, notifier
 from libqtile.widget import base
 
+from taqtile.notifications import NotificationQueue, expire_after, urgency
+
 
 class Notify(QNotify):
+    defaults = [
+        ("queue_size", 32, "Maximum number of apps with pending notifications"),
+        (
+            "app_interval",
+            2.0,
+            "Minimum seconds between two notifications from the same app, "
+            "notifications arriving in between are collapsed",
+        ),
+        ("frame_interval", 1 / 30, "Seconds between notification renders"),
+    ]
+
     def __init__(self, width=bar.CALCULATED, **config):
         super().__init__(width=width, **config)
+        self.add_defaults(Notify.defaults)
         self.background_normal = self.background
         self.background_urgent = "#710039"
+        self.queue = NotificationQueue(
+            maxlen=self.queue_size, min_interval=self.app_interval
+        )
+        self._tick_scheduled = False
 
     def calculate_length(self):
         if self.text:
@@ -26,23 +46,18 @@ class Notify(QNotify):
         else:
             return 0
 
-    def set_notif_text(self, notif):
-        # 'actions', 'app_icon', 'app_name', 'body', 'hints', 'id', 'replaces_id', 'summary', 'timeout'
-        logger.info("taqtile notifi %s", dir(notif))
-        logger.info(f"hints {notif.hints.keys()}, ")
-        logger.info(f"hints {notif.hints.get('sender-pid')}, ")
-        logger.info(f"hints {notif.app_name}, ")
-        logger.info(f"bar {self.bar}, ")
-        self.text = pangocffi.markup_escape_text(notif.summary)
-        urgency = getattr(notif.hints.get("urgency"), "value", 1)
-        if notif.app_name.lower() in ["slack"]:
-            urgency = 2
+    def set_notif_text(self, notif, summary=None, body=None):
+        logger.debug("notification from %s", notif.app_name)
+        summary = notif.summary if summary is None else summary
+        body = notif.body if body is None else body
+        self.text = pangocffi.markup_escape_text(summary)
+        level = urgency(notif)
 
-        if urgency != 1:
+        if level != 1:
             self.text = '<span color="%s">%s</span>' % (
                 utils.hex(
                     self.foreground_urgent
-                    if urgency == 2
+                    if level == 2
                     else self.foreground_low
                 ),
                 self.text,
@@ -52,11 +67,11 @@ class Notify(QNotify):
         else:
             self.background = self.background_normal
             self.bar.background = self.background
-        if notif.body:
+        if body:
             self.text = '<span weight="bold">%s</span> %s: %s' % (
                 notif.app_name,
                 self.text,
-                pangocffi.markup_escape_text(notif.body),
+                pangocffi.markup_escape_text(body),
             )
         if callable(self.parse_text):
             try:
@@ -68,3 +83,37 @@ class Notify(QNotify):
         self.text = self.text.replace("\n", " ")
         if len(self.text) > 300:
             self.text = self.text[:300] + "..."
+
+    def update(self, notif):
+        self.qtile.call_soon_threadsafe(self._enqueue, notif)
+
+    def _enqueue(self, notif):
+        self.queue.push(notif)
+        self._schedule_tick(self.frame_interval)
+
+    def _schedule_tick(self, delay):
+        if self._tick_scheduled:
+            return
+        self._tick_scheduled = True
+        self.timeout_add(delay, self._tick)
+
+    def _tick(self):
+        """Show at most one queued notification per frame."""
+        self._tick_scheduled = False
+        entry = self.queue.pop()
+        if entry is not None:
+            self._show(entry)
+        delay = self.queue.next_ready()
+        if delay is not None:
+            self._schedule_tick(max(delay, self.frame_interval))
+
+    def _show(self, entry):
+        notif = entry.notif
+        self.set_notif_text(notif, entry.summary, entry.body)
+        self.current_id = notif.id - 1
+        timeout = expire_after(notif, self._timeouts)
+        if timeout:
+            self.timeout_add(
+                timeout, self.clear, method_args=(ClosedReason.expired,)
+            )
+        self.bar.draw()
@@ -2,85 +2,64 @@ import logging
 
 from libqtile import hook, qtile
 
+from taqtile.obs import get_obs_client
 from taqtile.widgets.buttons import ToggleButton
-import websocket
 
 logger = logging.getLogger(__name__)
 
-try:
-    import obsws_python as obs
-except ImportError:
-    logger.error("OBS python sdk not installed")
-
 PRIVATE_GROUPS = ["webcon", "home", "slack", "mail", "crypto", "calendar"]
+# seconds a menu waits for OBS to hide the screen before showing secrets
+PAUSE_WAIT = 0.5
 
-
-def initialize_obs_client(func):
-    def wrapper(*args, **kwargs):
-        try:
-            if not getattr(qtile, "OBS_CLIENT", None):
-                qtile.OBS_CLIENT = obs.ReqClient(
-                    host="localhost", port=4444, timeout=3
-                )
-            qtile.OBS_CLIENT.get_version()
-            return func(qtile.OBS_CLIENT, *args, **kwargs)
-        except NameError:
-            logger.error("obs integration failed")
-        except Exception:
-            #    websocket._exceptions.WebSocketConnectionClosedException,
-            #    BrokenPipeError,
-            # ):
-            logger.error("obs webbsocket failed reconnecting")
-            qtile.OBS_CLIENT = None
-        except obs.error.OBSSDKRequestError as e:
-            logger.error(f"obs request failed. {e}")
-        except ConnectionRefusedError as e:
-            logger.error(f"obs not running ?. {e}")
-
-    return wrapper
+prev_scene = None
 
 
-@initialize_obs_client
-def obs_switch_scene(obs_client, scenename):
-    resp = obs_client.set_current_program_scene(scenename)
-    logger.info(f"switch to {scenename} got response {resp}")
-    return resp
+def obs_switch_scene(scenename, wait=None):
+    client = get_obs_client()
+    if not client.connected or scenename == client.current_scene:
+        return None
+    try:
+        return client.submit(client.set_scene(scenename), wait=wait)
+    except Exception as e:
+        logger.error(f"obs switch to {scenename} failed. {e}")
 
 
-@initialize_obs_client
-def obs_pause_recording(obs_client):
+def obs_pause_recording():
     global prev_scene
-    prev_scene = (
-        obs_client.get_current_program_scene().current_program_scene_name
-    )
-    obs_switch_scene("face")
+    client = get_obs_client()
+    if client.connected:
+        prev_scene = client.current_scene
+        obs_switch_scene("face", wait=PAUSE_WAIT)
     qtile.spawn("dunstctl set-paused true")
 
 
-@initialize_obs_client
-def obs_resume_recording(obs_client):
-    global prev_scene
-    obs_switch_scene(prev_scene)
+def obs_resume_recording():
+    if prev_scene:
+        obs_switch_scene(prev_scene)
     qtile.spawn("dunstctl set-paused false")
 
 
-@initialize_obs_client
-def obs_get_recording_state(obs_client):
-    return obs_client.get_record_status().output_active
+def obs_request(request_type, data=None, wait=3):
+    client = get_obs_client()
+    if not client.connected:
+        return None
+    try:
+        return client.submit(client.request(request_type, data), wait=wait)
+    except Exception as e:
+        logger.error(f"obs request {request_type} failed. {e}")
+
+
+def obs_get_recording_state():
+    status = obs_request("GetRecordStatus")
+    return bool(status and status.get("outputActive"))
 
 
-@initialize_obs_client
-def obs_start_record(obs_client):
-    resp = obs_client.start_record()
-    logger.info(f"pause got response {resp}")
-    return resp
+def obs_start_record():
+    return obs_request("StartRecord")
 
 
-@initialize_obs_client
-def obs_stop_record(obs_client):
-    resp = obs_client.start_record()
-    logger.info(f"pause got response {resp}")
-    return resp
+def obs_stop_record():
+    return obs_request("StopRecord")
 
 
 @hook.subscribe.setgroup
@@ -1,11 +1,14 @@
-from libqtile import bar, hook
+from libqtile import bar
 from typing import Any
 from libqtile.widget import GenPollText
 import logging
-from datetime import datetime
+import re
+from datetime import datetime, timedelta
 
 import psutil
 
+from taqtile.windowstats import DAY, get_window_stats
+
 logger = logging.getLogger(__name__)
 
 NOAUTOCLOSE = []
@@ -29,33 +32,32 @@ class WindowCleaner(GenPollText):
         GenPollText.__init__(self, width=width, **config)
         self.add_defaults(WindowCleaner.defaults)
         self._count = 0
+        self._unsubscribe = None
+
+    def _configure(self, qtile, bar):
+        GenPollText._configure(self, qtile, bar)
+        stats = get_window_stats()
+        self._count = stats.screen_count(self.bar.screen.index)
+        self._unsubscribe = stats.subscribe_screen(
+            self.bar.screen.index, self._show
+        )
 
     def func(self):
         logger.info("Cleaner called")
-        close_old_windows()
-        return self.text
-
-    def _setup_hooks(self):
-        hook.subscribe.client_killed(self._win_killed)
-        hook.subscribe.client_managed(self._wincount)
-        hook.subscribe.current_screen_change(self._wincount)
-        hook.subscribe.setgroup(self._wincount)
-
-    def _wincount(self, *args):
-        try:
-            self._count = len(self.bar.screen.group.windows)
-        except AttributeError:
-            self._count = 0
-
-        self.update(self.text_format.format(num=self._count))
-
-    def _win_killed(self, window):
-        try:
-            self._count = len(self.bar.screen.group.windows)
-        except AttributeError:
-            self._count = 0
-
-        self.update(self.text_format.format(num=self._count))
+        # only walk the windows when one is old enough to reap
+        if get_window_stats().older_than(DAY):
+            close_old_windows()
+        return self.text_format.format(num=self._count)
+
+    def _show(self, count):
+        self._count = count
+        self.update(self.text_format.format(num=count))
+
+    def finalize(self):
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        GenPollText.finalize(self)
 
 
 def close_old_windows():
@@ -0,0 +1,35 @@
+from libqtile.widget.window_count import WindowCount as QWindowCount
+
+from taqtile.windowstats import get_window_stats
+
+
+class WindowCount(QWindowCount):
+    """
+    Number of windows in the group shown on the widget's screen.
+
+    Counts come from the shared window stats service, the widget is only
+    redrawn when its screen's count changes.
+    """
+
+    _unsubscribe = None
+
+    def _setup_hooks(self):
+        self._unsubscribe = get_window_stats().subscribe_screen(
+            self.bar.screen.index, self._show
+        )
+
+    def _wincount(self, *args):
+        self._show(get_window_stats().screen_count(self.bar.screen.index))
+
+    def _win_killed(self, window):
+        self._wincount()
+
+    def _show(self, count):
+        self._count = count
+        self.update(self.text_format.format(num=count))
+
+    def finalize(self):
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        QWindowCount.finalize(self)
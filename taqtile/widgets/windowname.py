@@ -2,9 +2,10 @@ from libqtile.widget import WindowName as QWindowName
 
 from taqtile.log import logger
 from libqtile import bar, hook, pangocffi
+from taqtile.widgets.bar import FocusHighlightMixin
 
 
-class WindowName(QWindowName):
+class WindowName(FocusHighlightMixin, QWindowName):
     default_background = None
     defaults = [
         ("focused_background", "#FF0000", "Focused background colour."),
@@ -42,15 +43,6 @@ class WindowName(QWindowName):
     def prev_window(self):
         self.qtile.current_group.prev_window()
 
-    def _configure(self, qtile, bar):
-        super()._configure(qtile, bar)
-        hook.subscribe.current_screen_change(self.hook_response)
-
     def draw(self):
-        if self.bar.screen == self.qtile.current_screen:
-            self.background = self.focused_background
-            self.foreground = self.focused_foreground
-        else:
-            self.background = self.default_background
-            self.foreground = self.default_foreground
+        self.set_focused(self.bar.screen == self.qtile.current_screen)
         return super().draw()
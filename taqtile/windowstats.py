@@ -0,0 +1,188 @@
+"""Window counts shared by every bar.
+
+Each ``WindowCount`` widget, and ``WindowCleaner``, subscribed to the
+client and group hooks on its own and recounted ``len(group.windows)`` in
+every handler, so N bars meant N recounts per event. :class:`WindowStats`
+follows ``group_window_add`` and ``group_window_remove`` to keep the
+windows of each group. It tracks which group each screen shows, urgent
+windows per group, and when the process of each window started, in sorted
+order, so an age histogram takes a few bisects. Process start is what
+``WindowCleaner`` judges age by. A config reload rebuilds the service, so
+it seeds itself from ``qtile.windows_map``, which survives the reload.
+Widgets subscribe to the screen they sit on and are only called when that
+screen's count changes.
+"""
+
+import bisect
+import logging
+import time
+
+from taqtile.lazyimport import lazy_module
+
+logger = logging.getLogger("taqtile")
+
+psutil = lazy_module("psutil")
+
+HOUR = 3600
+DAY = 24 * HOUR
+# upper bounds of the age histogram buckets, the last one is open ended
+AGE_BUCKETS = (HOUR, DAY, 7 * DAY)
+
+
+def process_started(window):
+    """When the process owning ``window`` started, None if unknown."""
+    try:
+        return psutil.Process(window.get_pid()).create_time()
+    except Exception:
+        return None
+
+
+class WindowStats:
+    def __init__(self, clock=time.time, started=process_started):
+        self.clock = clock
+        self.started = started
+        self.group_windows = {}
+        self.screen_groups = {}
+        self.urgent = {}
+        self.managed = {}
+        self._ages = []
+        self._screen_callbacks = {}
+        self._notified = {}
+
+    def seed(self, qtile):
+        for window in list(qtile.windows_map.values()):
+            group = getattr(window, "group", None)
+            if group is None:
+                # internal and static windows
+                continue
+            self.group_windows.setdefault(group.name, set()).add(window.wid)
+            if getattr(window, "urgent", False):
+                self.urgent.setdefault(group.name, set()).add(window.wid)
+            self.on_client_managed(window)
+        self._update_screens(qtile)
+
+    def screen_count(self, index):
+        return len(self.group_windows.get(self.screen_groups.get(index), ()))
+
+    def urgent_count(self, group_name):
+        return len(self.urgent.get(group_name, ()))
+
+    def age_histogram(self, buckets=AGE_BUCKETS):
+        """Number of windows per age bucket, the last bucket is open ended."""
+        now = self.clock()
+        counts = []
+        newer = 0
+        for age in buckets:
+            # windows started after now - age are younger than age
+            younger = len(self._ages) - bisect.bisect_right(
+                self._ages, now - age
+            )
+            counts.append(younger - newer)
+            newer = younger
+        counts.append(len(self._ages) - newer)
+        return counts
+
+    def older_than(self, age):
+        return bisect.bisect_left(self._ages, self.clock() - age)
+
+    def subscribe_screen(self, index, callback):
+        """Call ``callback(count)`` when the count of screen ``index`` changes.
+
+        Returns a function that removes the subscription.
+        """
+        self._screen_callbacks.setdefault(index, []).append(callback)
+        # the subscriber reads the current count itself
+        self._notified.setdefault(index, self.screen_count(index))
+
+        def unsubscribe():
+            callbacks = self._screen_callbacks.get(index, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+        return unsubscribe
+
+    def _notify(self):
+        for index, callbacks in self._screen_callbacks.items():
+            count = self.screen_count(index)
+            if self._notified.get(index) == count:
+                continue
+            self._notified[index] = count
+            for callback in list(callbacks):
+                try:
+                    callback(count)
+                except Exception:
+                    logger.exception("window stats subscriber failed")
+
+    def _managed(self, wid, when):
+        self.managed[wid] = when
+        bisect.insort(self._ages, when)
+
+    def _update_screens(self, qtile):
+        self.screen_groups = {
+            screen.index: screen.group.name
+            for screen in qtile.screens
+            if screen.group is not None
+        }
+
+    def on_group_window_add(self, group, window):
+        # a set, so windows already seeded are not counted twice
+        self.group_windows.setdefault(group.name, set()).add(window.wid)
+        if getattr(window, "urgent", False):
+            self.urgent.setdefault(group.name, set()).add(window.wid)
+        self._notify()
+
+    def on_group_window_remove(self, group, window):
+        self.group_windows.get(group.name, set()).discard(window.wid)
+        self.urgent.get(group.name, set()).discard(window.wid)
+        self._notify()
+
+    def on_client_managed(self, window):
+        if window.wid in self.managed:
+            return
+        when = self.started(window) if self.started else None
+        self._managed(window.wid, self.clock() if when is None else when)
+
+    def on_client_killed(self, window):
+        when = self.managed.pop(window.wid, None)
+        if when is not None:
+            del self._ages[bisect.bisect_left(self._ages, when)]
+        for wids in self.urgent.values():
+            wids.discard(window.wid)
+
+    def on_urgent_hint_changed(self, window):
+        group = getattr(window, "group", None)
+        if group is None:
+            return
+        wids = self.urgent.setdefault(group.name, set())
+        if window.urgent:
+            wids.add(window.wid)
+        else:
+            wids.discard(window.wid)
+
+    def on_setgroup(self):
+        from libqtile import qtile
+
+        self._update_screens(qtile)
+        self._notify()
+
+
+_window_stats = None
+
+
+def get_window_stats():
+    global _window_stats
+    if _window_stats is None:
+        from libqtile import hook, qtile
+
+        stats = _window_stats = WindowStats()
+        if qtile is not None:
+            stats.seed(qtile)
+        hook.subscribe.group_window_add(stats.on_group_window_add)
+        hook.subscribe.group_window_remove(stats.on_group_window_remove)
+        hook.subscribe.client_managed(stats.on_client_managed)
+        hook.subscribe.client_killed(stats.on_client_killed)
+        hook.subscribe.client_urgent_hint_changed(stats.on_urgent_hint_changed)
+        hook.subscribe.setgroup(stats.on_setgroup)
+        hook.subscribe.current_screen_change(stats.on_setgroup)
+        hook.subscribe.screens_reconfigured(stats.on_setgroup)
+    return _window_stats
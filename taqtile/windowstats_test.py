@@ -0,0 +1,95 @@
+from types import SimpleNamespace
+from unittest import TestCase
+
+from taqtile.windowstats import DAY, HOUR, WindowStats
+
+
+def window(wid, urgent=False):
+    return SimpleNamespace(wid=wid, urgent=urgent, group=None)
+
+
+class WindowStatsTest(TestCase):
+    def setUp(self):
+        self.now = 100 * DAY
+        self.stats = WindowStats(clock=lambda: self.now, started=None)
+        self.web = SimpleNamespace(name="web", windows=[])
+        self.term = SimpleNamespace(name="term", windows=[])
+        self.qtile = SimpleNamespace(
+            windows_map={},
+            groups=[self.web, self.term],
+            screens=[
+                SimpleNamespace(index=0, group=self.web),
+                SimpleNamespace(index=1, group=self.term),
+            ],
+        )
+        self.stats.seed(self.qtile)
+
+    def add(self, group, win):
+        win.group = group
+        self.stats.on_client_managed(win)
+        self.stats.on_group_window_add(group, win)
+
+    def test_counts_follow_group_hooks(self):
+        calls = {0: [], 1: []}
+        for index in calls:
+            self.stats.subscribe_screen(index, calls[index].append)
+        a, b, c = window(1), window(2), window(3)
+        self.add(self.web, a)
+        self.add(self.web, b)
+        self.add(self.term, c)
+        self.assertEqual(calls, {0: [1, 2], 1: [1]})
+        # moving a window between groups
+        self.stats.on_group_window_remove(self.web, b)
+        self.stats.on_group_window_add(self.term, b)
+        self.assertEqual(self.stats.screen_count(0), 1)
+        self.assertEqual(self.stats.screen_count(1), 2)
+        self.assertEqual(calls, {0: [1, 2, 1], 1: [1, 2]})
+
+    def test_screens_follow_setgroup(self):
+        self.add(self.web, window(1))
+        self.qtile.screens[1].group = self.web
+        self.stats._update_screens(self.qtile)
+        self.assertEqual(self.stats.screen_count(1), 1)
+        self.assertEqual(self.stats.screen_count(5), 0)
+
+    def test_urgency(self):
+        win = window(1, urgent=True)
+        self.add(self.web, win)
+        self.assertEqual(self.stats.urgent_count("web"), 1)
+        win.urgent = False
+        self.stats.on_urgent_hint_changed(win)
+        self.assertEqual(self.stats.urgent_count("web"), 0)
+
+    def test_age_histogram(self):
+        ages = [0, 2 * HOUR, 2 * DAY, 30 * DAY]
+        wins = []
+        for i, age in enumerate(ages):
+            self.now = 100 * DAY - age
+            wins.append(window(i))
+            self.add(self.web, wins[-1])
+        self.now = 100 * DAY
+        self.assertEqual(self.stats.age_histogram(), [1, 1, 1, 1])
+        self.assertEqual(self.stats.older_than(DAY), 2)
+        self.stats.on_client_killed(wins[3])
+        self.assertEqual(self.stats.age_histogram(), [1, 1, 1, 0])
+        self.assertEqual(self.stats.older_than(DAY), 1)
+
+    def test_seeded_from_windows_map_by_process_start(self):
+        # after a config reload the groups are new, the windows are not
+        old, new = window(1), window(2)
+        old.group = new.group = self.web
+        self.qtile.windows_map = {
+            1: old,
+            2: new,
+            3: SimpleNamespace(wid=3, group=None),
+        }
+        started = {1: self.now - 3 * DAY}
+        stats = WindowStats(
+            clock=lambda: self.now, started=lambda w: started.get(w.wid)
+        )
+        stats.seed(self.qtile)
+        self.assertEqual(stats.screen_count(0), 2)
+        self.assertEqual(stats.older_than(DAY), 1)
+        # group hooks for windows already seeded do not count them twice
+        stats.on_group_window_add(self.web, old)
+        self.assertEqual(stats.screen_count(0), 2)